@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Ansible action which reboots a host once it holds a reboot slot. Slots
+    are shared by all hosts of the play through a lock protected file on the
+    controller and are limited per pool (the play and inventory groups such
+    as racks or aggregates), so a host starts rebooting as soon as any host
+    of its pools is back. After the reboot a health gate confirms the kernel
+    command line and hugepages with module kernel_cmdline and, if hugepages
+    are allocated per NUMA node, with module numa_hugepages. Module
+    sst_bf_frequency confirms the SST-BF profile was applied at boot. A
+    failed host halts the rollout """
+
+import fcntl
+import json
+import os
+import time
+
+from ansible.plugins.action.reboot import ActionModule as RebootActionModule
+
+
+def resolve_limit(limit, size):
+    """ Convert pool limit 'limit', a count or a percentage string such as
+        '5%', to a number of hosts of a pool of 'size' hosts. At least one
+        host is allowed """
+
+    limit = str(limit).strip()
+    if limit.endswith("%"):
+        count = int(float(limit[:-1]) * size / 100)
+    else:
+        count = int(limit)
+    return max(1, count)
+
+
+def try_acquire(state, host, pools):
+    """ Add 'host' to the slots in 'state' if every pool in 'pools' (list of
+        dicts with keys name and limit) has a free slot. Return True if the
+        host holds a slot """
+
+    slots = state.setdefault("slots", {})
+    if host in slots:
+        return True
+    for pool in pools:
+        used = sum(1 for held in slots.values() if pool["name"] in held)
+        if used >= pool["limit"]:
+            return False
+    slots[host] = [pool["name"] for pool in pools]
+    return True
+
+
+def release(state, host):
+    """ Remove the slot of 'host' from 'state' """
+
+    state.setdefault("slots", {}).pop(host, None)
+
+
+class SlotFile(object):
+    """ Context manager which locks the slot file at 'path', creating its
+        directory if missing, and returns its state. The state is written
+        back on exit """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = None
+        self.state = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+        self.lock = open(self.path + ".lock", "a")
+        fcntl.flock(self.lock, fcntl.LOCK_EX)
+        try:
+            with open(self.path) as slot_file:
+                self.state = json.load(slot_file)
+        except (IOError, OSError, ValueError):
+            self.state = {}
+        return self.state
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w") as slot_file:
+                    json.dump(self.state, slot_file)
+                os.rename(tmp_path, self.path)
+        finally:
+            fcntl.flock(self.lock, fcntl.LOCK_UN)
+            self.lock.close()
+
+
+class ActionModule(RebootActionModule):
+    """ Reboot action limited by reboot slots and followed by a health gate
+    """
+
+    _VALID_ARGS = RebootActionModule._VALID_ARGS.union((
+        'slot_path', 'pools', 'slot_timeout', 'slot_poll', 'health_check',
+        'numa_hugepages', 'frequency'))
+
+    def _acquire(self, path, host, pools, timeout, poll):
+        """ Wait for a slot. Return seconds waited or raise RuntimeError if
+            the rollout is halted or 'timeout' expires """
+
+        start = time.time()
+        while True:
+            with SlotFile(path) as state:
+                if state.get("halted"):
+                    raise RuntimeError("Rollout halted: {halted}"
+                                       .format(halted=state["halted"]))
+                if try_acquire(state, host, pools):
+                    return int(time.time() - start)
+            if time.time() - start > timeout:
+                raise RuntimeError("No reboot slot free within {timeout} "
+                                   "seconds".format(timeout=timeout))
+            time.sleep(poll)
+
+    def _health_gate(self, health_check, numa_hugepages, frequency,
+                     task_vars):
+        """ Return error message if the kernel command line, hugepages or
+            SST-BF profile of the rebooted host are not as requested, else
+            None. The modules run with apply false so the gate only reads the
+            host and never repairs it """
+
+        result = self._execute_module(module_name='kernel_cmdline',
+                                      module_args=dict(health_check,
+                                                       apply=False),
+                                      task_vars=task_vars)
+        if result.get('failed'):
+            return result.get('msg', 'kernel_cmdline failed')
+        if result['reboot_required']:
+            return "Kernel parameters {reasons} differ after reboot".format(
+                reasons=", ".join(result['reboot_reasons']))
+        if result['hugepages_allocated'] != result['hugepages_requested']:
+            return "Hugepages allocated {allocated} differ from requested " \
+                   "{requested}".format(
+                       allocated=result['hugepages_allocated'],
+                       requested=result['hugepages_requested'])
+        if numa_hugepages:
+            result = self._execute_module(module_name='numa_hugepages',
+                                          module_args=dict(
+                                              hugepages=numa_hugepages,
+                                              apply=False),
+                                          task_vars=task_vars)
+            if result.get('failed'):
+                return result.get('msg', 'numa_hugepages failed')
+            if result['short']:
+                return "Hugepage pools {short} are short after reboot" \
+                    .format(short=", ".join(result['short']))
+        if not frequency:
+            return None
+        # Older Ansible releases only strip omit from top level arguments
+        frequency = dict((key, value) for key, value in frequency.items()
+                         if value != task_vars.get('omit'))
+        result = self._execute_module(module_name='sst_bf_frequency',
+                                      module_args=dict(frequency,
+                                                       apply=False),
+                                      task_vars=task_vars)
+        if result.get('failed'):
+            return "SST-BF profile was not applied at boot: {msg}".format(
+                msg=result.get('msg', 'sst_bf_frequency failed'))
+        return None
+
+    def run(self, tmp=None, task_vars=None):
+        if task_vars is None:
+            task_vars = {}
+        args = self._task.args
+        if self._task.check_mode or not args.get('slot_path'):
+            return super(ActionModule, self).run(tmp, task_vars)
+
+        host = task_vars['inventory_hostname']
+        pools = [dict(name=pool['name'],
+                      limit=resolve_limit(pool['limit'], pool['size']))
+                 for pool in args.get('pools', [])]
+        try:
+            slot_wait = self._acquire(args['slot_path'], host, pools,
+                                      int(args.get('slot_timeout', 7200)),
+                                      int(args.get('slot_poll', 5)))
+        except RuntimeError as err:
+            return dict(failed=True, rebooted=False, msg=str(err))
+        except (IOError, OSError) as err:
+            return dict(failed=True, rebooted=False,
+                        msg="Failed to lock reboot slots: {err}"
+                        .format(err=err))
+
+        error = None
+        try:
+            result = super(ActionModule, self).run(tmp, task_vars)
+            if result.get('failed'):
+                error = result.get('msg')
+            elif args.get('health_check'):
+                error = self._health_gate(args['health_check'],
+                                          args.get('numa_hugepages'),
+                                          args.get('frequency'), task_vars)
+                if error:
+                    result.update(failed=True, msg=error)
+        except Exception as err:
+            # e.g. the host did not come back, halt the other hosts as well
+            error = "Reboot failed: {err}".format(err=err)
+            raise
+        finally:
+            with SlotFile(args['slot_path']) as state:
+                release(state, host)
+                if error and not state.get("halted"):
+                    state["halted"] = "{host}: {error}".format(host=host,
+                                                               error=error)
+        result['slot_wait'] = slot_wait
+        return result
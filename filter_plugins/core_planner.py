@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Ansible filter which plans OVS-DPDK PMD and lcore core allocation from
+    the SST-BF topology fact in a single call """
+
+from ansible.errors import AnsibleFilterError
+
+# The boot CPU keeps timekeeping for CPUs in nohz_full, so the kernel never
+# lets it be isolated
+BOOT_CPU = 0
+
+
+class CorePlanner(object):
+    """ Allocate whole physical cores (SMT sibling groups) or single threads
+        from the high and normal priority tiers """
+
+    def __init__(self, topology, high_cores, normal_cores):
+        self.cpu_node = {}
+        self.siblings = {}
+        for cpu, info in topology["cpus"].items():
+            self.cpu_node[int(cpu)] = int(info["numa_node"])
+            self.siblings[int(cpu)] = [int(sib) for sib in info["siblings"]]
+        self.nodes = set(int(node) for node in topology["numa_nodes"])
+        self.free = {"high": set(int(cpu) for cpu in high_cores),
+                     "normal": set(int(cpu) for cpu in normal_cores)}
+
+    def _check_node(self, node):
+        """ Raise error if NUMA node 'node' does not exist """
+
+        if node not in self.nodes:
+            raise AnsibleFilterError("Numa node {node} does not exist"
+                                     .format(node=node))
+
+    def _free_groups(self, tier, node):
+        """ Return sibling groups on NUMA node 'node' whose threads are all
+            still free in 'tier', ordered by lowest CPU ID """
+
+        groups = []
+        for cpu in sorted(self.free[tier]):
+            group = self.siblings[cpu]
+            if self.cpu_node[cpu] != node or group in groups:
+                continue
+            if all(sibling in self.free[tier] for sibling in group):
+                groups.append(group)
+        return groups
+
+    def _take(self, tier, cpus):
+        """ Remove CPU IDs 'cpus' from free CPUs of 'tier' """
+
+        self.free[tier].difference_update(cpus)
+
+    def physical_cores(self, tier, node, count):
+        """ Allocate 'count' physical cores with all their threads from 'tier'
+            on NUMA node 'node' and return list of CPU IDs """
+
+        self._check_node(node)
+        groups = self._free_groups(tier, node)
+        if len(groups) < count:
+            raise AnsibleFilterError(
+                "Not enough {tier} priority cores available on NUMA node "
+                "{node}: requested {count} physical cores but only "
+                "{avail} are free".format(tier=tier, node=node, count=count,
+                                          avail=len(groups)))
+        cpus = [cpu for group in groups[:count] for cpu in group]
+        self._take(tier, cpus)
+        return cpus
+
+    def logical_cores(self, tier, node, count):
+        """ Allocate 'count' logical cores from 'tier' on NUMA node 'node',
+            taking whole physical cores first and single threads for the
+            remainder. Return list of CPU IDs """
+
+        self._check_node(node)
+        cpus = []
+        for group in self._free_groups(tier, node):
+            remaining = count - len(cpus)
+            if remaining <= 0:
+                break
+            cpus.extend(group if len(group) <= remaining
+                        else group[:remaining])
+        if len(cpus) < count:
+            raise AnsibleFilterError(
+                "Not enough {tier} priority cores available on NUMA node "
+                "{node}: requested {count} logical cores but only "
+                "{avail} are free".format(tier=tier, node=node, count=count,
+                                          avail=len(cpus)))
+        self._take(tier, cpus)
+        return cpus
+
+    def host_cores(self, tier, count):
+        """ Allocate the boot CPU if it is free in 'tier' and further logical
+            cores of 'tier' up to 'count' CPUs, preferring the siblings of
+            the boot CPU and then the lowest CPU IDs. Return list of CPU IDs
+        """
+
+        candidates = [BOOT_CPU] + self.siblings.get(BOOT_CPU, []) + \
+            sorted(self.free[tier])
+        cpus = []
+        for cpu in candidates:
+            if cpu not in self.free[tier] or cpu in cpus:
+                continue
+            if cpu == BOOT_CPU or len(cpus) < count:
+                cpus.append(cpu)
+        if len(cpus) < count:
+            raise AnsibleFilterError(
+                "Not enough {tier} priority cores are left for the host: "
+                "requested {count} logical cores but only {avail} are free"
+                .format(tier=tier, count=count, avail=len(cpus)))
+        self._take(tier, cpus)
+        return sorted(cpus)
+
+    def given_cores(self, tier, cpus):
+        """ Allocate CPU IDs 'cpus' from 'tier' and return them as list """
+
+        cpus = [int(cpu) for cpu in cpus]
+        taken = [cpu for cpu in cpus if cpu not in self.free[tier]]
+        if taken:
+            raise AnsibleFilterError(
+                "CPUs {cpus} are not free {tier} priority cores"
+                .format(cpus=",".join(str(cpu) for cpu in taken), tier=tier))
+        self._take(tier, cpus)
+        return cpus
+
+
+def lcore_numa_node(numa_nodes):
+    """ Return the NUMA node with most interfaces in 'numa_nodes', the
+        lowest one on a tie or if no node has interfaces """
+
+    counts = dict((int(node), len(conf.get("interfaces") or {}))
+                  for node, conf in numa_nodes.items())
+    return min(counts, key=lambda node: (-counts[node], node))
+
+
+def sst_bf_plan_cores(topology, high_cores, normal_cores, numa_nodes,
+                      pmd_high_priority=True, lcore_count=1, lcore_node=0,
+                      sst_bf_profile=None, lcore_cpus=None, host_cores=None):
+    """ Plan PMD cores per NUMA node (physical cores taken from
+        'numa_nodes[N].no_physical_cores_pinned') and the DPDK lcore cores,
+        which also run the non-PMD threads of ovs-vswitchd. Lcore cores are
+        the normal priority CPUs 'lcore_cpus' if given, else 'lcore_count'
+        logical cores of 'lcore_node', which is 'auto' for the NUMA node
+        with most interfaces. Return dict with pmd_cores, lcore_cores and the
+        remaining high_cores and normal_cores. The cores 'host_cores' reserved
+        for the host (see sst_bf_reserve_host_cores) are returned as
+        host_cores. If 'sst_bf_profile' is given the remaining cores are also
+        returned as dedicated_cores and shared_cores """
+
+    planner = CorePlanner(topology, high_cores, normal_cores)
+    pmd_tier = "high" if pmd_high_priority else "normal"
+
+    requested = dict((int(node), int(conf.get("no_physical_cores_pinned", 0)))
+                     for node, conf in numa_nodes.items())
+    if sum(requested.values()) < 1:
+        raise AnsibleFilterError("Please define one or more cores for pinning")
+
+    pmd_cores = []
+    for node in sorted(requested):
+        if requested[node] > 0:
+            pmd_cores.extend(planner.physical_cores(pmd_tier, node,
+                                                    requested[node]))
+    if lcore_cpus:
+        lcore_cores = planner.given_cores("normal", lcore_cpus)
+    else:
+        if lcore_node == "auto":
+            lcore_node = lcore_numa_node(numa_nodes)
+        lcore_cores = planner.logical_cores("normal", int(lcore_node),
+                                            int(lcore_count))
+
+    plan = {"pmd_cores": sorted(pmd_cores),
+            "lcore_cores": sorted(lcore_cores),
+            "high_cores": sorted(planner.free["high"]),
+            "normal_cores": sorted(planner.free["normal"]),
+            "host_cores": sorted(int(cpu) for cpu in host_cores or [])}
+    if sst_bf_profile:
+        if sst_bf_profile.endswith("_HIGH_DEDICATED"):
+            plan["dedicated_cores"] = plan["high_cores"]
+            plan["shared_cores"] = plan["normal_cores"]
+        else:
+            plan["dedicated_cores"] = plan["normal_cores"]
+            plan["shared_cores"] = plan["high_cores"]
+    return plan
+
+
+def sst_bf_reserve_host_cores(topology, high_cores, normal_cores,
+                              sst_bf_profile, count=1):
+    """ Reserve cores for the host out of the tier SST-BF profile
+        'sst_bf_profile' offers to dedicated guests: the boot CPU, which
+        keeps timekeeping and takes interrupts and kernel threads, and, as a
+        _HIGH_SHARED profile offers every normal priority core to dedicated
+        guests, 'count' normal priority logical cores in total. Return dict
+        with host_cores and the remaining high_cores and normal_cores """
+
+    planner = CorePlanner(topology, high_cores, normal_cores)
+    host_cores = []
+    if sst_bf_profile.endswith("_HIGH_DEDICATED"):
+        if BOOT_CPU in planner.free["high"]:
+            host_cores = planner.given_cores("high", [BOOT_CPU])
+    else:
+        host_cores = planner.host_cores("normal", int(count))
+    return {"host_cores": host_cores,
+            "high_cores": sorted(planner.free["high"]),
+            "normal_cores": sorted(planner.free["normal"])}
+
+
+def sst_bf_host_cores(plan):
+    """ Return the cores of core plan 'plan' reserved for the host and its
+        normal priority cores left after the PMD and lcore cores and not
+        offered to dedicated guests. These cores run the services of the
+        host. The list is empty if no such cores are left """
+
+    dedicated = set(plan.get("dedicated_cores", []))
+    cores = set(plan.get("host_cores", []))
+    cores.update(cpu for cpu in plan["normal_cores"] if cpu not in dedicated)
+    return sorted(cores)
+
+
+def sst_bf_isolation_cores(plan, isolation="pmd"):
+    """ Return dict with the CPUs of core plan 'plan' (see sst_bf_plan_cores,
+        planned with an SST-BF profile) to isolate from kernel noise and the
+        housekeeping CPUs left for the kernel. 'isolation' is none, pmd,
+        dedicated or both for the PMD cores, the cores of dedicated guests or
+        both. Housekeeping CPUs are the host cores (see sst_bf_host_cores)
+        and the boot CPU, which can not be isolated. They take interrupts,
+        unbound workqueues and kernel threads """
+
+    if isolation not in ("none", "pmd", "dedicated", "both"):
+        raise AnsibleFilterError("Invalid isolation '{isolation}'"
+                                 .format(isolation=isolation))
+    pmd_cores = set(int(cpu) for cpu in plan["pmd_cores"])
+    if isolation != "none" and BOOT_CPU in pmd_cores:
+        raise AnsibleFilterError("CPU {cpu} keeps timekeeping and can not be "
+                                 "a PMD core with isolation '{isolation}'"
+                                 .format(cpu=BOOT_CPU, isolation=isolation))
+    dedicated = set(int(cpu) for cpu in plan["dedicated_cores"])
+    if BOOT_CPU in dedicated:
+        raise AnsibleFilterError("CPU {cpu} takes interrupts and kernel "
+                                 "threads and can not be offered to dedicated "
+                                 "guests".format(cpu=BOOT_CPU))
+    isolated = set()
+    if isolation in ("pmd", "both"):
+        isolated.update(pmd_cores)
+    if isolation in ("dedicated", "both"):
+        isolated.update(dedicated)
+    if isolation != "none" and not isolated:
+        raise AnsibleFilterError("No CPUs are left to isolate for "
+                                 "'{isolation}'".format(isolation=isolation))
+    housekeeping = set(int(cpu) for cpu in sst_bf_host_cores(plan))
+    housekeeping.add(BOOT_CPU)
+    housekeeping = sorted(housekeeping - isolated - pmd_cores)
+    if not housekeeping:
+        raise AnsibleFilterError("No housekeeping CPUs are left for the "
+                                 "kernel")
+    return {"isolated": sorted(isolated), "housekeeping": housekeeping}
+
+
+class FilterModule(object):
+    """ SST-BF core planning filters """
+
+    def filters(self):
+        return {
+            'sst_bf_plan_cores': sst_bf_plan_cores,
+            'sst_bf_isolation_cores': sst_bf_isolation_cores,
+            'sst_bf_host_cores': sst_bf_host_cores,
+            'sst_bf_reserve_host_cores': sst_bf_reserve_host_cores,
+        }
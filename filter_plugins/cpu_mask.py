@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Ansible filters which convert between CPU ID lists, Linux CPU list syntax
+    (e.g '2-5,10-13'), hex CPU masks (e.g '0x3c3c') and the comma grouped
+    32-bit cpumask format used by /proc/irq and irqbalance
+    (e.g '00000000,00003c3c'). Masks are of arbitrary width """
+
+import os
+
+import ansible.module_utils
+from ansible.errors import AnsibleFilterError
+
+# The filters share the CPU list and mask code of the role modules, which
+# Ansible only puts on the module_utils path of modules
+MODULE_UTILS = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "module_utils")
+if MODULE_UTILS not in ansible.module_utils.__path__:
+    ansible.module_utils.__path__.append(MODULE_UTILS)
+
+from ansible.module_utils.sst_bf_sysfs import (SysfsError,  # noqa: E402
+                                               cpu_mask_value,
+                                               format_cpu_list,
+                                               format_cpu_mask,
+                                               parse_cpu_list,
+                                               parse_cpu_mask)
+
+
+def _convert(function, *args):
+    """ Return 'function' applied to 'args' and raise a filter error if the
+        input is invalid """
+
+    try:
+        return function(*args)
+    except SysfsError as err:
+        raise AnsibleFilterError(str(err))
+
+
+def cpu_list(cpus):
+    """ Convert Linux CPU list syntax, a single CPU ID or a list of either to
+        a sorted list of unique CPU IDs """
+
+    return _convert(parse_cpu_list, cpus)
+
+
+def cpu_range(cpus):
+    """ Convert CPU IDs to compressed Linux CPU list syntax """
+
+    return _convert(format_cpu_list, cpus)
+
+
+def cpu_mask(cpus):
+    """ Convert CPU IDs to a lower case hex mask with a leading '0x' """
+
+    return "0x{0:x}".format(_convert(cpu_mask_value, cpus))
+
+
+def cpu_mask_groups(cpus, min_groups=1):
+    """ Convert CPU IDs to comma grouped 32-bit hex words, most significant
+        word first. Argument 'min_groups' pads the mask with leading zero
+        words, e.g to the width the kernel uses for the host's CPU count """
+
+    return _convert(format_cpu_mask, cpus, min_groups)
+
+
+def cpu_mask_list(mask):
+    """ Convert a hex mask, with or without leading '0x', or a comma grouped
+        32-bit mask to a sorted list of CPU IDs """
+
+    return _convert(parse_cpu_mask, mask)
+
+
+class FilterModule(object):
+    """ CPU list and mask filters """
+
+    def filters(self):
+        return {
+            'cpu_list': cpu_list,
+            'cpu_range': cpu_range,
+            'cpu_mask': cpu_mask,
+            'cpu_mask_groups': cpu_mask_groups,
+            'cpu_mask_list': cpu_mask_list,
+        }
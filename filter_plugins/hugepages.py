@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Ansible filter which collects the hugepage targets of the NUMA nodes of
+    the host description for module numa_hugepages """
+
+# NUMA node keys of the host description and the hugepage size they set
+NODE_HUGEPAGE_KEYS = (("hugepages_1g", "1G"), ("hugepages_2m", "2M"))
+
+
+def sst_bf_numa_hugepages(numa_nodes):
+    """ Return dict which maps hugepage size (1G or 2M) to a dict of NUMA
+        node and number of pages. A size is only present if a node of
+        'numa_nodes' sets it, other nodes get no pages of that size """
+
+    hugepages = {}
+    for key, size in NODE_HUGEPAGE_KEYS:
+        if any(key in conf for conf in numa_nodes.values()):
+            hugepages[size] = dict((int(node), int(conf.get(key, 0)))
+                                   for node, conf in numa_nodes.items())
+    return hugepages
+
+
+class FilterModule(object):
+    """ Hugepage filters """
+
+    def filters(self):
+        return {
+            'sst_bf_numa_hugepages': sst_bf_numa_hugepages,
+        }
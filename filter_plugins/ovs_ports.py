@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Ansible filters which place the interfaces of the host description on
+    NUMA nodes and build the Open vSwitch bridges and DPDK ports for module
+    ovs_bridges """
+
+import os
+
+import ansible.module_utils
+from ansible.errors import AnsibleFilterError
+
+# The filters share the Interface keys which module ovs_bridges manages,
+# Ansible only puts the role module_utils on the module_utils path of modules
+MODULE_UTILS = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "module_utils")
+if MODULE_UTILS not in ansible.module_utils.__path__:
+    ansible.module_utils.__path__.append(MODULE_UTILS)
+
+from ansible.module_utils.sst_bf_ovs import QUEUE_OPTIONS  # noqa: E402
+
+
+def pmd_threads_per_node(topology, pmd_cores):
+    """ Return dict which maps NUMA node to the number of PMD threads on it """
+
+    threads = {}
+    for cpu in pmd_cores or []:
+        node = int(topology["cpus"][str(cpu)]["numa_node"])
+        threads[node] = threads.get(node, 0) + 1
+    return threads
+
+
+def port_options(name, interface, node, pmd_threads, rxq_auto):
+    """ Return Interface options of DPDK port 'name' on NUMA node 'node' from
+        its host description 'interface' """
+
+    options = dict(interface.get("options") or {})
+    options["dpdk-devargs"] = interface["pci_address"]
+    for key in QUEUE_OPTIONS:
+        if key in interface:
+            options[key] = interface[key]
+    if options.get("n_rxq") == "auto" or ("n_rxq" not in options and
+                                          rxq_auto):
+        if pmd_threads is None:
+            raise AnsibleFilterError("n_rxq of interface {name} is auto but "
+                                     "no PMD cores are given"
+                                     .format(name=name))
+        options["n_rxq"] = max(1, pmd_threads.get(node, 0))
+    return dict((key, str(value)) for key, value in options.items())
+
+
+def sst_bf_bridge_ports(host_description, interface_type="dpdk",
+                        topology=None, pmd_cores=None, rxq_auto=False):
+    """ Return dict which maps each bridge of 'bridge_mappings' to a list of
+        ports (dicts with keys name, type, options and columns). The PCI
+        address, queue settings, MTU and additional options of each interface
+        are looked up in the interfaces of 'numa_nodes'. An n_rxq of 'auto',
+        or no n_rxq if 'rxq_auto' is true, is set to the number of PMD threads
+        ('pmd_cores' located with 'topology') on the NUMA node of the
+        interface """
+
+    interfaces = {}
+    for node, conf in host_description["numa_nodes"].items():
+        for name, interface in (conf.get("interfaces") or {}).items():
+            interfaces[name] = (int(node), interface)
+    pmd_threads = None
+    if topology is not None and pmd_cores is not None:
+        pmd_threads = pmd_threads_per_node(topology, pmd_cores)
+
+    bridges = {}
+    for bridge, names in host_description["bridge_mappings"].items():
+        ports = []
+        for name in names:
+            if name not in interfaces:
+                raise AnsibleFilterError("Interface {name} of bridge {bridge} "
+                                         "is not defined in numa_nodes"
+                                         .format(name=name, bridge=bridge))
+            node, interface = interfaces[name]
+            columns = {}
+            if interface.get("mtu"):
+                columns["mtu_request"] = int(interface["mtu"])
+            ports.append({"name": name, "type": interface_type,
+                          "options": port_options(name, interface, node,
+                                                  pmd_threads, rxq_auto),
+                          "columns": columns})
+        bridges[bridge] = ports
+    return bridges
+
+
+def sst_bf_declared_interfaces(host_description):
+    """ Return dict which maps every interface of the host description to a
+        dict with its pci_address and numa_node, the NUMA node it is
+        declared on. Interfaces of host_description.interfaces have no
+        numa_node """
+
+    declared = {}
+    for name, interface in (host_description.get("interfaces") or
+                            {}).items():
+        declared[name] = {"pci_address": interface["pci_address"]}
+    for node, conf in (host_description.get("numa_nodes") or {}).items():
+        for name, interface in (conf.get("interfaces") or {}).items():
+            declared[name] = {"pci_address": interface["pci_address"],
+                              "numa_node": int(node)}
+    return declared
+
+
+def sst_bf_place_interfaces(host_description, located, topology,
+                            pmd_cores, socket_mem):
+    """ Return numa_nodes for every NUMA node of 'topology' with each
+        interface of the host description moved to the NUMA node of its PCI
+        device ('located', see module pci_numa). Nodes with interfaces get
+        'pmd_cores' physical PMD cores and 'socket_mem' MB DPDK socket
+        memory, other nodes none, unless numa_nodes of the host description
+        sets no_physical_cores_pinned or dpdk_socket_mem for the node.
+        Interfaces without NUMA affinity are placed on the first node """
+
+    nodes = sorted(int(node) for node in topology["numa_nodes"])
+    interfaces = dict(host_description.get("interfaces") or {})
+    declared = {}
+    for node, conf in (host_description.get("numa_nodes") or {}).items():
+        interfaces.update(conf.get("interfaces") or {})
+        declared[int(node)] = conf
+
+    placed = dict((node, {}) for node in nodes)
+    for name, interface in interfaces.items():
+        node = located[name]["numa_node"]
+        if node is None:
+            node = nodes[0]
+        if node not in placed:
+            raise AnsibleFilterError("Interface {name} is local to NUMA node "
+                                     "{node} which has no CPUs"
+                                     .format(name=name, node=node))
+        placed[node][name] = interface
+
+    numa_nodes = {}
+    for node in nodes:
+        conf = declared.get(node, {})
+        local = bool(placed[node])
+        numa_nodes[node] = {
+            "dpdk_socket_mem": int(conf.get("dpdk_socket_mem",
+                                            socket_mem if local else 0)),
+            "no_physical_cores_pinned": int(conf.get(
+                "no_physical_cores_pinned", pmd_cores if local else 0))}
+        if local:
+            numa_nodes[node]["interfaces"] = placed[node]
+    return numa_nodes
+
+
+class FilterModule(object):
+    """ Open vSwitch port filters """
+
+    def filters(self):
+        return {
+            'sst_bf_bridge_ports': sst_bf_bridge_ports,
+            'sst_bf_declared_interfaces': sst_bf_declared_interfaces,
+            'sst_bf_place_interfaces': sst_bf_place_interfaces,
+        }
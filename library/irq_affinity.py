@@ -0,0 +1,120 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: irq_affinity
+short_description: Steer interrupts onto housekeeping CPUs
+description:
+  - Sets C(smp_affinity_list) of every interrupt which may run outside the
+    housekeeping CPUs to these CPUs and sets C(default_smp_affinity) for
+    interrupts requested later. Interrupts the kernel refuses to move, such
+    as per-CPU and managed interrupts, are reported as unmovable.
+  - Reports the interrupts still delivered to other CPUs, read from
+    C(effective_affinity_list) where the kernel provides it.
+options:
+  housekeeping:
+    description:
+      - CPU IDs which may handle interrupts.
+    required: true
+  apply:
+    description:
+      - Move the interrupts. If false only report them.
+    type: bool
+    default: true
+  proc_root:
+    description:
+      - Root of the proc tree. Override to run against a fake tree.
+    default: /proc
+'''
+
+EXAMPLES = '''
+- name: Steer interrupts onto CPUs 0 and 2
+  irq_affinity:
+    housekeeping: [0, 2]
+  register: irq_affinity
+'''
+
+RETURN = '''
+moved:
+  description: Interrupts whose affinity was set to the housekeeping CPUs
+  returned: success
+  type: list
+  sample: [24, 25]
+unmovable:
+  description: Interrupts the kernel refused to move
+  returned: success
+  type: list
+  sample: [0]
+protected:
+  description: Interrupts delivered to CPUs other than the housekeeping
+               CPUs, with these CPUs and the devices using the interrupt
+  returned: success
+  type: list
+  sample: [{"irq": 0, "cpus": "1", "actions": ["timer"]}]
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_irq import protected_irqs, steer_irqs
+from ansible.module_utils.sst_bf_sysfs import (SysfsError, format_cpu_mask,
+                                               read_sysfs, write_sysfs)
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            housekeeping=dict(type='list', required=True),
+            apply=dict(type='bool', default=True),
+            proc_root=dict(type='path', default='/proc'),
+        ),
+        supports_check_mode=True,
+    )
+    root = module.params['proc_root']
+    try:
+        housekeeping = [int(cpu) for cpu in module.params['housekeeping']]
+    except ValueError as err:
+        module.fail_json(msg="Invalid housekeeping CPU: {err}"
+                         .format(err=err))
+    if not housekeeping:
+        module.fail_json(msg="No housekeeping CPUs given")
+
+    dry_run = module.check_mode or not module.params['apply']
+    try:
+        moved, unmovable = steer_irqs(root, housekeeping, dry_run)
+        default_mask = format_cpu_mask(housekeeping)
+        current_mask = read_sysfs(root, "irq", "default_smp_affinity")
+        default_changed = current_mask is not None and \
+            int(current_mask.replace(",", ""), 16) != \
+            int(default_mask.replace(",", ""), 16)
+        if default_changed and not dry_run:
+            write_sysfs(root, default_mask, "irq", "default_smp_affinity")
+        protected = protected_irqs(root, housekeeping)
+    except (SysfsError, ValueError) as err:
+        module.fail_json(msg=str(err))
+
+    module.exit_json(changed=module.params['apply'] and
+                     bool(moved or default_changed),
+                     moved=moved, unmovable=unmovable, protected=protected)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: kernel_cmdline
+short_description: Set kernel parameters in GRUB and decide if a reboot is
+                   required
+description:
+  - Replaces the parameters whose key is in I(managed) in
+    C(GRUB_CMDLINE_LINUX) with I(params). The line is added if missing and
+    the file is written atomically.
+  - Compares I(params) with the command line of the running kernel. A
+    reboot is required only if a managed parameter differs which takes
+    effect at boot only.
+  - Hugepages of a size in I(runtime_hugepage_sizes) are allocated at
+    runtime through sysfs instead. A reboot is required if the kernel could
+    not allocate all of them.
+options:
+  path:
+    description:
+      - GRUB defaults file. It must exist and must not be a symbolic link.
+    default: /etc/default/grub
+  params:
+    description:
+      - Kernel parameters in command line order, e.g. C(hugepagesz=2M)
+        followed by C(hugepages=1024).
+    required: true
+  managed:
+    description:
+      - Keys of the kernel parameters owned by the role.
+    required: true
+  apply:
+    description:
+      - Write GRUB and allocate runtime hugepages. If false only compare the
+        host with I(params), e.g. to verify it after a reboot.
+    type: bool
+    default: true
+  runtime_hugepage_sizes:
+    description:
+      - Hugepage sizes allocated at runtime instead of requiring a reboot.
+    default: [2M]
+  proc_cmdline:
+    description:
+      - Command line of the running kernel.
+    default: /proc/cmdline
+  sysfs_root:
+    description:
+      - Root of the sysfs tree. Override to run against a fake tree.
+    default: /sys
+'''
+
+EXAMPLES = '''
+- name: Plan kernel command line
+  kernel_cmdline:
+    params: ["hugepagesz=2M", "hugepages=2048", "isolcpus=2-5"]
+    managed: ["hugepagesz", "hugepages", "isolcpus"]
+  register: kernel_cmdline
+'''
+
+RETURN = '''
+grub_changed:
+  description: Whether GRUB_CMDLINE_LINUX was changed and GRUB needs to be
+               regenerated
+  returned: success
+  type: bool
+reboot_required:
+  description: Whether the running kernel differs from I(params) in a
+               parameter which takes effect at boot only
+  returned: success
+  type: bool
+reboot_reasons:
+  description: Parameters which require a reboot
+  returned: success
+  type: list
+  sample: ["isolcpus", "hugepages-1048576kB"]
+hugepages:
+  description: Hugepages allocated at runtime, by size in kB
+  returned: success
+  type: dict
+  sample: {"2048": 2048}
+hugepages_requested:
+  description: Hugepages requested by I(params), by size in kB
+  returned: success
+  type: dict
+  sample: {"1048576": 16, "2048": 2048}
+hugepages_allocated:
+  description: Hugepages allocated by the kernel for each requested size, by
+               size in kB
+  returned: success
+  type: dict
+  sample: {"1048576": 16, "2048": 2048}
+'''
+
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_cmdline import (CmdlineError,
+                                                 hugepage_counts,
+                                                 hugepage_size_kb, plan_boot,
+                                                 set_grub_cmdline)
+from ansible.module_utils.sst_bf_sysfs import (HUGEPAGE_DIR, SysfsError,
+                                               read_sysfs_int, write_atomic,
+                                               write_sysfs)
+
+
+def hugepage_parts(size):
+    """ Return sysfs path parts of the number of hugepages of 'size' kB """
+
+    return (HUGEPAGE_DIR, "hugepages-{size}kB".format(size=size),
+            "nr_hugepages")
+
+
+def allocate_hugepages(module, size, count):
+    """ Set the number of hugepages of 'size' kB to 'count'. Return tuple
+        (changed, allocated) """
+
+    root = module.params['sysfs_root']
+    parts = hugepage_parts(size)
+    current = read_sysfs_int(root, *parts)
+    if current is None:
+        module.fail_json(msg="Hugepage size {size}kB is not supported"
+                         .format(size=size))
+    if current == count or not module.params['apply']:
+        return False, current
+    if module.check_mode:
+        return True, count
+    write_sysfs(root, count, *parts)
+    return True, read_sysfs_int(root, *parts)
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            path=dict(type='path', default='/etc/default/grub'),
+            params=dict(type='list', required=True),
+            managed=dict(type='list', required=True),
+            apply=dict(type='bool', default=True),
+            runtime_hugepage_sizes=dict(type='list', default=['2M']),
+            proc_cmdline=dict(type='path', default='/proc/cmdline'),
+            sysfs_root=dict(type='path', default='/sys'),
+        ),
+        supports_check_mode=True,
+    )
+    path = module.params['path']
+    params = [str(param) for param in module.params['params']]
+    managed = module.params['managed']
+
+    if not os.path.exists(path):
+        module.fail_json(msg="GRUB file '{path}' does not exist"
+                         .format(path=path))
+    if os.path.islink(path):
+        module.fail_json(msg="Possible symbolic link attack on file "
+                             "'{path}'".format(path=path))
+
+    with open(path) as grub_file:
+        before = grub_file.read()
+    with open(module.params['proc_cmdline']) as cmdline_file:
+        running = cmdline_file.read().split()
+
+    try:
+        after = "\n".join(set_grub_cmdline(before.splitlines(), params,
+                                           managed)) + "\n"
+        runtime_sizes = [hugepage_size_kb(size) for size
+                         in module.params['runtime_hugepage_sizes']]
+        reasons, runtime = plan_boot(running, params, managed, runtime_sizes)
+        requested = hugepage_counts(params)
+    except CmdlineError as err:
+        module.fail_json(msg=str(err))
+
+    grub_changed = after != before
+    if grub_changed and module.params['apply'] and not module.check_mode:
+        write_atomic(module, path, after)
+
+    hugepages = {}
+    changed = grub_changed and module.params['apply']
+    for size, count in sorted(runtime.items()):
+        try:
+            allocated_changed, allocated = allocate_hugepages(module, size,
+                                                              count)
+        except SysfsError as err:
+            module.fail_json(msg=str(err))
+        changed = changed or allocated_changed
+        hugepages[str(size)] = allocated
+        if allocated != count:
+            reasons.append("hugepages-{size}kB".format(size=size))
+
+    allocated = {}
+    for size in requested:
+        try:
+            allocated[str(size)] = read_sysfs_int(module.params['sysfs_root'],
+                                                  *hugepage_parts(size))
+        except SysfsError as err:
+            module.fail_json(msg=str(err))
+
+    module.exit_json(changed=changed, grub_changed=grub_changed,
+                     reboot_required=bool(reasons), reboot_reasons=reasons,
+                     hugepages=hugepages,
+                     hugepages_requested=dict((str(size), count) for size,
+                                              count in requested.items()),
+                     hugepages_allocated=allocated,
+                     diff=dict(before=before, after=after,
+                               before_header=path, after_header=path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: nova_cpu_config
+short_description: Configure Nova CPU sets for an SST-BF profile
+description:
+  - Sets C(cpu_dedicated_set) and C(cpu_shared_set) under C([compute]) and
+    optionally C(cpu_allocation_ratio) under C([DEFAULT]) in a single pass.
+  - Keys are updated in place, missing keys are inserted directly after their
+    section header and definitions of the keys in other sections are removed.
+    Unrelated content and comments are preserved.
+  - The file is written atomically with a temporary file and a rename.
+options:
+  path:
+    description:
+      - Nova configuration file. It must exist and must not be a symbolic
+        link.
+    required: true
+  profile:
+    description:
+      - SST-BF profile which decides whether the high or the normal priority
+        cores are dedicated.
+    required: true
+    choices: [FREQUENCY_FIXED_HIGH_DEDICATED, FREQUENCY_FIXED_HIGH_SHARED,
+              FREQUENCY_VAR_HIGH_DEDICATED, FREQUENCY_VAR_HIGH_SHARED]
+  high_cores:
+    description:
+      - High priority CPU IDs as a list or in Linux CPU list syntax.
+    required: true
+  normal_cores:
+    description:
+      - Normal priority CPU IDs as a list or in Linux CPU list syntax.
+    required: true
+  cpu_allocation_ratio:
+    description:
+      - VCPU allocation ratio. Left untouched if not set.
+'''
+
+EXAMPLES = '''
+- name: Configure Nova CPU sets
+  nova_cpu_config:
+    path: /etc/nova/nova-cpu.conf
+    profile: FREQUENCY_FIXED_HIGH_DEDICATED
+    high_cores: "{{ high_cores_l }}"
+    normal_cores: "{{ normal_cores_l }}"
+    cpu_allocation_ratio: 1.0
+'''
+
+RETURN = '''
+changed_keys:
+  description: Keys whose value, position or duplicates changed
+  returned: success
+  type: list
+  sample: ["cpu_dedicated_set"]
+dedicated_set:
+  description: Value of cpu_dedicated_set in Linux CPU list syntax
+  returned: success
+  type: str
+  sample: "1,3,5-7"
+shared_set:
+  description: Value of cpu_shared_set in Linux CPU list syntax
+  returned: success
+  type: str
+  sample: "0,2,4"
+'''
+
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_nova import (HIGH_DEDICATED_PROFILES,
+                                              HIGH_SHARED_PROFILES,
+                                              profile_cpu_sets, set_options)
+from ansible.module_utils.sst_bf_sysfs import (SysfsError, format_cpu_list,
+                                               parse_cpu_list, write_atomic)
+
+
+def cpu_set(module, name):
+    """ Return module parameter 'name' in compressed Linux CPU list syntax """
+
+    try:
+        cpus = parse_cpu_list(",".join(str(cpu) for cpu
+                                       in module.params[name]))
+    except SysfsError as err:
+        module.fail_json(msg="Invalid {name}: {err}"
+                         .format(name=name, err=err))
+    if not cpus:
+        module.fail_json(msg="Variable '{name}' is empty".format(name=name))
+    return format_cpu_list(cpus)
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            path=dict(type='path', required=True),
+            profile=dict(type='str', required=True,
+                         choices=list(HIGH_DEDICATED_PROFILES +
+                                      HIGH_SHARED_PROFILES)),
+            high_cores=dict(type='list', required=True),
+            normal_cores=dict(type='list', required=True),
+            cpu_allocation_ratio=dict(type='float'),
+        ),
+        supports_check_mode=True,
+    )
+    path = module.params['path']
+
+    if not os.path.exists(path):
+        module.fail_json(msg="Nova configuration file not available")
+    if os.path.islink(path):
+        module.fail_json(msg="Possible symbolic link attack detected")
+
+    dedicated, shared = profile_cpu_sets(module.params['profile'],
+                                         cpu_set(module, 'high_cores'),
+                                         cpu_set(module, 'normal_cores'))
+    options = [("compute", "cpu_dedicated_set", dedicated),
+               ("compute", "cpu_shared_set", shared)]
+    if module.params['cpu_allocation_ratio'] is not None:
+        options.append(("DEFAULT", "cpu_allocation_ratio",
+                        module.params['cpu_allocation_ratio']))
+
+    with open(path) as conf_file:
+        before = conf_file.read()
+    lines, changed_keys = set_options(before.splitlines(), options)
+    after = "\n".join(lines) + "\n"
+    changed = bool(changed_keys)
+
+    if changed and not module.check_mode:
+        write_atomic(module, path, after)
+
+    module.exit_json(changed=changed, changed_keys=changed_keys,
+                     dedicated_set=dedicated, shared_set=shared,
+                     diff=dict(before=before, after=after,
+                               before_header=path, after_header=path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: numa_hugepages
+short_description: Allocate hugepages per NUMA node
+description:
+  - Sets C(nodeN/hugepages/hugepages-<size>kB/nr_hugepages) of every NUMA
+    node to the requested number of pages. Pools which shrink are written
+    before pools which grow.
+  - Reports the pools the kernel could not allocate completely, e.g. 1 GB
+    pages due to memory fragmentation.
+options:
+  hugepages:
+    description:
+      - Dict which maps hugepage size (e.g. 1G or 2M) to a dict of NUMA node
+        and number of pages.
+    required: true
+  apply:
+    description:
+      - Write the pools. If false only report the pages they hold, e.g. to
+        verify them after a reboot.
+    type: bool
+    default: true
+  sysfs_root:
+    description:
+      - Root of the sysfs tree. Override to run against a fake tree.
+    default: /sys
+'''
+
+EXAMPLES = '''
+- name: Allocate 1 GB hugepages on NUMA node 0 only
+  numa_hugepages:
+    hugepages:
+      1G: {0: 8, 1: 0}
+'''
+
+RETURN = '''
+hugepages:
+  description: Hugepages allocated by the kernel, by size and NUMA node
+  returned: success
+  type: dict
+  sample: {"1G": {"0": 8, "1": 0}}
+short:
+  description: Pools with fewer pages than requested
+  returned: success
+  type: list
+  sample: ["node0/hugepages-1048576kB"]
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_cmdline import CmdlineError, hugepage_size_kb
+from ansible.module_utils.sst_bf_sysfs import (SysfsError,
+                                               read_node_hugepages,
+                                               set_node_hugepages)
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            hugepages=dict(type='dict', required=True),
+            apply=dict(type='bool', default=True),
+            sysfs_root=dict(type='path', default='/sys'),
+        ),
+        supports_check_mode=True,
+    )
+
+    try:
+        sizes = dict((size, hugepage_size_kb(size))
+                     for size in module.params['hugepages'])
+        targets = dict((sizes[size], dict((int(node), int(count))
+                                          for node, count in nodes.items()))
+                       for size, nodes in module.params['hugepages'].items())
+        if module.params['apply']:
+            changed, allocated = set_node_hugepages(
+                module.params['sysfs_root'], targets, module.check_mode)
+        else:
+            changed, allocated = False, {}
+            for (size_kb, node), count in read_node_hugepages(
+                    module.params['sysfs_root'], targets).items():
+                allocated.setdefault(size_kb, {})[node] = count
+    except (CmdlineError, SysfsError, ValueError) as err:
+        module.fail_json(msg=str(err))
+
+    short = sorted("node{node}/hugepages-{size}kB".format(node=node,
+                                                          size=size_kb)
+                   for size_kb, nodes in allocated.items()
+                   for node, count in nodes.items()
+                   if count < targets[size_kb][node])
+    module.exit_json(changed=changed, short=short,
+                     hugepages=dict((size, dict(
+                         (str(node), count)
+                         for node, count in allocated[sizes[size]].items()))
+                                    for size in sizes))
+
+
+if __name__ == '__main__':
+    main()
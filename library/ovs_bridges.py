@@ -0,0 +1,159 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: ovs_bridges
+short_description: Reconcile Open vSwitch bridges and DPDK ports
+description:
+  - Reads the Bridge, Port and Interface tables once and creates, updates
+    or removes bridges and ports so they match I(bridges). Every change is
+    applied in a single OVSDB transaction.
+  - Bridges created by this module are tagged with external_ids key
+    I(marker). Tagged bridges which are no longer in I(bridges) are
+    removed, as are ports of I(interface_type) which are not in I(bridges).
+    Other bridges and ports are left untouched.
+options:
+  bridges:
+    description:
+      - Dict which maps bridge name to a list of ports. Each port is a dict
+        with keys name, type, options (e.g. dpdk-devargs or n_rxq) and
+        columns, further Interface columns such as mtu_request.
+    required: true
+  datapath_type:
+    description:
+      - Datapath type of the bridges.
+    default: netdev
+  fail_mode:
+    description:
+      - Fail mode of the bridges.
+    default: secure
+  interface_type:
+    description:
+      - Type of the ports owned by this module.
+    default: dpdk
+  marker:
+    description:
+      - external_ids key which tags bridges owned by this module.
+    default: sst-bf-managed
+'''
+
+EXAMPLES = '''
+- name: Setup network provider bridges and ports
+  ovs_bridges:
+    bridges:
+      br-phy:
+        - name: eno1
+          type: dpdk
+          options:
+            dpdk-devargs: "0000:af:00.0"
+            n_rxq: "4"
+          columns:
+            mtu_request: 9000
+'''
+
+RETURN = '''
+bridges_added:
+  description: Bridges which were created
+  returned: success
+  type: list
+bridges_updated:
+  description: Bridges whose datapath type or fail mode was changed
+  returned: success
+  type: list
+bridges_removed:
+  description: Tagged bridges which were removed
+  returned: success
+  type: list
+ports_added:
+  description: Ports which were added or moved to another bridge
+  returned: success
+  type: list
+ports_updated:
+  description: Ports whose interface type, options or columns were changed
+  returned: success
+  type: list
+ports_removed:
+  description: Ports which were removed
+  returned: success
+  type: list
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_ovs import (OvsError, parse_lists,
+                                             plan_bridges, transaction)
+
+TABLES = (("Bridge", "name,ports,datapath_type,fail_mode,external_ids"),
+          ("Port", "_uuid,name,interfaces"),
+          ("Interface", "_uuid,name,type,options,mtu_request"))
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            bridges=dict(type='dict', required=True),
+            datapath_type=dict(type='str', default='netdev'),
+            fail_mode=dict(type='str', default='secure'),
+            interface_type=dict(type='str', default='dpdk'),
+            marker=dict(type='str', default='sst-bf-managed'),
+        ),
+        supports_check_mode=True,
+    )
+
+    args = ["ovs-vsctl", "--format=json"]
+    for table, columns in TABLES:
+        args.extend(["--", "--columns=" + columns, "list", table])
+    rc, out, err = module.run_command(args)
+    if rc != 0:
+        module.fail_json(msg="Failed to read bridges: {err}"
+                         .format(err=err.strip()))
+    try:
+        bridges, ports, interfaces = parse_lists(out)
+    except (OvsError, ValueError) as err:
+        module.fail_json(msg=str(err))
+
+    desired = {}
+    for bridge, bridge_ports in module.params['bridges'].items():
+        desired[bridge] = [dict(name=port['name'],
+                                type=port.get('type',
+                                              module.params['interface_type']),
+                                options=dict((key, str(value)) for key, value
+                                             in (port.get('options') or
+                                                 {}).items()),
+                                columns=port.get('columns') or {})
+                           for port in bridge_ports]
+    commands, changes = plan_bridges(bridges, ports, interfaces, desired,
+                                     module.params['datapath_type'],
+                                     module.params['fail_mode'],
+                                     module.params['interface_type'],
+                                     module.params['marker'])
+    if commands and not module.check_mode:
+        rc, _, err = module.run_command(["ovs-vsctl"] + transaction(commands))
+        if rc != 0:
+            module.fail_json(msg="Failed to reconcile bridges: {err}"
+                             .format(err=err.strip()), **changes)
+
+    module.exit_json(changed=bool(commands), **changes)
+
+
+if __name__ == '__main__':
+    main()
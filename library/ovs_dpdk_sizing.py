@@ -0,0 +1,150 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: ovs_dpdk_sizing
+short_description: Recommend OVS-DPDK socket memory, hugepages and PMD cores
+description:
+  - Sizes the DPDK socket memory, 1 GB hugepages and physical PMD cores of
+    every NUMA node from the interfaces placed on the node (their rx queues,
+    descriptors and MTU), the expected vhost-user ports and the memory of
+    the node read from C(nodeN/meminfo). Changes nothing on the host.
+options:
+  numa_nodes:
+    description:
+      - numa_nodes of the host description, with the interfaces of each
+        node.
+    required: true
+  threads_per_core:
+    description:
+      - Threads of each physical core.
+    default: 1
+  rxqs_per_pmd:
+    description:
+      - Rx queues polled by each PMD thread.
+    default: 2
+  vhost_ports:
+    description:
+      - Expected vhost-user ports of each NUMA node unless the node sets
+        vhost_ports.
+    default: 0
+  guest_hugepages_gb:
+    description:
+      - 1 GB hugepages of each NUMA node for guests, in addition to the
+        DPDK socket memory.
+    default: 0
+  rxq_auto:
+    description:
+      - Interfaces without n_rxq get one rx queue per PMD thread of their
+        node.
+    type: bool
+    default: false
+  max_fraction:
+    description:
+      - Fraction of the memory of a NUMA node which may be reserved as
+        hugepages.
+    default: 0.9
+  fail_on_overcommit:
+    description:
+      - Fail instead of warn if the hugepages of a NUMA node exceed
+        I(max_fraction) of its memory.
+    type: bool
+    default: false
+  sysfs_root:
+    description:
+      - Root of the sysfs tree. Override to run against a fake tree.
+    default: /sys
+'''
+
+EXAMPLES = '''
+- name: Size OVS-DPDK
+  ovs_dpdk_sizing:
+    numa_nodes: "{{ host_description['numa_nodes'] }}"
+    threads_per_core: 2
+    vhost_ports: 8
+  register: ovs_dpdk_sizing
+'''
+
+RETURN = '''
+numa_nodes:
+  description: Dict which maps NUMA node to recommended dpdk_socket_mem (MB),
+               no_physical_cores_pinned and hugepages_1g
+  returned: success
+  type: dict
+  sample: {"0": {"dpdk_socket_mem": 1024, "no_physical_cores_pinned": 1,
+                 "hugepages_1g": 1}}
+nr_1g_pages:
+  description: Recommended 1 GB hugepages of the host
+  returned: success
+  type: int
+memory_mb:
+  description: Dict which maps NUMA node to its total memory in MB
+  returned: success
+  type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_sizing import node_memory_mb, size_dpdk
+from ansible.module_utils.sst_bf_sysfs import SysfsError
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            numa_nodes=dict(type='dict', required=True),
+            threads_per_core=dict(type='int', default=1),
+            rxqs_per_pmd=dict(type='int', default=2),
+            vhost_ports=dict(type='int', default=0),
+            guest_hugepages_gb=dict(type='int', default=0),
+            rxq_auto=dict(type='bool', default=False),
+            max_fraction=dict(type='float', default=0.9),
+            fail_on_overcommit=dict(type='bool', default=False),
+            sysfs_root=dict(type='path', default='/sys'),
+        ),
+        supports_check_mode=True,
+    )
+
+    try:
+        memory = node_memory_mb(module.params['sysfs_root'])
+    except SysfsError as err:
+        module.fail_json(msg=str(err))
+
+    plan, warnings = size_dpdk(module.params['numa_nodes'], memory,
+                               module.params['threads_per_core'],
+                               module.params['rxqs_per_pmd'],
+                               module.params['vhost_ports'],
+                               module.params['guest_hugepages_gb'],
+                               module.params['rxq_auto'],
+                               module.params['max_fraction'])
+    result = dict(changed=False, numa_nodes=plan, memory_mb=memory,
+                  nr_1g_pages=sum(node['hugepages_1g']
+                                  for node in plan.values()))
+    if warnings and module.params['fail_on_overcommit']:
+        module.fail_json(msg=". ".join(warnings), **result)
+    for warning in warnings:
+        module.warn(warning)
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
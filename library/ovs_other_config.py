@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: ovs_other_config
+short_description: Set Open vSwitch other_config keys in one transaction
+description:
+  - Reads C(other_config) of the Open_vSwitch table once and applies every
+    key which differs from I(other_config) in a single OVSDB transaction.
+    Nothing is written if every key is already set.
+  - Reports whether a changed key is only read when ovs-vswitchd initialises
+    DPDK, in which case ovs-vswitchd needs a restart.
+options:
+  other_config:
+    description:
+      - Keys and values to set. A value of null removes the key.
+    required: true
+  restart_keys:
+    description:
+      - Keys which require a restart of ovs-vswitchd when changed. Defaults
+        to the DPDK EAL options such as dpdk-init, dpdk-lcore-mask and
+        dpdk-socket-mem.
+'''
+
+EXAMPLES = '''
+- name: Configure OVS-DPDK
+  ovs_other_config:
+    other_config:
+      dpdk-init: "true"
+      pmd-cpu-mask: "0x3c"
+  register: ovs_other_config
+'''
+
+RETURN = '''
+changed_keys:
+  description: Keys which were set or removed
+  returned: success
+  type: list
+  sample: ["pmd-cpu-mask"]
+restart_required:
+  description: Whether a changed key requires a restart of ovs-vswitchd
+  returned: success
+  type: bool
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_ovs import (DPDK_RESTART_KEYS, OvsError,
+                                             diff_map, map_args, parse_list,
+                                             transaction)
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            other_config=dict(type='dict', required=True),
+            restart_keys=dict(type='list', default=list(DPDK_RESTART_KEYS)),
+        ),
+        supports_check_mode=True,
+    )
+
+    rc, out, err = module.run_command(["ovs-vsctl", "--format=json",
+                                       "--columns=other_config", "list",
+                                       "Open_vSwitch"])
+    if rc != 0:
+        module.fail_json(msg="Failed to read other_config: {err}"
+                         .format(err=err.strip()))
+    try:
+        rows = parse_list(out)
+    except OvsError as err:
+        module.fail_json(msg=str(err))
+    if not rows:
+        module.fail_json(msg="Open_vSwitch table is empty")
+    current = rows[0]["other_config"]
+
+    changes = diff_map(current, module.params['other_config'])
+    changed_keys = sorted(changes)
+    if changes and not module.check_mode:
+        args = transaction(map_args("Open_vSwitch", ".", "other_config",
+                                    changes))
+        rc, _, err = module.run_command(["ovs-vsctl", "--no-wait"] + args)
+        if rc != 0:
+            module.fail_json(msg="Failed to set other_config: {err}"
+                             .format(err=err.strip()))
+
+    module.exit_json(changed=bool(changes), changed_keys=changed_keys,
+                     restart_required=any(key in module.params['restart_keys']
+                                          for key in changed_keys))
+
+
+if __name__ == '__main__':
+    main()
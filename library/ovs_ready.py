@@ -0,0 +1,152 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: ovs_ready
+short_description: Wait until Open vSwitch is usable
+description:
+  - Polls until the ovsdb-server socket accepts connections, ovs-vswitchd
+    answers on its control socket and, with I(dpdk), the Open_vSwitch table
+    reports C(dpdk_initialized). Returns as soon as every check passes.
+  - C(dpdk_initialized) is only checked if the column exists (Open vSwitch
+    2.10 or greater).
+options:
+  db_sock:
+    description:
+      - ovsdb-server unix socket.
+    default: /var/run/openvswitch/db.sock
+  dpdk:
+    description:
+      - Wait for DPDK to be initialised as well.
+    type: bool
+    default: false
+  timeout:
+    description:
+      - Seconds to wait before failing.
+    default: 300
+  interval:
+    description:
+      - Seconds between polls.
+    default: 0.5
+'''
+
+EXAMPLES = '''
+- name: Wait for Open vSwitch to be ready
+  ovs_ready:
+    dpdk: true
+    timeout: 300
+'''
+
+RETURN = '''
+elapsed:
+  description: Seconds until Open vSwitch was ready
+  returned: success
+  type: float
+dpdk_initialized:
+  description: Value of dpdk_initialized, null if the column does not exist
+               or I(dpdk) is false
+  returned: success
+  type: bool
+'''
+
+import socket
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_ovs import missing_column
+
+
+def check_db_sock(module):
+    """ Return None if ovsdb-server accepts connections, else the reason """
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(module.params['db_sock'])
+    except (IOError, OSError) as err:
+        return "ovsdb-server socket '{path}' not accepting connections: " \
+               "{err}".format(path=module.params['db_sock'], err=err)
+    finally:
+        sock.close()
+    return None
+
+
+def check_vswitchd(module):
+    """ Return None if ovs-vswitchd answers on its control socket, else the
+        reason """
+
+    rc, _, err = module.run_command(["ovs-appctl", "--timeout=5", "-t",
+                                     "ovs-vswitchd", "version"])
+    if rc != 0:
+        return "ovs-vswitchd not responding: {err}".format(err=err.strip())
+    return None
+
+
+def check_dpdk(module):
+    """ Return tuple (dpdk_initialized, reason). dpdk_initialized is None if
+        the column does not exist and reason is None if DPDK is ready """
+
+    rc, out, err = module.run_command(["ovs-vsctl", "--timeout=5", "get",
+                                       "Open_vSwitch", ".",
+                                       "dpdk_initialized"])
+    if rc != 0:
+        if missing_column(err, "dpdk_initialized"):
+            return None, None
+        return None, "Unable to read dpdk_initialized: {err}".format(
+            err=err.strip())
+    if out.strip() != "true":
+        return False, "DPDK is not initialised (dpdk_initialized=false)"
+    return True, None
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            db_sock=dict(type='path',
+                         default='/var/run/openvswitch/db.sock'),
+            dpdk=dict(type='bool', default=False),
+            timeout=dict(type='int', default=300),
+            interval=dict(type='float', default=0.5),
+        ),
+        supports_check_mode=True,
+    )
+
+    start = time.time()
+    while True:
+        reason = check_db_sock(module) or check_vswitchd(module)
+        initialized = None
+        if reason is None and module.params['dpdk']:
+            initialized, reason = check_dpdk(module)
+        if reason is None:
+            module.exit_json(changed=False,
+                             elapsed=round(time.time() - start, 1),
+                             dpdk_initialized=initialized)
+        if time.time() - start >= module.params['timeout']:
+            module.fail_json(msg="Open vSwitch not ready after {timeout} "
+                                 "seconds. {reason}".format(
+                                     timeout=module.params['timeout'],
+                                     reason=reason))
+        time.sleep(module.params['interval'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: pci_numa
+short_description: Locate network interfaces on NUMA nodes through PCI sysfs
+description:
+  - Reads C(numa_node) and C(local_cpulist) of the PCI device of every
+    interface and compares the node with the NUMA node the interface is
+    declared on.
+options:
+  interfaces:
+    description:
+      - Dict which maps interface name to a dict with key pci_address and
+        optionally numa_node, the declared NUMA node.
+    required: true
+  on_mismatch:
+    description:
+      - Fail or only warn if an interface is declared on a NUMA node other
+        than the node of its PCI device.
+    choices: [fail, warn]
+    default: fail
+  sysfs_root:
+    description:
+      - Root of the sysfs tree. Override to run against a fake tree.
+    default: /sys
+'''
+
+EXAMPLES = '''
+- name: Verify NUMA placement of interfaces
+  pci_numa:
+    interfaces:
+      eno1:
+        pci_address: "0000:af:00.0"
+        numa_node: 1
+'''
+
+RETURN = '''
+interfaces:
+  description: Dict which maps interface name to its pci_address, numa_node
+               (null if the device has no NUMA affinity) and local_cpus
+  returned: success
+  type: dict
+mismatched:
+  description: Interfaces declared on another NUMA node than their device
+  returned: success
+  type: list
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_sysfs import (SysfsError, numa_cpu_map,
+                                               online_cpus, pci_locality)
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            interfaces=dict(type='dict', required=True),
+            on_mismatch=dict(type='str', default='fail',
+                             choices=['fail', 'warn']),
+            sysfs_root=dict(type='path', default='/sys'),
+        ),
+        supports_check_mode=True,
+    )
+
+    root = module.params['sysfs_root']
+    located = {}
+    mismatched = []
+    mismatches = []
+    try:
+        nodes = numa_cpu_map(root, online_cpus(root))
+        for name, interface in sorted(module.params['interfaces'].items()):
+            node, local_cpus = pci_locality(root, interface['pci_address'],
+                                            nodes)
+            located[name] = dict(pci_address=interface['pci_address'],
+                                 numa_node=node, local_cpus=local_cpus)
+            declared = interface.get('numa_node')
+            if declared is not None and node is not None and \
+                    int(declared) != node:
+                mismatched.append(name)
+                mismatches.append("Interface {name} ({pci}) is declared on "
+                                  "NUMA node {declared} but is local to NUMA "
+                                  "node {node}".format(
+                                      name=name,
+                                      pci=interface['pci_address'],
+                                      declared=declared, node=node))
+    except SysfsError as err:
+        module.fail_json(msg=str(err))
+
+    if mismatches and module.params['on_mismatch'] == 'fail':
+        module.fail_json(msg=". ".join(mismatches), interfaces=located,
+                         mismatched=mismatched)
+    for msg in mismatches:
+        module.warn(msg)
+    module.exit_json(changed=False, interfaces=located, mismatched=mismatched)
+
+
+if __name__ == '__main__':
+    main()
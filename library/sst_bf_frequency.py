@@ -0,0 +1,144 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: sst_bf_frequency
+short_description: Apply and verify the frequency limits of an SST-BF profile
+description:
+  - Writes C(scaling_min_freq) and C(scaling_max_freq) of every high and
+    normal priority CPU which differs from the profile in one pass, and
+    C(scaling_governor) if I(governor) is given.
+  - FIXED profiles set both limits of every CPU to its base frequency. VAR
+    profiles set high priority CPUs from their base frequency up to the
+    maximum turbo frequency and normal priority CPUs from the minimum
+    frequency up to their base frequency.
+  - Reads the limits back and fails if a CPU differs from the profile.
+    With I(apply=false) nothing is written and only the read back is done.
+options:
+  profile:
+    description:
+      - SST-BF profile to apply.
+    required: true
+    choices: [FREQUENCY_FIXED_HIGH_DEDICATED, FREQUENCY_FIXED_HIGH_SHARED,
+              FREQUENCY_VAR_HIGH_DEDICATED, FREQUENCY_VAR_HIGH_SHARED]
+  high_cores:
+    description:
+      - CPU IDs of the high priority tier.
+    required: true
+  normal_cores:
+    description:
+      - CPU IDs of the normal priority tier.
+    required: true
+  governor:
+    description:
+      - Scaling governor to set, e.g. performance. The governor is left
+        alone if not given.
+  apply:
+    description:
+      - Write the limits. If false only verify them, e.g. after a reboot.
+    type: bool
+    default: true
+  sysfs_root:
+    description:
+      - Root of the sysfs tree. Override to run against a fake tree.
+    default: /sys
+'''
+
+EXAMPLES = '''
+- name: Apply SST-BF profile
+  sst_bf_frequency:
+    profile: FREQUENCY_FIXED_HIGH_DEDICATED
+    high_cores: "{{ sst_bf_topology.high_cores }}"
+    normal_cores: "{{ sst_bf_topology.normal_cores }}"
+'''
+
+RETURN = '''
+changed_cpus:
+  description: CPUs whose frequency limits or governor were written
+  returned: success
+  type: list
+  sample: [1, 3]
+limits:
+  description: Dict which maps CPU ID to its [min, max] frequency in kHz
+  returned: success
+  type: dict
+  sample: {"1": [2700000, 2700000]}
+mismatched:
+  description: CPUs whose limits differ from the profile after applying it,
+               with the limits read and expected
+  returned: failure
+  type: list
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_cpufreq import (FIXED_PROFILES, VAR_PROFILES,
+                                                 apply_profile,
+                                                 verify_profile)
+from ansible.module_utils.sst_bf_sysfs import SysfsError
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            profile=dict(type='str', required=True,
+                         choices=list(FIXED_PROFILES + VAR_PROFILES)),
+            high_cores=dict(type='list', required=True),
+            normal_cores=dict(type='list', required=True),
+            governor=dict(type='str'),
+            apply=dict(type='bool', default=True),
+            sysfs_root=dict(type='path', default='/sys'),
+        ),
+        supports_check_mode=True,
+    )
+    root = module.params['sysfs_root']
+    governor = module.params['governor'] or None
+    apply = module.params['apply']
+    try:
+        tiers = dict((tier, [int(cpu) for cpu in
+                             module.params[tier + '_cores']])
+                     for tier in ("high", "normal"))
+        changed, targets = apply_profile(root, module.params['profile'],
+                                         tiers, governor,
+                                         module.check_mode or not apply)
+        if not apply:
+            changed = []
+        mismatched = [] if module.check_mode and apply else \
+            verify_profile(root, targets, governor)
+    except (SysfsError, ValueError) as err:
+        module.fail_json(msg=str(err))
+
+    limits = dict((str(cpu), list(limit)) for cpu, limit in targets.items())
+    if mismatched:
+        module.fail_json(msg="Frequency limits of CPUs {cpus} differ from "
+                         "profile {profile}".format(
+                             cpus=",".join(str(item["cpu"])
+                                           for item in mismatched),
+                             profile=module.params['profile']),
+                         changed=bool(changed), changed_cpus=changed,
+                         limits=limits, mismatched=mismatched)
+    module.exit_json(changed=bool(changed), changed_cpus=changed,
+                     limits=limits)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: sst_bf_openstack
+short_description: Configure SST-BF traits, resource providers and flavors
+description:
+  - Opens one authenticated keystoneauth1 session and uses it for every
+    Placement and Compute API call of the invocation.
+  - Creates the SST-BF custom traits, reconciles the SST-BF flavors with the
+    selected profile and synchronises the SST-BF traits of the resource
+    providers of many compute hosts at once.
+options:
+  auth:
+    description:
+      - Keystone credentials with keys auth_url, username, password,
+        project_name, user_domain_id and project_domain_id.
+    required: true
+  region_name:
+    description:
+      - OpenStack region.
+  placement_api_version:
+    description:
+      - Placement API microversion. Traits require at least 1.6.
+    default: "1.6"
+  profile:
+    description:
+      - SST-BF profile.
+    required: true
+    choices: [FREQUENCY_FIXED_HIGH_DEDICATED, FREQUENCY_FIXED_HIGH_SHARED,
+              FREQUENCY_VAR_HIGH_DEDICATED, FREQUENCY_VAR_HIGH_SHARED]
+  traits:
+    description:
+      - Create the SST-BF custom traits if they do not exist.
+    type: bool
+    default: false
+  providers:
+    description:
+      - Dict which maps compute hostname to a dict with key C(profile) and
+        optionally C(inventory), a resource class to total mapping (e.g PCPU
+        and VCPU) to wait for before the traits are set.
+      - Resource providers are listed once. The SST-BF trait and the trait
+        of the host's profile are set and traits of other SST-BF profiles
+        are removed. Providers whose traits already match are not written.
+  timeout:
+    description:
+      - Seconds to wait for the C(inventory) of each provider.
+    default: 300
+  rate_limit:
+    description:
+      - Maximum number of API requests per second. 0 disables the limit.
+    default: 0
+  flavors:
+    description:
+      - Reconcile the SST-BF flavors with the flavors of C(profile). Flavors
+        and their extra specs are listed once and only differences are
+        written. Flavors of other profiles are deleted.
+    type: bool
+    default: false
+  workers:
+    description:
+      - Maximum number of concurrent API calls for flavors and providers.
+    default: 8
+requirements:
+  - keystoneauth1
+'''
+
+EXAMPLES = '''
+- name: Synchronise SST-BF traits of resource providers
+  run_once: true
+  sst_bf_openstack:
+    auth:
+      auth_url: "{{ OS_AUTH_URL }}"
+      username: "{{ OS_USERNAME }}"
+      password: "{{ OS_PASSWORD }}"
+      project_name: "{{ OS_PROJECT_NAME }}"
+      user_domain_id: "{{ OS_USER_DOMAIN_ID }}"
+      project_domain_id: "{{ OS_PROJECT_DOMAIN_ID }}"
+    region_name: "{{ OS_REGION_NAME }}"
+    profile: FREQUENCY_FIXED_HIGH_DEDICATED
+    providers:
+      compute-0:
+        profile: FREQUENCY_FIXED_HIGH_DEDICATED
+      compute-1:
+        profile: FREQUENCY_VAR_HIGH_SHARED
+        inventory:
+          PCPU: 20
+          VCPU: 20
+  delegate_to: localhost
+'''
+
+RETURN = '''
+created_traits:
+  description: Custom traits which were created
+  returned: success
+  type: list
+providers:
+  description: Dict which maps hostname to resource provider uuid and
+               whether its traits changed
+  returned: when providers is set
+  type: dict
+  sample: {"compute-0": {"uuid": "5e5d9a6f-...", "changed": true}}
+flavors:
+  description: Names of flavors per action (create, replace, update, delete)
+  returned: when flavors is true
+  type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_openstack import (HAS_KEYSTONEAUTH,
+                                                   PROFILE_TRAITS, PROFILES,
+                                                   SST_BF_TRAIT,
+                                                   OpenStackError,
+                                                   SstBfOpenStack,
+                                                   password_session)
+
+AUTH_KEYS = ("auth_url", "username", "password", "project_name",
+             "user_domain_id", "project_domain_id")
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            auth=dict(type='dict', required=True, no_log=True),
+            region_name=dict(type='str'),
+            placement_api_version=dict(type='str', default='1.6'),
+            profile=dict(type='str', required=True, choices=list(PROFILES)),
+            traits=dict(type='bool', default=False),
+            providers=dict(type='dict'),
+            timeout=dict(type='int', default=300),
+            rate_limit=dict(type='float', default=0),
+            flavors=dict(type='bool', default=False),
+            workers=dict(type='int', default=8),
+        ),
+    )
+    if not HAS_KEYSTONEAUTH:
+        module.fail_json(msg="Python library keystoneauth1 is required")
+    providers = module.params['providers'] or {}
+    for hostname, host in providers.items():
+        if host.get('profile') not in PROFILES:
+            module.fail_json(msg="Invalid SST-BF profile '{profile}' for host "
+                             "'{host}'".format(profile=host.get('profile'),
+                                               host=hostname))
+        host.setdefault('timeout', module.params['timeout'])
+
+    auth = module.params['auth']
+    missing = [key for key in AUTH_KEYS if not auth.get(key)]
+    if missing:
+        module.fail_json(msg="Missing OpenStack credentials: {keys}"
+                         .format(keys=", ".join(missing)))
+
+    client = SstBfOpenStack(
+        password_session(**dict((key, auth[key]) for key in AUTH_KEYS)),
+        region_name=module.params['region_name'],
+        placement_api_version=module.params['placement_api_version'],
+        rate_limit=module.params['rate_limit'])
+    profile = module.params['profile']
+    result = dict(changed=False, created_traits=[])
+
+    try:
+        if module.params['traits']:
+            result['created_traits'] = client.ensure_traits(
+                [SST_BF_TRAIT] + PROFILE_TRAITS)
+            result['changed'] = bool(result['created_traits'])
+
+        if module.params['flavors']:
+            result['flavors'] = client.reconcile_flavors(
+                profile, module.params['workers'])
+            if any(result['flavors'].values()):
+                result['changed'] = True
+
+        if providers:
+            result['providers'] = client.sync_fleet_traits(
+                providers, module.params['workers'])
+            if any(host['changed'] for host in result['providers'].values()):
+                result['changed'] = True
+    except OpenStackError as err:
+        module.fail_json(msg=str(err), **result)
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: sst_bf_state
+short_description: Query or record the SST-BF applied state of a host
+description:
+  - With I(state=query) discovers the SST-BF topology in a single sysfs
+    walk, fingerprints it together with I(role_vars) and the recorded
+    fingerprints of earlier phases and compares the fingerprint with the
+    entry of I(phase) in the applied-state record.
+    Sets fact C(sst_bf_topology).
+  - With I(state=present) replaces the entry of I(phase) in the record with
+    I(fingerprint), the current boot ID and I(facts). The record is written
+    atomically.
+options:
+  path:
+    description:
+      - Applied-state record file. It must not be a symbolic link.
+    default: /var/lib/sst_bf/applied_state.json
+  phase:
+    description:
+      - Role phase the fingerprint belongs to.
+    required: true
+    choices: [host, openstack]
+  state:
+    description:
+      - Whether to compare with or to update the record.
+    default: query
+    choices: [query, present]
+  role_vars:
+    description:
+      - Role variables the phase depends on. Used with I(state=query).
+    default: {}
+  fingerprint:
+    description:
+      - Fingerprint returned by I(state=query). Required with
+        I(state=present).
+  facts:
+    description:
+      - Facts produced by the phase, returned by later queries.
+    default: {}
+  sysfs_root:
+    description:
+      - Root of the sysfs tree. Override to run against a fake tree.
+    default: /sys
+'''
+
+EXAMPLES = '''
+- name: Compare host with its applied-state record
+  sst_bf_state:
+    phase: host
+    role_vars:
+      sst_bf_profile: "{{ sst_bf_profile }}"
+  register: sst_bf_state
+
+- name: Record applied state
+  sst_bf_state:
+    phase: host
+    state: present
+    fingerprint: "{{ sst_bf_state.fingerprint }}"
+    facts:
+      high_cores_l: "{{ high_cores_l }}"
+'''
+
+RETURN = '''
+fingerprint:
+  description: sha256 of the topology, the role variables and the recorded
+               fingerprints of earlier phases
+  returned: success
+  type: str
+match:
+  description: Whether the record holds the same fingerprint for the phase
+  returned: state is query
+  type: bool
+boot_changed:
+  description: Whether the host was rebooted since the phase was recorded
+               with a matching fingerprint
+  returned: state is query
+  type: bool
+recorded_facts:
+  description: Facts recorded for each phase
+  returned: state is query
+  type: dict
+  sample: {"host": {"high_cores_l": [1, 3]}}
+ansible_facts:
+  description: Fact C(sst_bf_topology), see module sst_bf_topology
+  returned: state is query
+  type: dict
+'''
+
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_state import (PHASES, compare, dump_record,
+                                               fingerprint, load_record,
+                                               update_record)
+from ansible.module_utils.sst_bf_sysfs import SysfsError, write_atomic
+from ansible.module_utils.sst_bf_topology import discover_topology
+
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+
+def read_file(module, path):
+    """ Return content of 'path' or None if it does not exist """
+
+    if not os.path.exists(path):
+        return None
+    if os.path.islink(path):
+        module.fail_json(msg="Possible symbolic link attack detected on "
+                             "'{path}'".format(path=path))
+    with open(path) as in_file:
+        return in_file.read()
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            path=dict(type='path',
+                      default='/var/lib/sst_bf/applied_state.json'),
+            phase=dict(type='str', required=True, choices=list(PHASES)),
+            state=dict(type='str', default='query',
+                       choices=['query', 'present']),
+            role_vars=dict(type='dict', default={}),
+            fingerprint=dict(type='str'),
+            facts=dict(type='dict', default={}),
+            sysfs_root=dict(type='path', default='/sys'),
+        ),
+        required_if=[('state', 'present', ['fingerprint'])],
+        supports_check_mode=True,
+    )
+    path = module.params['path']
+    phase = module.params['phase']
+
+    record = load_record(read_file(module, path))
+    boot_id = (read_file(module, BOOT_ID_PATH) or "").strip()
+
+    if module.params['state'] == 'query':
+        try:
+            topology = discover_topology(module.params['sysfs_root'])
+        except SysfsError as err:
+            module.fail_json(msg=str(err))
+        digest = fingerprint(record, phase, topology,
+                             module.params['role_vars'])
+        match, boot_changed = compare(record, phase, digest, boot_id)
+        module.exit_json(changed=False, fingerprint=digest, match=match,
+                         boot_changed=boot_changed,
+                         recorded_facts=dict(
+                             (name, entry.get("facts", {}))
+                             for name, entry in record.items()),
+                         ansible_facts=dict(sst_bf_topology=topology))
+
+    digest = module.params['fingerprint']
+    updated = update_record(record, phase, digest, boot_id,
+                            module.params['facts'])
+    changed = updated != record
+    if changed and not module.check_mode:
+        state_dir = os.path.dirname(path)
+        if not os.path.isdir(state_dir):
+            os.makedirs(state_dir, 0o755)
+        write_atomic(module, path, dump_record(updated))
+
+    module.exit_json(changed=changed, fingerprint=digest)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: sst_bf_topology
+short_description: Discover SST-BF CPU topology of a host
+description:
+  - Reads cpufreq base frequency, NUMA membership, SMT siblings and online
+    CPUs from sysfs in a single pass.
+  - Sets fact C(sst_bf_topology) which describes the frequency tier, NUMA
+    node and sibling group of every online CPU.
+options:
+  sysfs_root:
+    description:
+      - Root of the sysfs tree. Override to run against a fake tree.
+    default: /sys
+'''
+
+EXAMPLES = '''
+- name: Discover SST-BF CPU topology
+  sst_bf_topology:
+'''
+
+RETURN = '''
+ansible_facts:
+  description: Fact C(sst_bf_topology) with keys online_cpus, cpus,
+               numa_nodes, sibling_groups, threads_per_core, high_cores,
+               normal_cores and base_frequency
+  returned: success
+  type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_sysfs import SysfsError
+from ansible.module_utils.sst_bf_topology import discover_topology
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            sysfs_root=dict(type='path', default='/sys'),
+        ),
+        supports_check_mode=True,
+    )
+
+    try:
+        topology = discover_topology(module.params['sysfs_root'])
+    except SysfsError as err:
+        module.fail_json(msg=str(err))
+
+    module.exit_json(changed=False,
+                     ansible_facts=dict(sst_bf_topology=topology))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: wheelhouse
+short_description: Provide a verified wheelhouse of Python packages
+description:
+  - Looks up the requirements resolved for the specifiers I(packages) in
+    C(index/<sha1 of the specifiers>.txt) under I(path). Each requirement is
+    pinned by version and by the sha256 of its distribution file. The
+    wheelhouse C(<sha1 of the requirements>) under I(path) must hold a file
+    with the pinned sha256 for every requirement.
+  - If the index is missing or the wheelhouse fails verification the
+    packages are downloaded with pip, pinned and verified, unless
+    I(download) is false in which case the module fails.
+  - Install from the wheelhouse with pip options C(--no-index),
+    C(--find-links) and C(--require-hashes) and the returned
+    I(requirements) file.
+options:
+  packages:
+    description:
+      - Package specifiers, e.g. keystoneauth1>=3.4.0.
+    required: true
+  path:
+    description:
+      - Wheel cache directory. It must not be a symbolic link.
+    required: true
+  download:
+    description:
+      - Whether packages may be downloaded.
+    type: bool
+    default: true
+  python:
+    description:
+      - Python interpreter running pip download. The wheelhouse is kept
+        per Python version and platform of the interpreter.
+    default: python3
+'''
+
+EXAMPLES = '''
+- name: Provide wheelhouse
+  delegate_to: localhost
+  wheelhouse:
+    packages: ["keystoneauth1>=3.4.0"]
+    path: "{{ sst_bf_cache_dir }}/wheels"
+    download: "{{ not offline }}"
+    python: "{{ ansible_playbook_python }}"
+  register: wheelhouse
+'''
+
+RETURN = '''
+requirements:
+  description: File of the pinned requirements
+  returned: success
+  type: str
+wheelhouse:
+  description: Directory holding the distribution files of the requirements
+  returned: success
+  type: str
+pinned:
+  description: Requirements pinned by version and sha256
+  returned: success
+  type: list
+  sample: ["keystoneauth1==3.18.0 --hash=sha256:..."]
+'''
+
+import os
+import shutil
+import tempfile
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.sst_bf_cache import (PYTHON_TAG_SCRIPT, CacheError,
+                                               pin_requirements,
+                                               requirements_key,
+                                               specifier_key,
+                                               verify_requirements)
+from ansible.module_utils.sst_bf_sysfs import write_atomic
+
+
+def read_requirements(module, path):
+    """ Return the requirements in file 'path' or None if it does not exist
+    """
+
+    if not os.path.exists(path):
+        return None
+    if os.path.islink(path):
+        module.fail_json(msg="Possible symbolic link attack detected on "
+                         "'{path}'".format(path=path))
+    with open(path) as req_file:
+        return [line.strip() for line in req_file if line.strip()]
+
+
+def main():
+    """ Module entry point """
+
+    module = AnsibleModule(
+        argument_spec=dict(
+            packages=dict(type='list', required=True),
+            path=dict(type='path', required=True),
+            download=dict(type='bool', default=True),
+            python=dict(type='str', default='python3'),
+        ),
+        supports_check_mode=True,
+    )
+    packages = module.params['packages']
+    path = module.params['path']
+    if os.path.islink(path):
+        module.fail_json(msg="Possible symbolic link attack detected on "
+                         "'{path}'".format(path=path))
+    rc, out, err = module.run_command([module.params['python'], "-c",
+                                       PYTHON_TAG_SCRIPT])
+    if rc != 0:
+        module.fail_json(msg="Failed to run {python}: {err}".format(
+            python=module.params['python'], err=err.strip()))
+    python_tag = out.strip()
+    index = os.path.join(path, "index",
+                         specifier_key(packages, python_tag) + ".txt")
+
+    pinned = read_requirements(module, index)
+    errors = ["No index of the resolved requirements"]
+    if pinned is not None:
+        wheelhouse = os.path.join(path, requirements_key(pinned,
+                                                         python_tag))
+        errors = verify_requirements(wheelhouse, pinned)
+    if not errors:
+        module.exit_json(changed=False, requirements=index,
+                         wheelhouse=wheelhouse, pinned=pinned)
+    if not module.params['download']:
+        module.fail_json(msg="No verified wheelhouse for {packages} in "
+                         "'{path}': {errors}".format(
+                             packages=", ".join(packages), path=path,
+                             errors="; ".join(errors)))
+    if module.check_mode:
+        module.exit_json(changed=True, requirements=index)
+
+    for directory in (path, os.path.dirname(index)):
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o755)
+    download = tempfile.mkdtemp(dir=path, prefix=".download")
+    try:
+        rc, _, err = module.run_command([module.params['python'], "-m",
+                                         "pip", "download", "--dest",
+                                         download] + packages)
+        if rc != 0:
+            module.fail_json(msg="Failed to download {packages}: {err}"
+                             .format(packages=", ".join(packages),
+                                     err=err.strip()))
+        pinned = pin_requirements(download)
+        wheelhouse = os.path.join(path, requirements_key(pinned,
+                                                         python_tag))
+        shutil.rmtree(wheelhouse, ignore_errors=True)
+        os.rename(download, wheelhouse)
+    except (CacheError, IOError, OSError) as err:
+        module.fail_json(msg=str(err))
+    finally:
+        shutil.rmtree(download, ignore_errors=True)
+
+    errors = verify_requirements(wheelhouse, pinned)
+    if errors:
+        module.fail_json(msg="Downloaded wheelhouse fails verification: "
+                         "{errors}".format(errors="; ".join(errors)))
+    write_atomic(module, index, "\n".join(pinned) + "\n")
+    module.exit_json(changed=True, requirements=index, wheelhouse=wheelhouse,
+                     pinned=pinned)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Python package wheelhouses in the controller cache. The package
+    specifiers map to the requirements pip resolved for them, pinned by
+    version and by the sha256 of their distribution file, and the wheelhouse
+    holding those files is keyed by the pinned requirements. Both keys
+    include the Python version and platform of the interpreter running pip
+    """
+
+import hashlib
+import os
+import re
+
+SDIST_SUFFIXES = (".tar.gz", ".tar.bz2", ".zip")
+REQUIREMENT_RE = re.compile(r"^(\S+)==(\S+) --hash=sha256:([0-9a-f]{64})$")
+
+# Prints the Python version and wheel platform tag of the interpreter which
+# downloads the packages, e.g. py36-linux_x86_64, as pip resolves a different
+# set of distribution files for each
+PYTHON_TAG_SCRIPT = ("import sys, sysconfig; print('py{0}{1}-{2}'.format("
+                     "sys.version_info[0], sys.version_info[1], "
+                     "sysconfig.get_platform().replace('-', '_')"
+                     ".replace('.', '_')))")
+
+
+class CacheError(Exception):
+    """ Raised when a wheelhouse can not be pinned or verified """
+
+
+def specifier_key(packages, python_tag):
+    """ Return 'python_tag' (see PYTHON_TAG_SCRIPT) and the sha1 hex digest
+        of package specifiers 'packages' """
+
+    return "{tag}-{digest}".format(
+        tag=python_tag,
+        digest=hashlib.sha1(" ".join(sorted(packages)).encode("utf-8"))
+        .hexdigest())
+
+
+def requirements_key(requirements, python_tag):
+    """ Return 'python_tag' (see PYTHON_TAG_SCRIPT) and the sha1 hex digest
+        of pinned 'requirements' """
+
+    return "{tag}-{digest}".format(
+        tag=python_tag,
+        digest=hashlib.sha1("\n".join(sorted(requirements)).encode("utf-8"))
+        .hexdigest())
+
+
+def file_sha256(path):
+    """ Return sha256 hex digest of file 'path' """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as dist_file:
+        for block in iter(lambda: dist_file.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def normalize_name(name):
+    """ Return project 'name' normalized as pip compares it """
+
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def dist_version(filename):
+    """ Return tuple (name, version) of distribution file 'filename' or None
+        if it is not a wheel or sdist """
+
+    if filename.endswith(".whl"):
+        parts = filename[:-len(".whl")].split("-")
+        if len(parts) < 5:
+            raise CacheError("Invalid wheel file name '{name}'"
+                             .format(name=filename))
+        return normalize_name(parts[0]), parts[1]
+    for suffix in SDIST_SUFFIXES:
+        if filename.endswith(suffix):
+            name, _, version = filename[:-len(suffix)].rpartition("-")
+            if not name or not version:
+                raise CacheError("Invalid sdist file name '{name}'"
+                                 .format(name=filename))
+            return normalize_name(name), version
+    return None
+
+
+def dist_files(directory):
+    """ Return dict which maps (name, version) to the distribution files in
+        'directory' """
+
+    files = {}
+    for filename in sorted(os.listdir(directory)):
+        dist = dist_version(filename)
+        if dist is not None:
+            files.setdefault(dist, []).append(os.path.join(directory,
+                                                           filename))
+    return files
+
+
+def pin_requirements(directory):
+    """ Return sorted list of requirements 'name==version
+        --hash=sha256:digest' of the distribution files in 'directory' """
+
+    requirements = []
+    for (name, version), paths in sorted(dist_files(directory).items()):
+        if len(paths) > 1:
+            raise CacheError("More than one file of {name}=={version} in "
+                             "'{path}'".format(name=name, version=version,
+                                               path=directory))
+        requirements.append("{name}=={version} --hash=sha256:{digest}"
+                            .format(name=name, version=version,
+                                    digest=file_sha256(paths[0])))
+    return requirements
+
+
+def verify_requirements(directory, requirements):
+    """ Return list of error messages for the pinned 'requirements' which
+        have no distribution file in 'directory' with the pinned sha256 """
+
+    if not requirements:
+        return ["No pinned requirements"]
+    files = dist_files(directory) if os.path.isdir(directory) else {}
+    errors = []
+    for requirement in requirements:
+        match = REQUIREMENT_RE.match(requirement)
+        if match is None:
+            errors.append("Invalid requirement '{req}'"
+                          .format(req=requirement))
+            continue
+        name, version, digest = match.groups()
+        paths = files.get((normalize_name(name), version), [])
+        if not paths:
+            errors.append("{name}=={version} is missing"
+                          .format(name=name, version=version))
+        elif [file_sha256(path) for path in paths] != [digest]:
+            errors.append("{name}=={version} does not match its sha256"
+                          .format(name=name, version=version))
+    return errors
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Plan the kernel command line: merge the parameters managed by the role
+    into GRUB_CMDLINE_LINUX and decide whether the running kernel differs in
+    a parameter which only takes effect at boot """
+
+import re
+
+GRUB_CMDLINE_RE = re.compile(r"^GRUB_CMDLINE_LINUX=([\"']?)(.*)\1\s*$")
+SIZE_RE = re.compile(r"^(\d+)([KMG])B?$", re.IGNORECASE)
+SIZE_UNITS_KB = {"K": 1, "M": 1024, "G": 1024 * 1024}
+DEFAULT_HUGEPAGE_SIZE_KB = 2048
+
+
+class CmdlineError(Exception):
+    """ Raised when a kernel command line can not be parsed """
+
+
+def param_key(token):
+    """ Return the key of kernel parameter 'token' (e.g 'isolcpus' for
+        'isolcpus=1-3') """
+
+    return token.split("=", 1)[0]
+
+
+def hugepage_size_kb(size):
+    """ Convert hugepage size 'size' (e.g '2M', '1G' or '1GB') to kB """
+
+    match = SIZE_RE.match(str(size).strip())
+    if not match:
+        raise CmdlineError("Invalid hugepage size '{size}'".format(size=size))
+    return int(match.group(1)) * SIZE_UNITS_KB[match.group(2).upper()]
+
+
+def hugepage_counts(tokens):
+    """ Return dict which maps hugepage size in kB to the number of pages
+        requested by kernel parameters 'tokens'. A 'hugepages' parameter
+        applies to the size of the 'hugepagesz' parameter before it or else
+        to the default hugepage size """
+
+    default_size = DEFAULT_HUGEPAGE_SIZE_KB
+    size = None
+    counts = {}
+    for token in tokens:
+        key, _, value = token.partition("=")
+        if key == "default_hugepagesz":
+            default_size = hugepage_size_kb(value)
+        elif key == "hugepagesz":
+            size = hugepage_size_kb(value)
+        elif key == "hugepages":
+            if not value.isdigit():
+                raise CmdlineError("Invalid hugepage count in '{token}'"
+                                   .format(token=token))
+            counts[size or default_size] = int(value)
+    return counts
+
+
+def boot_params(tokens, managed):
+    """ Return dict of the last value of each parameter in 'tokens' whose key
+        is in 'managed', hugepage counts excepted """
+
+    params = {}
+    for token in tokens:
+        key = param_key(token)
+        if key in managed and key not in ("hugepagesz", "hugepages"):
+            params[key] = token.partition("=")[2]
+    return params
+
+
+def merge_params(tokens, params, managed):
+    """ Return 'tokens' without the parameters whose key is in 'managed' and
+        with 'params' appended """
+
+    return [token for token in tokens
+            if param_key(token) not in managed] + list(params)
+
+
+def set_grub_cmdline(lines, params, managed):
+    """ Merge 'params' into the GRUB_CMDLINE_LINUX line of GRUB defaults file
+        content 'lines' (list of lines without line endings). The line is
+        appended if missing. Return the new lines """
+
+    lines = list(lines)
+    for index, line in enumerate(lines):
+        match = GRUB_CMDLINE_RE.match(line)
+        if match:
+            tokens = merge_params(match.group(2).split(), params, managed)
+            lines[index] = 'GRUB_CMDLINE_LINUX="{0}"'.format(" ".join(tokens))
+            return lines
+    lines.append('GRUB_CMDLINE_LINUX="{0}"'.format(" ".join(params)))
+    return lines
+
+
+def plan_boot(running, params, managed, runtime_sizes_kb):
+    """ Compare kernel parameters 'params' with the running kernel command
+        line tokens 'running'. Return tuple (reboot reasons, hugepages) where
+        reboot reasons lists the boot-time only parameters which differ and
+        hugepages maps each hugepage size in 'runtime_sizes_kb' requested by
+        'params' to its page count, to be allocated at runtime """
+
+    reasons = []
+    desired = boot_params(params, managed)
+    current = boot_params(running, managed)
+    for key in sorted(set(desired) | set(current)):
+        if desired.get(key) != current.get(key):
+            reasons.append(key)
+
+    desired_pages = hugepage_counts(params)
+    current_pages = hugepage_counts(running)
+    runtime = {}
+    for size in sorted(set(desired_pages) | set(current_pages)):
+        if size in runtime_sizes_kb:
+            if size in desired_pages:
+                runtime[size] = desired_pages[size]
+        elif desired_pages.get(size, 0) != current_pages.get(size, 0):
+            reasons.append("hugepages-{size}kB".format(size=size))
+    return reasons, runtime
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Apply the frequency limits of an SST-BF profile through cpufreq sysfs and
+    verify them """
+
+from ansible.module_utils.sst_bf_sysfs import (CPU_DIR, SysfsError,
+                                               read_sysfs, read_sysfs_int,
+                                               write_sysfs)
+
+FIXED_PROFILES = ("FREQUENCY_FIXED_HIGH_DEDICATED",
+                  "FREQUENCY_FIXED_HIGH_SHARED")
+VAR_PROFILES = ("FREQUENCY_VAR_HIGH_DEDICATED", "FREQUENCY_VAR_HIGH_SHARED")
+CPUFREQ_FILES = ("base_frequency", "cpuinfo_min_freq", "cpuinfo_max_freq",
+                 "scaling_min_freq", "scaling_max_freq")
+
+
+def cpufreq_parts(cpu, name):
+    """ Return sysfs path parts of cpufreq file 'name' of CPU 'cpu' """
+
+    return (CPU_DIR, "cpu{cpu}".format(cpu=cpu), "cpufreq", name)
+
+
+def read_cpufreq(root, cpu):
+    """ Return dict of the cpufreq frequencies of CPU 'cpu' in kHz (see
+        CPUFREQ_FILES) and its scaling_governor """
+
+    freqs = {}
+    for name in CPUFREQ_FILES:
+        freqs[name] = read_sysfs_int(root, *cpufreq_parts(cpu, name))
+        if freqs[name] is None:
+            raise SysfsError("Unable to read '{name}' of CPU {cpu}"
+                             .format(name=name, cpu=cpu))
+    freqs["scaling_governor"] = read_sysfs(
+        root, *cpufreq_parts(cpu, "scaling_governor"))
+    return freqs
+
+
+def profile_limits(profile, tier, freqs):
+    """ Return tuple (min, max) of the frequency limits of a CPU of 'tier'
+        (high or normal) with cpufreq frequencies 'freqs' for SST-BF
+        'profile'. FIXED profiles run every CPU at its base frequency. VAR
+        profiles let high priority CPUs turbo above their base frequency and
+        normal priority CPUs scale down from theirs """
+
+    base = freqs["base_frequency"]
+    if profile in FIXED_PROFILES:
+        return base, base
+    if profile in VAR_PROFILES:
+        if tier == "high":
+            return base, freqs["cpuinfo_max_freq"]
+        return freqs["cpuinfo_min_freq"], base
+    raise SysfsError("Unknown SST-BF profile '{profile}'"
+                     .format(profile=profile))
+
+
+def plan_limits(root, profile, tiers):
+    """ Return tuple (targets, current) for 'tiers', a dict which maps tier
+        to CPU IDs. Both map CPU ID to a tuple (min, max); current holds the
+        limits read from cpufreq """
+
+    targets = {}
+    current = {}
+    for tier, cpus in tiers.items():
+        for cpu in cpus:
+            freqs = read_cpufreq(root, cpu)
+            targets[cpu] = profile_limits(profile, tier, freqs)
+            current[cpu] = (freqs["scaling_min_freq"],
+                            freqs["scaling_max_freq"])
+    return targets, current
+
+
+def write_limits(root, cpu, current, target):
+    """ Write frequency limits 'target' of CPU 'cpu'. The limit moving away
+        from the other is written first so min never exceeds max """
+
+    order = ["scaling_min_freq", "scaling_max_freq"]
+    if target[0] > current[1]:
+        order.reverse()
+    values = {"scaling_min_freq": target[0], "scaling_max_freq": target[1]}
+    for name in order:
+        write_sysfs(root, values[name], *cpufreq_parts(cpu, name))
+
+
+def apply_profile(root, profile, tiers, governor=None, dry_run=False):
+    """ Set the frequency limits of SST-BF 'profile' on the CPUs of 'tiers'
+        (see plan_limits) in one pass, and the scaling governor if
+        'governor' is given. Return tuple (changed CPUs, targets) """
+
+    targets, current = plan_limits(root, profile, tiers)
+    changed = []
+    for cpu in sorted(targets):
+        governor_differs = governor and read_sysfs(
+            root, *cpufreq_parts(cpu, "scaling_governor")) != governor
+        if current[cpu] == targets[cpu] and not governor_differs:
+            continue
+        changed.append(cpu)
+        if dry_run:
+            continue
+        if governor_differs:
+            write_sysfs(root, governor,
+                        *cpufreq_parts(cpu, "scaling_governor"))
+        write_limits(root, cpu, current[cpu], targets[cpu])
+    return changed, targets
+
+
+def verify_profile(root, targets, governor=None):
+    """ Read the frequency limits back and return list of dicts (cpu, min,
+        max, expected_min, expected_max and governor) of the CPUs which
+        differ from 'targets' or do not use 'governor' """
+
+    mismatched = []
+    for cpu in sorted(targets):
+        freqs = read_cpufreq(root, cpu)
+        limits = (freqs["scaling_min_freq"], freqs["scaling_max_freq"])
+        if limits != tuple(targets[cpu]) or \
+                (governor and freqs["scaling_governor"] != governor):
+            mismatched.append({"cpu": cpu, "min": limits[0],
+                               "max": limits[1],
+                               "expected_min": targets[cpu][0],
+                               "expected_max": targets[cpu][1],
+                               "governor": freqs["scaling_governor"]})
+    return mismatched
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Steer interrupts onto housekeeping CPUs through /proc/irq and report the
+    interrupts which may still be delivered to other CPUs """
+
+import os
+
+from ansible.module_utils.sst_bf_sysfs import (SysfsError, format_cpu_list,
+                                               parse_cpu_list, read_sysfs,
+                                               write_sysfs)
+
+IRQ_DIR = "irq"
+
+
+def list_irqs(root):
+    """ Return sorted list of the IRQ numbers below proc root 'root' """
+
+    try:
+        entries = os.listdir(os.path.join(root, IRQ_DIR))
+    except (IOError, OSError) as err:
+        raise SysfsError("Unable to list interrupts: {err}".format(err=err))
+    return sorted(int(entry) for entry in entries if entry.isdigit())
+
+
+def irq_info(root, irq):
+    """ Return dict with the CPUs IRQ 'irq' may run on (affinity), the CPUs
+        it is delivered to (effective, the affinity if the kernel does not
+        report it) and the names of the devices using it (actions) """
+
+    parts = (IRQ_DIR, str(irq))
+    affinity = parse_cpu_list(read_sysfs(root, *(parts +
+                                                 ("smp_affinity_list",))))
+    effective = read_sysfs(root, *(parts + ("effective_affinity_list",)))
+    irq_dir = os.path.join(root, *parts)
+    actions = sorted(entry for entry in os.listdir(irq_dir)
+                     if os.path.isdir(os.path.join(irq_dir, entry)))
+    return {"affinity": affinity,
+            "effective": parse_cpu_list(effective) if effective else affinity,
+            "actions": actions}
+
+
+def steer_irqs(root, housekeeping, dry_run=False):
+    """ Set the affinity of every IRQ which may run outside the CPUs
+        'housekeeping' to these CPUs, in one pass. Return tuple (moved,
+        unmovable) with the IRQ numbers moved and those the kernel refused
+        to move, such as per-CPU and managed interrupts """
+
+    housekeeping = set(int(cpu) for cpu in housekeeping)
+    value = format_cpu_list(housekeeping)
+    moved = []
+    unmovable = []
+    for irq in list_irqs(root):
+        affinity = irq_info(root, irq)["affinity"]
+        if not affinity or set(affinity) <= housekeeping:
+            continue
+        if not dry_run:
+            try:
+                write_sysfs(root, value, IRQ_DIR, str(irq),
+                            "smp_affinity_list")
+            except SysfsError:
+                unmovable.append(irq)
+                continue
+        moved.append(irq)
+    return moved, unmovable
+
+
+def protected_irqs(root, housekeeping):
+    """ Return list of dicts (irq, cpus and actions) of the IRQs delivered
+        to CPUs outside 'housekeeping' """
+
+    housekeeping = set(int(cpu) for cpu in housekeeping)
+    report = []
+    for irq in list_irqs(root):
+        info = irq_info(root, irq)
+        cpus = sorted(set(info["effective"]) - housekeeping)
+        if cpus:
+            report.append({"irq": irq, "cpus": format_cpu_list(cpus),
+                           "actions": info["actions"]})
+    return report
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Set Nova CPU options in the lines of an INI file in a single pass while
+    keeping unrelated content and comments untouched """
+
+import re
+
+SECTION_RE = re.compile(r"^\s*\[([^\]]+)\]\s*$")
+KEY_RE = r"^\s*{key}\s*[=:]\s*(.*?)\s*$"
+
+HIGH_DEDICATED_PROFILES = ("FREQUENCY_FIXED_HIGH_DEDICATED",
+                           "FREQUENCY_VAR_HIGH_DEDICATED")
+HIGH_SHARED_PROFILES = ("FREQUENCY_FIXED_HIGH_SHARED",
+                        "FREQUENCY_VAR_HIGH_SHARED")
+
+
+def profile_cpu_sets(profile, high_cores, normal_cores):
+    """ Return tuple (dedicated, shared) CPU sets for SST-BF profile
+        'profile' """
+
+    if profile in HIGH_DEDICATED_PROFILES:
+        return high_cores, normal_cores
+    if profile in HIGH_SHARED_PROFILES:
+        return normal_cores, high_cores
+    raise ValueError("Unknown SST-BF profile '{profile}'"
+                     .format(profile=profile))
+
+
+def _section_of(line):
+    """ Return lower case section name if 'line' is a section header """
+
+    match = SECTION_RE.match(line)
+    return match.group(1).strip().lower() if match else None
+
+
+def set_options(lines, options):
+    """ Set options in INI file content 'lines' (list of lines without line
+        endings). Argument 'options' is a list of (section, key, value)
+        tuples. The first occurrence of a key in its section is updated in
+        place, a missing key is inserted directly after the section header
+        and a missing section is appended. Occurrences of the key anywhere
+        else are removed. Return tuple (new lines, list of changed keys) """
+
+    lines = list(lines)
+    changed = []
+    for section, key, value in options:
+        key_re = re.compile(KEY_RE.format(key=re.escape(key)))
+        wanted = "{key} = {value}".format(key=key, value=value)
+        current = None
+        header = None
+        kept = None
+        modified = False
+        result = []
+        for line in lines:
+            found_section = _section_of(line)
+            match = key_re.match(line) if found_section is None else None
+            if found_section is not None:
+                current = found_section
+                if current == section.lower() and header is None:
+                    header = len(result)
+            elif match:
+                if current != section.lower() or kept is not None:
+                    # Duplicate or misplaced definition
+                    modified = True
+                    continue
+                kept = len(result)
+                if match.group(1) != str(value):
+                    line = wanted
+                    modified = True
+            result.append(line)
+
+        if kept is None:
+            modified = True
+            if header is None:
+                if result and result[-1].strip():
+                    result.append("")
+                result.extend(["[{section}]".format(section=section), wanted])
+            else:
+                result.insert(header + 1, wanted)
+        if modified:
+            changed.append(key)
+        lines = result
+    return lines, changed
@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Placement and Compute API client for SST-BF traits, resource providers
+    and flavors. All requests share one keystoneauth1 session so the Keystone
+    token and HTTP connections are reused """
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from keystoneauth1 import adapter, session
+    from keystoneauth1.exceptions import ClientException
+    from keystoneauth1.identity import v3
+    HAS_KEYSTONEAUTH = True
+except ImportError:
+    HAS_KEYSTONEAUTH = False
+
+SST_BF_TRAIT = "CUSTOM_CPU_X86_INTEL_SST_BF"
+PROFILES = ("FREQUENCY_FIXED_HIGH_DEDICATED", "FREQUENCY_FIXED_HIGH_SHARED",
+            "FREQUENCY_VAR_HIGH_DEDICATED", "FREQUENCY_VAR_HIGH_SHARED")
+PROFILE_TRAITS = ["CUSTOM_CPU_" + profile for profile in PROFILES]
+
+FLAVOR_PREFIX = "SST_BF."
+# Name, RAM (MB), vCPUs and disk (GB) of the SST-BF flavors
+FLAVOR_SIZES = (("micro", 128, 1, 1), ("tiny", 512, 1, 1),
+                ("small", 2048, 1, 20), ("medium", 4096, 2, 40),
+                ("large", 8192, 4, 80), ("xlarge", 16384, 8, 160))
+FLAVOR_DESCRIPTIONS = {
+    "FREQUENCY_FIXED_HIGH_DEDICATED":
+        "*.freq-fixed.high-tier-dedicated: High fixed frequency cores are "
+        "set to dedicated sets (PCPU) -- *.freq-fixed.high-tier-shared: "
+        "Normal fixed frequency cores are set to shared sets (VCPU)",
+    "FREQUENCY_FIXED_HIGH_SHARED":
+        "*.freq-fixed.high-tier-dedicated: Normal fixed frequency cores are "
+        "set to dedicated sets (PCPU) -- *.freq-fixed.high-tier-shared: High "
+        "fixed frequency cores are set to shared sets (VCPU)",
+    "FREQUENCY_VAR_HIGH_DEDICATED":
+        "*.freq-var.high-tier-dedicated: High variable frequency cores are "
+        "set to dedicated sets (PCPU) -- *.freq-var.high-tier-shared: Normal "
+        "variable frequency cores are set to shared sets (VCPU)",
+    "FREQUENCY_VAR_HIGH_SHARED":
+        "*.freq-var.high-tier-shared: Normal variable frequency cores are set "
+        "to dedicated sets (PCPU) -- *.freq-var.high-tier-shared: High "
+        "variable frequency cores are set to shared sets (VCPU)",
+}
+
+
+class OpenStackError(Exception):
+    """ Raised when an OpenStack API request fails """
+
+
+def profile_trait(profile):
+    """ Return the custom trait of SST-BF profile 'profile' """
+
+    return "CUSTOM_CPU_" + profile
+
+
+def is_sst_bf_flavor(name):
+    """ Return True if flavor 'name' is managed by this role """
+
+    return any(name.startswith("{prefix}{size}.freq-".format(
+        prefix=FLAVOR_PREFIX, size=size[0])) for size in FLAVOR_SIZES)
+
+
+def desired_flavors(profile):
+    """ Return list of flavor definitions (dict) for SST-BF profile
+        'profile' """
+
+    freq = "fixed" if "_FIXED_" in profile else "var"
+    if profile.endswith("_HIGH_DEDICATED"):
+        tiers = (("high", "dedicated"), ("normal", "shared"))
+    else:
+        tiers = (("normal", "dedicated"), ("high", "shared"))
+
+    flavors = []
+    for size, ram, vcpus, disk in FLAVOR_SIZES:
+        for tier, policy in tiers:
+            name = "{prefix}{size}.freq-{freq}.{tier}-tier-{policy}".format(
+                prefix=FLAVOR_PREFIX, size=size, freq=freq, tier=tier,
+                policy=policy)
+            flavors.append({
+                "name": name,
+                "ram": ram,
+                "vcpus": vcpus,
+                "disk": disk,
+                "description": FLAVOR_DESCRIPTIONS[profile],
+                "extra_specs": {
+                    "trait:" + SST_BF_TRAIT: "required",
+                    "trait:" + profile_trait(profile): "required",
+                    "hw:cpu_policy": policy,
+                },
+            })
+    return flavors
+
+
+def plan_flavors(flavors, profile):
+    """ Compare existing 'flavors' (with extra specs) against the flavors of
+        'profile'. Return list of actions, each a dict with key 'action'
+        (create, replace, update or delete) and the data it needs """
+
+    managed_specs = ["trait:" + trait for trait in
+                     [SST_BF_TRAIT] + PROFILE_TRAITS] + ["hw:cpu_policy"]
+    current = dict((flavor["name"], flavor) for flavor in flavors
+                   if is_sst_bf_flavor(flavor["name"]))
+    actions = []
+    for wanted in desired_flavors(profile):
+        flavor = current.pop(wanted["name"], None)
+        if flavor is None:
+            actions.append({"action": "create", "flavor": wanted})
+            continue
+        # RAM, vCPUs and disk of a flavor can not be changed in place
+        if any(flavor[key] != wanted[key] for key in ("ram", "vcpus", "disk")):
+            actions.append({"action": "replace", "id": flavor["id"],
+                            "flavor": wanted})
+            continue
+        specs = flavor.get("extra_specs") or {}
+        set_specs = dict((key, value) for key, value
+                         in wanted["extra_specs"].items()
+                         if specs.get(key) != value)
+        unset_specs = [key for key in specs if key in managed_specs and
+                       key not in wanted["extra_specs"]]
+        description = None
+        if flavor.get("description") != wanted["description"]:
+            description = wanted["description"]
+        if set_specs or unset_specs or description is not None:
+            actions.append({"action": "update", "id": flavor["id"],
+                            "name": wanted["name"],
+                            "description": description,
+                            "set_specs": set_specs,
+                            "unset_specs": sorted(unset_specs)})
+    for name, flavor in sorted(current.items()):
+        actions.append({"action": "delete", "id": flavor["id"], "name": name})
+    return actions
+
+
+def password_session(auth_url, username, password, project_name,
+                     user_domain_id, project_domain_id, verify=True):
+    """ Return keystoneauth1 session which authenticates with a password """
+
+    auth = v3.Password(auth_url=auth_url, username=username,
+                       password=password, project_name=project_name,
+                       user_domain_id=user_domain_id,
+                       project_domain_id=project_domain_id)
+    return session.Session(auth=auth, verify=verify)
+
+
+class RateLimiter(object):
+    """ Space out calls to wait() so at most 'rate' calls per second pass,
+        shared between threads. A rate of 0 disables the limit """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_slot = 0
+
+    def wait(self):
+        """ Block until the next call is allowed """
+
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SstBfOpenStack(object):
+    """ Placement and Compute API calls over a shared session """
+
+    def __init__(self, sess, region_name=None, placement_api_version="1.6",
+                 compute_api_version="2.61", placement_endpoint=None,
+                 compute_endpoint=None, rate_limit=0):
+        self.limiter = RateLimiter(rate_limit)
+        self.placement = adapter.Adapter(
+            sess, service_type="placement", region_name=region_name,
+            endpoint_override=placement_endpoint,
+            default_microversion=placement_api_version)
+        self.compute = adapter.Adapter(
+            sess, service_type="compute", region_name=region_name,
+            endpoint_override=compute_endpoint,
+            default_microversion=compute_api_version)
+
+    def _request(self, api, method, url, ok_codes=None, **kwargs):
+        """ Send request and return tuple (status code, decoded JSON body or
+            None). Raise OpenStackError for error responses not listed in
+            'ok_codes' """
+
+        self.limiter.wait()
+        try:
+            resp = api.request(url, method, raise_exc=False, **kwargs)
+        except ClientException as err:
+            raise OpenStackError("{method} {url} failed: {err}"
+                                 .format(method=method, url=url, err=err))
+        if resp.status_code >= 400 and \
+                resp.status_code not in (ok_codes or ()):
+            raise OpenStackError("{method} {url} failed with HTTP {code}: "
+                                 "{text}".format(method=method, url=url,
+                                                 code=resp.status_code,
+                                                 text=resp.text))
+        body = None
+        if resp.content:
+            try:
+                body = resp.json()
+            except ValueError:
+                body = None
+        return resp.status_code, body
+
+    def ensure_traits(self, traits):
+        """ Create custom traits in 'traits' which do not exist. Return list
+            of created traits """
+
+        _, body = self._request(self.placement, "GET", "/traits",
+                                params={"name": "in:" + ",".join(traits)})
+        created = [trait for trait in traits if trait not in body["traits"]]
+        for trait in created:
+            self._request(self.placement, "PUT", "/traits/" + trait)
+        return created
+
+    def resource_providers(self):
+        """ Return list of all resource providers """
+
+        _, body = self._request(self.placement, "GET", "/resource_providers")
+        return body["resource_providers"]
+
+    def provider_traits(self, uuid):
+        """ Return tuple (traits, generation) of resource provider 'uuid' """
+
+        _, body = self._request(self.placement, "GET",
+                                "/resource_providers/{0}/traits".format(uuid))
+        return body["traits"], body["resource_provider_generation"]
+
+    def sync_provider_traits(self, uuid, profile, retries=5):
+        """ Make the SST-BF traits of resource provider 'uuid' match
+            'profile', keeping all other traits. Retry on generation
+            conflicts. Return True if the traits changed """
+
+        for _ in range(retries):
+            current, generation = self.provider_traits(uuid)
+            wanted = (set(current) - set(PROFILE_TRAITS)) | \
+                set([SST_BF_TRAIT, profile_trait(profile)])
+            if wanted == set(current):
+                return False
+            code, _ = self._request(
+                self.placement, "PUT",
+                "/resource_providers/{0}/traits".format(uuid),
+                ok_codes=(409,),
+                json={"traits": sorted(wanted),
+                      "resource_provider_generation": generation})
+            if code != 409:
+                return True
+        raise OpenStackError("Resource provider '{uuid}' was updated "
+                             "concurrently {retries} times"
+                             .format(uuid=uuid, retries=retries))
+
+    def provider_inventory(self, uuid):
+        """ Return dict which maps resource class to inventory total """
+
+        _, body = self._request(
+            self.placement, "GET",
+            "/resource_providers/{0}/inventories".format(uuid))
+        return dict((rc, inv["total"])
+                    for rc, inv in body["inventories"].items())
+
+    def wait_inventory(self, uuid, expected, timeout, delay=10):
+        """ Poll inventory of resource provider 'uuid' until the totals of
+            the resource classes in dict 'expected' match. Return inventory
+        """
+
+        deadline = time.time() + timeout
+        while True:
+            inventory = self.provider_inventory(uuid)
+            if all(inventory.get(rc) == int(total)
+                   for rc, total in expected.items()):
+                return inventory
+            if time.time() + delay > deadline:
+                raise OpenStackError(
+                    "Timed out after {timeout}s waiting for resource provider "
+                    "'{uuid}' to report inventory {expected}, last seen "
+                    "{inventory}".format(timeout=timeout, uuid=uuid,
+                                         expected=expected,
+                                         inventory=inventory))
+            time.sleep(delay)
+
+    def _sync_host(self, provider, host):
+        """ Wait for the inventory of 'host' and sync its traits """
+
+        if host.get("inventory"):
+            self.wait_inventory(provider["uuid"], host["inventory"],
+                                host.get("timeout", 300))
+        return self.sync_provider_traits(provider["uuid"], host["profile"])
+
+    def sync_fleet_traits(self, hosts, workers=8):
+        """ Sync SST-BF traits of all compute hosts in dict 'hosts', which
+            maps hostname to dict with keys profile and optionally inventory
+            and timeout. Resource providers are listed once and hosts are
+            updated concurrently. Return dict which maps hostname to dict
+            with keys uuid and changed """
+
+        providers = {}
+        for provider in self.resource_providers():
+            providers[provider["name"]] = provider
+            providers.setdefault(provider["name"].split(".")[0], provider)
+        missing = sorted(host for host in hosts if host not in providers)
+        if missing:
+            raise OpenStackError("Unable to get resource provider with name "
+                                 "'{hosts}'".format(hosts="', '"
+                                                    .join(missing)))
+
+        result = {}
+        errors = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(hostname, pool.submit(self._sync_host,
+                                              providers[hostname], host))
+                       for hostname, host in sorted(hosts.items())]
+            for hostname, future in futures:
+                try:
+                    changed = future.result()
+                except OpenStackError as err:
+                    errors.append("{host}: {err}".format(host=hostname,
+                                                         err=err))
+                    continue
+                result[hostname] = {"uuid": providers[hostname]["uuid"],
+                                    "changed": changed}
+        if errors:
+            raise OpenStackError("Failed to sync resource provider traits: " +
+                                 "; ".join(errors))
+        return result
+
+    def flavors(self):
+        """ Return list of all flavors with details """
+
+        _, body = self._request(self.compute, "GET", "/flavors/detail",
+                                params={"is_public": "None"})
+        return body["flavors"]
+
+    def delete_flavor(self, flavor_id):
+        """ Delete flavor 'flavor_id' """
+
+        self._request(self.compute, "DELETE", "/flavors/" + flavor_id,
+                      ok_codes=(404,))
+
+    def create_flavor(self, flavor):
+        """ Create flavor from definition 'flavor' including its extra specs.
+            Return ID of the new flavor """
+
+        _, body = self._request(self.compute, "POST", "/flavors", json={
+            "flavor": dict((key, flavor[key]) for key in
+                           ("name", "ram", "vcpus", "disk", "description"))})
+        flavor_id = body["flavor"]["id"]
+        self.set_extra_specs(flavor_id, flavor["extra_specs"])
+        return flavor_id
+
+    def set_extra_specs(self, flavor_id, extra_specs):
+        """ Create or update extra specs of flavor 'flavor_id' """
+
+        self._request(self.compute, "POST",
+                      "/flavors/{0}/os-extra_specs".format(flavor_id),
+                      json={"extra_specs": extra_specs})
+
+    def unset_extra_spec(self, flavor_id, key):
+        """ Delete extra spec 'key' of flavor 'flavor_id' """
+
+        self._request(self.compute, "DELETE",
+                      "/flavors/{0}/os-extra_specs/{1}".format(flavor_id, key),
+                      ok_codes=(404,))
+
+    def set_description(self, flavor_id, description):
+        """ Set description of flavor 'flavor_id' """
+
+        self._request(self.compute, "PUT", "/flavors/" + flavor_id,
+                      json={"flavor": {"description": description}})
+
+    def _apply_flavor_action(self, action):
+        """ Apply one action returned by plan_flavors() """
+
+        if action["action"] in ("replace", "delete"):
+            self.delete_flavor(action["id"])
+        if action["action"] in ("create", "replace"):
+            self.create_flavor(action["flavor"])
+        if action["action"] == "update":
+            if action["set_specs"]:
+                self.set_extra_specs(action["id"], action["set_specs"])
+            for key in action["unset_specs"]:
+                self.unset_extra_spec(action["id"], key)
+            if action["description"] is not None:
+                self.set_description(action["id"], action["description"])
+
+    def reconcile_flavors(self, profile, workers=8):
+        """ Bring the SST-BF flavors in line with 'profile' using at most
+            'workers' concurrent API calls. Return dict which maps each action
+            to the list of affected flavor names """
+
+        actions = plan_flavors(self.flavors(), profile)
+        summary = dict((name, []) for name in
+                       ("create", "replace", "update", "delete"))
+        errors = []
+        if actions:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [(action, pool.submit(self._apply_flavor_action,
+                                                action))
+                           for action in actions]
+                for action, future in futures:
+                    name = action.get("name") or action["flavor"]["name"]
+                    try:
+                        future.result()
+                    except OpenStackError as err:
+                        errors.append(str(err))
+                        continue
+                    summary[action["action"]].append(name)
+        if errors:
+            raise OpenStackError("Failed to reconcile flavors: " +
+                                 "; ".join(errors))
+        return summary
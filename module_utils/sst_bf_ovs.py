@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Read the Open vSwitch database through the JSON output of ovs-vsctl and
+    build ovs-vsctl arguments which apply many changes in one transaction """
+
+import json
+
+# other_config keys which are only read when ovs-vswitchd initialises DPDK
+DPDK_RESTART_KEYS = ("dpdk-init", "dpdk-lcore-mask", "dpdk-socket-mem",
+                     "dpdk-socket-limit", "dpdk-alloc-mem", "dpdk-extra",
+                     "dpdk-hugepage-dir", "vhost-sock-dir",
+                     "vhost-iommu-support", "vhost-postcopy-support")
+
+# Interface options and columns set from the host description. They are
+# removed from a port when the host description no longer sets them
+QUEUE_OPTIONS = ("n_rxq", "n_rxq_desc", "n_txq_desc")
+MANAGED_COLUMNS = ("mtu_request",)
+
+
+class OvsError(Exception):
+    """ Raised when ovs-vsctl output can not be parsed """
+
+
+def ovsdb_value(value):
+    """ Convert an OVSDB JSON value to a Python value. Maps become dicts,
+        sets become lists and UUIDs become strings """
+
+    if isinstance(value, list) and len(value) == 2:
+        kind, data = value
+        if kind == "map":
+            return dict((ovsdb_value(key), ovsdb_value(val))
+                        for key, val in data)
+        if kind == "set":
+            return [ovsdb_value(val) for val in data]
+        if kind in ("uuid", "named-uuid"):
+            return data
+    return value
+
+
+def parse_list(output):
+    """ Parse the output of 'ovs-vsctl --format=json list' and return a list
+        of dicts which map column name to value """
+
+    try:
+        table = json.loads(output)
+        return [dict(zip(table["headings"],
+                         [ovsdb_value(value) for value in row]))
+                for row in table["data"]]
+    except (ValueError, KeyError, TypeError) as err:
+        raise OvsError("Unable to parse ovs-vsctl output: {err}"
+                       .format(err=err))
+
+
+def missing_column(err, column):
+    """ Return whether ovs-vsctl error output 'err' reports that 'column'
+        does not exist in the database schema, e.g. dpdk_initialized before
+        Open vSwitch 2.10 """
+
+    return "does not contain a column whose name matches \"{column}\"" \
+        .format(column=column) in err
+
+
+def quote(value):
+    """ Quote 'value' as an OVSDB string atom for ovs-vsctl """
+
+    return json.dumps(str(value))
+
+
+def diff_map(current, desired):
+    """ Return dict of the keys of 'desired' whose value differs in
+        'current'. A desired value of None removes the key """
+
+    changes = {}
+    for key, value in desired.items():
+        if value is None:
+            if key in current:
+                changes[key] = None
+        elif current.get(key) != str(value):
+            changes[key] = str(value)
+    return changes
+
+
+def map_args(table, record, column, changes):
+    """ Return ovs-vsctl commands (lists of arguments) which apply map
+        'changes' (see diff_map) to 'column' of 'record' in 'table' """
+
+    commands = []
+    updates = ["{column}:{key}={value}".format(column=column, key=key,
+                                                value=quote(value))
+               for key, value in sorted(changes.items()) if value is not None]
+    if updates:
+        commands.append(["set", table, record] + updates)
+    removals = [key for key, value in sorted(changes.items()) if value is None]
+    if removals:
+        commands.append(["remove", table, record, column] + removals)
+    return commands
+
+
+def transaction(commands):
+    """ Join ovs-vsctl 'commands' (lists of arguments) with '--' so they are
+        applied in a single OVSDB transaction """
+
+    args = []
+    for command in commands:
+        if args:
+            args.append("--")
+        args.extend(command)
+    return args
+
+
+def parse_lists(output):
+    """ Parse the output of several 'ovs-vsctl --format=json list' commands
+        run in one invocation. Return a list with the rows of each table """
+
+    decoder = json.JSONDecoder()
+    tables = []
+    pos = 0
+    output = output.strip()
+    while pos < len(output):
+        try:
+            _, end = decoder.raw_decode(output, pos)
+        except ValueError as err:
+            raise OvsError("Unable to parse ovs-vsctl output: {err}"
+                           .format(err=err))
+        tables.append(parse_list(output[pos:end]))
+        pos = end
+        while pos < len(output) and output[pos].isspace():
+            pos += 1
+    return tables
+
+
+def as_set(value):
+    """ Return OVSDB set column 'value' as list. OVSDB encodes a set with a
+        single element as the bare element """
+
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def plan_bridges(bridges, ports, interfaces, desired, datapath_type,
+                 fail_mode, interface_type, marker):
+    """ Return tuple (commands, changes) which reconcile the rows of tables
+        Bridge, Port and Interface (see parse_list) with 'desired', a dict
+        which maps bridge name to a list of ports (dicts with keys name, type,
+        options and optionally columns, further Interface columns such as
+        mtu_request). Bridges are created with 'datapath_type' and
+        'fail_mode' and tagged with external_ids key 'marker'. Ports of
+        'interface_type' not in 'desired' and tagged bridges not in
+        'desired' are removed, as are QUEUE_OPTIONS and MANAGED_COLUMNS
+        which a port no longer sets """
+
+    changes = dict((key, []) for key in ("bridges_added", "bridges_updated",
+                                         "bridges_removed", "ports_added",
+                                         "ports_updated", "ports_removed"))
+    commands = []
+    port_by_uuid = dict((port["_uuid"], port) for port in ports)
+    iface_by_uuid = dict((iface["_uuid"], iface) for iface in interfaces)
+    bridge_of = {}
+    iface_of = {}
+    for bridge in bridges:
+        for port_uuid in as_set(bridge["ports"]):
+            port = port_by_uuid.get(port_uuid)
+            if port is None:
+                continue
+            bridge_of[port["name"]] = bridge["name"]
+            for iface_uuid in as_set(port["interfaces"]):
+                if iface_uuid in iface_by_uuid:
+                    iface_of[port["name"]] = iface_by_uuid[iface_uuid]
+
+    existing = dict((bridge["name"], bridge) for bridge in bridges)
+    bridge_columns = {"datapath_type": datapath_type, "fail_mode": fail_mode}
+    for name in sorted(desired):
+        bridge = existing.get(name)
+        if bridge is None:
+            commands.append(["add-br", name])
+            changes["bridges_added"].append(name)
+            update = dict(bridge_columns)
+        else:
+            update = dict((column, value)
+                          for column, value in bridge_columns.items()
+                          if bridge[column] != value)
+            if update:
+                changes["bridges_updated"].append(name)
+        if bridge is None or bridge["external_ids"].get(marker) != "true":
+            update["external_ids:" + marker] = "true"
+        if update:
+            commands.append(["set", "Bridge", name] +
+                            ["{column}={value}".format(column=column,
+                                                       value=quote(value))
+                             for column, value in sorted(update.items())])
+
+    removed_bridges = sorted(
+        bridge["name"] for bridge in bridges
+        if bridge["external_ids"].get(marker) == "true" and
+        bridge["name"] not in desired)
+    for name in removed_bridges:
+        commands.append(["del-br", name])
+        changes["bridges_removed"].append(name)
+
+    wanted = set()
+    for bridge_name in sorted(desired):
+        for port in desired[bridge_name]:
+            wanted.add(port["name"])
+            columns = port.get("columns") or {}
+            iface_args = ["type={type}".format(type=quote(port["type"]))] + \
+                ["options:{key}={value}".format(key=key, value=quote(value))
+                 for key, value in sorted(port["options"].items())] + \
+                ["{column}={value}".format(column=column,
+                                           value=json.dumps(value))
+                 for column, value in sorted(columns.items())]
+            current = bridge_of.get(port["name"])
+            if current != bridge_name:
+                if current is not None and current not in removed_bridges:
+                    commands.append(["del-port", current, port["name"]])
+                commands.append(["add-port", bridge_name, port["name"]])
+                commands.append(["set", "Interface", port["name"]] +
+                                iface_args)
+                changes["ports_added"].append(port["name"])
+                continue
+            iface = iface_of.get(port["name"], {})
+            options = iface.get("options", {})
+            stale_options = [key for key in QUEUE_OPTIONS
+                             if key in options and key not in port["options"]]
+            stale_columns = [column for column in MANAGED_COLUMNS
+                             if iface.get(column) not in (None, [])
+                             and column not in columns]
+            updated = bool(stale_options or stale_columns)
+            if iface.get("type") != port["type"] or \
+                    diff_map(options, port["options"]) or \
+                    any(iface.get(column) != value
+                        for column, value in columns.items()):
+                commands.append(["set", "Interface", port["name"]] +
+                                iface_args)
+                updated = True
+            if stale_options:
+                commands.append(["remove", "Interface", port["name"],
+                                 "options"] + stale_options)
+            if stale_columns:
+                commands.append(["clear", "Interface", port["name"]] +
+                                stale_columns)
+            if updated:
+                changes["ports_updated"].append(port["name"])
+
+    for port_name in sorted(bridge_of):
+        if port_name in wanted or bridge_of[port_name] in removed_bridges:
+            continue
+        if iface_of.get(port_name, {}).get("type") == interface_type:
+            commands.append(["del-port", bridge_of[port_name], port_name])
+            changes["ports_removed"].append(port_name)
+    return commands, changes
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Size OVS-DPDK socket memory, 1 GB hugepages and PMD cores per NUMA node
+    from the ports placed on each node, their queues and MTU, and the memory
+    of each node """
+
+import os
+import re
+
+from ansible.module_utils.sst_bf_sysfs import NODE_DIR, SysfsError, read_sysfs
+
+# Defaults of Open vSwitch for DPDK ports
+DEFAULT_MTU = 1500
+DEFAULT_DESC = 2048
+# Mbufs of a shared mempool and added to every per-port mempool
+SHARED_MBUFS = 262144
+MIN_PORT_MBUFS = 16384
+MAX_BURST = 32
+# Ethernet header, CRC and two VLAN tags
+FRAME_OVERHEAD = 26
+# Headroom, struct rte_mbuf and mempool object header of each mbuf
+MBUF_OVERHEAD = 320
+HUGEPAGE_MB = 1024
+
+
+def node_memory_mb(root):
+    """ Return dict which maps NUMA node ID to its total memory in MB read
+        from nodeN/meminfo """
+
+    node_root = os.path.join(root, NODE_DIR)
+    memory = {}
+    if not os.path.isdir(node_root):
+        return memory
+    for entry in os.listdir(node_root):
+        match = re.match(r"^node(\d+)$", entry)
+        if not match:
+            continue
+        meminfo = read_sysfs(root, NODE_DIR, entry, "meminfo") or ""
+        total = re.search(r"MemTotal:\s+(\d+) kB", meminfo)
+        if total is None:
+            raise SysfsError("No MemTotal in meminfo of {node}"
+                             .format(node=entry))
+        memory[int(match.group(1))] = int(total.group(1)) // 1024
+    return memory
+
+
+def ceil_div(value, divisor):
+    """ Return 'value' divided by 'divisor' rounded up """
+
+    return -(-value // divisor)
+
+
+def mbuf_size(mtu):
+    """ Return bytes of one mbuf for frames of 'mtu' """
+
+    return ceil_div(mtu + FRAME_OVERHEAD, 1024) * 1024 + MBUF_OVERHEAD
+
+
+def port_mbufs(n_rxq, rxq_desc, n_txq, txq_desc):
+    """ Return mbufs of a per-port mempool as sized by Open vSwitch """
+
+    return n_rxq * rxq_desc + n_txq * txq_desc + \
+        min(128, n_rxq) * MAX_BURST + MIN_PORT_MBUFS
+
+
+def node_ports(conf, vhost_ports, rxq_auto):
+    """ Return list of ports (dicts with keys n_rxq, n_rxq_desc, n_txq_desc
+        and mtu, n_rxq None if automatic) of NUMA node 'conf' of numa_nodes
+        plus 'vhost_ports' vhost-user ports """
+
+    ports = []
+    for interface in (conf.get("interfaces") or {}).values():
+        n_rxq = interface.get("n_rxq", "auto" if rxq_auto else 1)
+        ports.append({"n_rxq": None if n_rxq == "auto" else int(n_rxq),
+                      "n_rxq_desc": int(interface.get("n_rxq_desc",
+                                                      DEFAULT_DESC)),
+                      "n_txq_desc": int(interface.get("n_txq_desc",
+                                                      DEFAULT_DESC)),
+                      "mtu": int(interface.get("mtu") or DEFAULT_MTU)})
+    vhost_mtu = max([port["mtu"] for port in ports] or [DEFAULT_MTU])
+    ports.extend({"n_rxq": 1, "n_rxq_desc": DEFAULT_DESC,
+                  "n_txq_desc": DEFAULT_DESC, "mtu": vhost_mtu}
+                 for _ in range(int(conf.get("vhost_ports", vhost_ports))))
+    return ports
+
+
+def size_node(ports, pmd_threads, total_threads):
+    """ Return socket memory in MB of a NUMA node with 'ports', 'pmd_threads'
+        PMD threads on the node and 'total_threads' PMD threads on the host.
+        Each MTU needs a shared mempool, or the per-port mempools of its
+        ports if these are larger """
+
+    if not ports:
+        return 0
+    mbufs = {}
+    for port in ports:
+        n_rxq = port["n_rxq"] or max(1, pmd_threads)
+        mbufs[port["mtu"]] = mbufs.get(port["mtu"], 0) + port_mbufs(
+            n_rxq, port["n_rxq_desc"], total_threads + 1, port["n_txq_desc"])
+    size = sum(max(SHARED_MBUFS, count) * mbuf_size(mtu)
+               for mtu, count in mbufs.items())
+    return ceil_div(size, HUGEPAGE_MB * 1024 * 1024) * HUGEPAGE_MB
+
+
+def size_dpdk(numa_nodes, memory_mb, threads_per_core, rxqs_per_pmd=2,
+              vhost_ports=0, guest_hugepages_gb=0, rxq_auto=False,
+              max_fraction=0.9):
+    """ Return tuple (plan, warnings). Plan maps each NUMA node of
+        'numa_nodes' to dict with recommended dpdk_socket_mem,
+        no_physical_cores_pinned and hugepages_1g (socket memory plus
+        'guest_hugepages_gb'). A node polls its rx queues with one PMD thread
+        per 'rxqs_per_pmd' queues. Warnings list nodes whose hugepages exceed
+        'max_fraction' of 'memory_mb' """
+
+    ports = dict((int(node), node_ports(conf, vhost_ports, rxq_auto))
+                 for node, conf in numa_nodes.items())
+    cores = {}
+    for node, node_port_list in ports.items():
+        rxqs = sum(port["n_rxq"] or 1 for port in node_port_list)
+        threads = ceil_div(rxqs, max(1, int(rxqs_per_pmd)))
+        cores[node] = ceil_div(threads, max(1, int(threads_per_core)))
+    total_threads = sum(cores.values()) * int(threads_per_core)
+
+    plan = {}
+    warnings = []
+    for node in sorted(ports):
+        socket_mem = size_node(ports[node], cores[node] * threads_per_core,
+                               total_threads)
+        hugepages = socket_mem // HUGEPAGE_MB + int(guest_hugepages_gb)
+        plan[node] = {"dpdk_socket_mem": socket_mem,
+                      "no_physical_cores_pinned": cores[node],
+                      "hugepages_1g": hugepages}
+        limit = int(memory_mb.get(node, 0) * max_fraction)
+        if hugepages * HUGEPAGE_MB > limit:
+            warnings.append("NUMA node {node} needs {pages} 1 GB hugepages "
+                            "but only {limit} MB of {total} MB may be "
+                            "reserved".format(node=node, pages=hugepages,
+                                              limit=limit,
+                                              total=memory_mb.get(node, 0)))
+    return plan, warnings
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Applied-state record of a host. The record holds, per role phase, the
+    fingerprint of the last successful converge, the boot it was applied in
+    and the facts it produced. The fingerprint of a phase covers the topology,
+    the role variables of the phase and the recorded fingerprints of the
+    phases before it, so a phase is rerun whenever an earlier phase was """
+
+import hashlib
+import json
+
+# Role phases in the order they are applied
+PHASES = ("host", "openstack")
+
+
+def fingerprint(record, phase, topology, role_vars):
+    """ Return sha256 hex digest of 'topology', 'role_vars' and the
+        fingerprints in 'record' of the phases applied before 'phase' """
+
+    earlier = [record.get(name, {}).get("fingerprint")
+               for name in PHASES[:PHASES.index(phase)]]
+    canonical = json.dumps([topology, role_vars, earlier], sort_keys=True,
+                           separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_record(content):
+    """ Parse record 'content' and return it as dict. An empty, unparsable
+        or malformed record is returned as an empty record """
+
+    try:
+        record = json.loads(content) if content else {}
+    except ValueError:
+        return {}
+    if not isinstance(record, dict):
+        return {}
+    return dict((phase, entry) for phase, entry in record.items()
+                if phase in PHASES and isinstance(entry, dict))
+
+
+def dump_record(record):
+    """ Return 'record' serialised for writing to the host """
+
+    return json.dumps(record, sort_keys=True, indent=2) + "\n"
+
+
+def compare(record, phase, digest, boot_id):
+    """ Compare entry of 'phase' in 'record' with fingerprint 'digest'.
+        Return tuple (match, boot_changed) """
+
+    entry = record.get(phase, {})
+    match = entry.get("fingerprint") == digest
+    return match, match and entry.get("boot_id") != boot_id
+
+
+def update_record(record, phase, digest, boot_id, facts):
+    """ Return copy of 'record' with entry of 'phase' replaced """
+
+    updated = dict(record)
+    updated[phase] = {"fingerprint": digest, "boot_id": boot_id,
+                      "facts": facts}
+    return updated
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Helpers shared by the role modules which read CPU and NUMA information
+    from sysfs and write files. Every sysfs path is resolved against a
+    configurable root so the modules can be exercised against a fake sysfs
+    tree """
+
+import os
+import re
+import tempfile
+
+from ansible.module_utils.six import integer_types, string_types
+
+CPU_DIR = "devices/system/cpu"
+NODE_DIR = "devices/system/node"
+HUGEPAGE_DIR = "kernel/mm/hugepages"
+PCI_DIR = "bus/pci/devices"
+MASK_GROUP_BITS = 32
+
+
+class SysfsError(Exception):
+    """ Raised when sysfs content is missing or can not be parsed """
+
+
+def sysfs_path(root, *parts):
+    """ Join argument 'parts' onto sysfs root 'root' and return the path """
+
+    return os.path.join(root, *parts)
+
+
+def read_sysfs(root, *parts):
+    """ Return stripped content of a sysfs file or None if it does not exist
+    """
+
+    path = sysfs_path(root, *parts)
+    try:
+        with open(path) as sysfs_file:
+            return sysfs_file.read().strip()
+    except (IOError, OSError):
+        return None
+
+
+def read_sysfs_int(root, *parts):
+    """ Return content of a sysfs file as an integer or None if it does not
+        exist """
+
+    value = read_sysfs(root, *parts)
+    if value is None:
+        return None
+    if not value.isdigit():
+        raise SysfsError("Expected integer in '{path}' but found '{value}'"
+                         .format(path=sysfs_path(root, *parts), value=value))
+    return int(value)
+
+
+def write_sysfs(root, value, *parts):
+    """ Write 'value' to a sysfs file. Raise SysfsError if the kernel rejects
+        it """
+
+    path = sysfs_path(root, *parts)
+    try:
+        with open(path, "w") as sysfs_file:
+            sysfs_file.write("{value}\n".format(value=value))
+    except (IOError, OSError) as err:
+        raise SysfsError("Failed to write '{value}' to '{path}': {err}"
+                         .format(value=value, path=path, err=err))
+
+
+def write_atomic(module, path, content):
+    """ Write 'content' to a temporary file next to 'path' and move it over
+        'path' with AnsibleModule 'module' """
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                    prefix="." + os.path.basename(path))
+    try:
+        with os.fdopen(fd, "w") as tmp_file:
+            tmp_file.write(content)
+    except (IOError, OSError) as err:
+        os.remove(tmp_path)
+        module.fail_json(msg="Failed to write '{path}': {err}"
+                         .format(path=tmp_path, err=err))
+    module.atomic_move(tmp_path, path)
+
+
+def parse_cpu_list(cpus):
+    """ Convert Linux CPU list syntax (e.g '0-3,8,10-11'), a single CPU ID or
+        a list of either to a sorted list of unique CPU IDs """
+
+    if cpus is None:
+        return []
+    if isinstance(cpus, integer_types):
+        cpus = [cpus]
+    elif isinstance(cpus, string_types):
+        cpus = cpus.split(",")
+
+    result = set()
+    for block in cpus:
+        if isinstance(block, integer_types):
+            if block < 0:
+                raise SysfsError("Invalid CPU ID '{block}'"
+                                 .format(block=block))
+            result.add(block)
+            continue
+        block = str(block).strip()
+        if not block:
+            continue
+        if "," in block:
+            result.update(parse_cpu_list(block))
+            continue
+        match = re.match(r"^(\d+)(?:-(\d+))?$", block)
+        if not match:
+            raise SysfsError("Invalid CPU list entry '{block}'"
+                             .format(block=block))
+        low = int(match.group(1))
+        high = int(match.group(2) or low)
+        if low > high:
+            raise SysfsError("Invalid CPU range '{block}'"
+                             .format(block=block))
+        result.update(range(low, high + 1))
+    return sorted(result)
+
+
+def format_cpu_list(cpus):
+    """ Convert CPU IDs (see parse_cpu_list) to compressed Linux CPU list
+        syntax (e.g '0-3,8,10-11') """
+
+    ranges = []
+    for cpu in parse_cpu_list(cpus):
+        if ranges and ranges[-1][1] == cpu - 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(low) if low == high else "{0}-{1}".format(low, high)
+                    for low, high in ranges)
+
+
+def cpu_mask_value(cpus):
+    """ Return CPU IDs (see parse_cpu_list) as an integer bit mask """
+
+    mask = 0
+    for cpu in parse_cpu_list(cpus):
+        mask |= 1 << cpu
+    return mask
+
+
+def format_cpu_mask(cpus, min_groups=1):
+    """ Convert CPU IDs (see parse_cpu_list) to a comma grouped 32-bit hex
+        mask as read and written by the kernel (e.g '00000001,0000000f'),
+        most significant word first. Argument 'min_groups' pads the mask with
+        leading zero words """
+
+    mask = cpu_mask_value(cpus)
+    groups = []
+    while mask or len(groups) < int(min_groups):
+        groups.append("{0:08x}".format(mask & (2 ** MASK_GROUP_BITS - 1)))
+        mask >>= MASK_GROUP_BITS
+    return ",".join(reversed(groups))
+
+
+def parse_cpu_mask(mask):
+    """ Convert a hex mask, with or without leading '0x', or a comma grouped
+        32-bit mask to a sorted list of CPU IDs """
+
+    if isinstance(mask, integer_types):
+        value = mask
+    else:
+        mask = str(mask).strip().strip('"').lower()
+        if mask.startswith("0x"):
+            mask = mask[2:]
+        groups = mask.split(",")
+        if len(groups) > 1 and any(len(group) > MASK_GROUP_BITS // 4
+                                   for group in groups):
+            raise SysfsError("Invalid CPU mask '{mask}'".format(mask=mask))
+        value = 0
+        try:
+            for group in groups:
+                value = (value << (MASK_GROUP_BITS if len(groups) > 1
+                                   else 4 * len(group))) | int(group, 16)
+        except ValueError:
+            raise SysfsError("Invalid CPU mask '{mask}'".format(mask=mask))
+    return [cpu for cpu in range(value.bit_length()) if value >> cpu & 1]
+
+
+def online_cpus(root):
+    """ Return list of online CPU IDs """
+
+    online = read_sysfs(root, CPU_DIR, "online")
+    if online is None:
+        raise SysfsError("Unable to read '{path}'"
+                         .format(path=sysfs_path(root, CPU_DIR, "online")))
+    return parse_cpu_list(online)
+
+
+def numa_cpu_map(root, cpus):
+    """ Return dict which maps NUMA node ID to the list of CPU IDs on that
+        node. Kernels without NUMA support report every CPU on node 0 """
+
+    node_root = sysfs_path(root, NODE_DIR)
+    cpu_set = set(cpus)
+    nodes = {}
+    if os.path.isdir(node_root):
+        for entry in os.listdir(node_root):
+            match = re.match(r"^node(\d+)$", entry)
+            if not match:
+                continue
+            cpulist = read_sysfs(root, NODE_DIR, entry, "cpulist")
+            node_cpus = [cpu for cpu in parse_cpu_list(cpulist)
+                         if cpu in cpu_set]
+            nodes[int(match.group(1))] = node_cpus
+    if not nodes:
+        nodes[0] = list(cpus)
+    return nodes
+
+
+def pci_locality(root, pci_address, nodes):
+    """ Return tuple (numa_node, local_cpus) of PCI device 'pci_address'.
+        If the device reports no NUMA node (-1) the node is taken from its
+        local CPUs when they are all on one node of 'nodes' (see
+        numa_cpu_map), else numa_node is None """
+
+    if not os.path.isdir(sysfs_path(root, PCI_DIR, pci_address)):
+        raise SysfsError("PCI device '{pci}' does not exist"
+                         .format(pci=pci_address))
+    local_cpus = parse_cpu_list(read_sysfs(root, PCI_DIR, pci_address,
+                                           "local_cpulist"))
+    node = read_sysfs(root, PCI_DIR, pci_address, "numa_node")
+    if node is not None and node.isdigit():
+        return int(node), local_cpus
+    local_nodes = set(cpu_node for cpu_node, cpus in nodes.items()
+                      if set(cpus) & set(local_cpus))
+    if len(local_nodes) == 1:
+        return local_nodes.pop(), local_cpus
+    return None, local_cpus
+
+
+def node_hugepage_parts(node, size_kb):
+    """ Return sysfs path parts of the number of hugepages of 'size_kb' kB
+        on NUMA node 'node' """
+
+    return (NODE_DIR, "node{node}".format(node=node), "hugepages",
+            "hugepages-{size}kB".format(size=size_kb), "nr_hugepages")
+
+
+def read_node_hugepages(root, targets):
+    """ Return dict which maps (size, node) of the pools of 'targets' (see
+        set_node_hugepages) to the pages they hold """
+
+    current = {}
+    for size, nodes in targets.items():
+        for node in nodes:
+            count = read_sysfs_int(root, *node_hugepage_parts(node, size))
+            if count is None:
+                raise SysfsError("Hugepage size {size}kB is not supported on "
+                                 "NUMA node {node}".format(size=size,
+                                                           node=node))
+            current[(size, node)] = count
+    return current
+
+
+def set_node_hugepages(root, targets, dry_run=False):
+    """ Set the hugepages of each NUMA node to 'targets', a dict which maps
+        hugepage size in kB to a dict of NUMA node and page count. Pools
+        which shrink are written first so their memory is free for pools
+        which grow. Return tuple (changed, allocated) where allocated has
+        the shape of 'targets' """
+
+    current = read_node_hugepages(root, targets)
+    changes = sorted(((targets[size][node] - count, size, node)
+                      for (size, node), count in current.items()
+                      if targets[size][node] != count))
+    if not dry_run:
+        for _, size, node in changes:
+            write_sysfs(root, targets[size][node],
+                        *node_hugepage_parts(node, size))
+    allocated = {}
+    for (size, node), count in current.items():
+        if dry_run:
+            count = targets[size][node]
+        elif targets[size][node] != count:
+            count = read_sysfs_int(root, *node_hugepage_parts(node, size))
+        allocated.setdefault(size, {})[node] = count
+    return bool(changes), allocated
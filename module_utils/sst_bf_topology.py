@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Build the SST-BF topology of a host (frequency tier, NUMA node and SMT
+    siblings of every online CPU) from a single walk of sysfs """
+
+from ansible.module_utils.sst_bf_sysfs import (CPU_DIR, SysfsError,
+                                               numa_cpu_map, online_cpus,
+                                               parse_cpu_list, read_sysfs,
+                                               read_sysfs_int)
+
+SST_BF_UNAVAILABLE = "SST-BF is not available. Ensure you have kernel ver. " \
+                     "5.1 or greater and SST-BF support enabled in BIOS"
+
+
+def discover_topology(root):
+    """ Walk sysfs under 'root' and return a dict describing the SST-BF
+        topology of the host. Raise SysfsError if SST-BF is not available """
+
+    cpus = online_cpus(root)
+    if not cpus:
+        raise SysfsError("No online CPUs found")
+    numa_nodes = numa_cpu_map(root, cpus)
+    cpu_node = {}
+    for node, node_cpus in numa_nodes.items():
+        for cpu in node_cpus:
+            cpu_node[cpu] = node
+
+    online = set(cpus)
+    base_freqs = {}
+    siblings = {}
+    for cpu in cpus:
+        cpu_dir = "cpu{0}".format(cpu)
+        base_freq = read_sysfs_int(root, CPU_DIR, cpu_dir, "cpufreq",
+                                   "base_frequency")
+        if base_freq is None:
+            raise SysfsError(SST_BF_UNAVAILABLE)
+        base_freqs[cpu] = base_freq
+        sibling_list = read_sysfs(root, CPU_DIR, cpu_dir, "topology",
+                                  "thread_siblings_list")
+        siblings[cpu] = [sibling for sibling in parse_cpu_list(sibling_list)
+                         if sibling in online] or [cpu]
+
+    # SST-BF exposes two base frequencies. CPUs with the higher base
+    # frequency form the high priority tier.
+    freqs = sorted(set(base_freqs.values()))
+    if len(freqs) < 2:
+        raise SysfsError(SST_BF_UNAVAILABLE)
+    high_freq = freqs[-1]
+
+    cpu_info = {}
+    groups = []
+    seen_groups = set()
+    for cpu in cpus:
+        group = siblings[cpu]
+        if tuple(group) not in seen_groups:
+            seen_groups.add(tuple(group))
+            groups.append(group)
+        cpu_info[cpu] = {
+            "tier": "high" if base_freqs[cpu] == high_freq else "normal",
+            "numa_node": cpu_node.get(cpu, 0),
+            "siblings": group,
+            "base_frequency": base_freqs[cpu],
+        }
+
+    return {
+        "online_cpus": cpus,
+        "cpus": cpu_info,
+        "numa_nodes": numa_nodes,
+        "sibling_groups": groups,
+        "threads_per_core": max(len(group) for group in groups),
+        "high_cores": [cpu for cpu in cpus if cpu_info[cpu]["tier"] == "high"],
+        "normal_cores": [cpu for cpu in cpus
+                         if cpu_info[cpu]["tier"] == "normal"],
+        "base_frequency": {"high": high_freq, "normal": freqs[0]},
+    }
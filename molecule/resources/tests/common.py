@@ -13,10 +13,57 @@
 # limitations under the License.
 
 """ This file contains functions to support test files """
-from os import stat
-from tempfile import mkstemp
+from hashlib import sha256
+from importlib import import_module
+from os import makedirs, path, stat
+from shutil import rmtree
+from subprocess import CalledProcessError, call, check_output
+from sys import path as sys_path
 import pytest
 
+ROLE_PATH = path.abspath(path.join(path.dirname(__file__), "..", "..", ".."))
+CPM_REPO_URL = "https://github.com/intel/CommsPowerManagement.git"
+CPM_COMMIT = "05509e90fc082538609198c05179a52971bb5897"
+
+
+def use_role_module_utils():
+    """ Make module_utils shipped with this role importable through the
+        'ansible.module_utils' namespace, as Ansible does for role modules """
+
+    import ansible.module_utils
+    module_utils_path = path.join(ROLE_PATH, "module_utils")
+    if module_utils_path not in ansible.module_utils.__path__:
+        ansible.module_utils.__path__.append(module_utils_path)
+
+
+def role_plugin(plugin_dir, name):
+    """ Import plugin 'name' shipped with this role in directory
+        'plugin_dir' (e.g action_plugins) and return it as module """
+
+    plugins_path = path.join(ROLE_PATH, plugin_dir)
+    if plugins_path not in sys_path:
+        sys_path.append(plugins_path)
+    return import_module(name)
+
+
+def role_filters(name):
+    """ Import filter plugin 'name' shipped with this role and return the
+        filters it exports as a dict """
+
+    return role_plugin("filter_plugins", name).FilterModule().filters()
+
+
+def write_files(root, files):
+    """ Create a fake file tree (e.g sysfs) below directory 'root'. Argument
+        'files' maps a relative file path to its content """
+
+    for rel_path, content in files.items():
+        file_path = path.join(str(root), rel_path)
+        if not path.isdir(path.dirname(file_path)):
+            makedirs(path.dirname(file_path))
+        with open(file_path, "w") as out:
+            out.write("{content}\n".format(content=content))
+
 
 @pytest.fixture(scope="module")
 def os_secrets(host, ansible_vars):
@@ -79,33 +126,77 @@ def os_secrets(host, ansible_vars):
     return os_sec
 
 
-@pytest.fixture(scope="module")
-def sst_bf_repo_path(host, ansible_vars):
-    """ Get supporting script and return file path as string """
-
-    remote_location = "https://github.com/intel/CommsPowerManagement"
-    commit = "05509e90fc082538609198c05179a52971bb5897"
+def checkout_head(checkout):
+    """ Return commit checked out at git checkout 'checkout' or None """
 
-    # Attempt to get repository from GitHub
-    _, file_location = mkstemp()
-    cmd = host.run("git clone {repo_url} {file_loc}"
-                   .format(repo_url=remote_location, file_loc=file_location))
-    if cmd.rc != 0:
+    try:
+        return check_output(["git", "-C", checkout, "rev-parse", "--verify",
+                             "HEAD"]).decode().strip()
+    except (OSError, CalledProcessError):
+        return None
+
+
+def cached_cpm_checkout(cache_dir, commit):
+    """ Return path of the CommsPowerManagement checkout of 'commit' in the
+        controller cache 'cache_dir', cloning it if it is missing, is not
+        checked out at 'commit' or sst_bf.py does not match the recorded
+        sha256 """
+
+    checkout = path.join(cache_dir, "CommsPowerManagement", commit)
+    marker = checkout + ".sha256"
+    script = path.join(checkout, "sst_bf.py")
+    if path.isfile(script) and path.isfile(marker) and \
+            checkout_head(checkout) == commit:
+        with open(marker) as marker_file:
+            if marker_file.read().strip() == file_sha256(script):
+                return checkout
+
+    rmtree(checkout, ignore_errors=True)
+    makedirs(path.dirname(checkout), exist_ok=True)
+    if call(["git", "clone", "-q", CPM_REPO_URL, checkout]) != 0:
         raise IOError("Failed to download git repo needed to test SST-BF")
+    if call(["git", "-C", checkout, "checkout", "-q", commit]) != 0 or \
+            checkout_head(checkout) != commit:
+        raise Exception("Failed to checkout commit")
+    if not path.isfile(script):
+        raise FileNotFoundError("Could not find sst_bf.py in dir '{file_loc}'"
+                                .format(file_loc=checkout))
+    with open(marker, "w") as marker_file:
+        marker_file.write(file_sha256(script) + "\n")
+    return checkout
 
-    # Checkout specific commit
-    cmd = host.run("git -C {file_loc} checkout {commit_id}"
-                   .format(file_loc=file_location, commit_id=commit))
-    if cmd.rc != 0:
-        raise Exception("Faied to checkout commit")
 
+def file_sha256(file_path):
+    """ Return hex sha256 digest of file at 'file_path' """
+
+    digest = sha256()
+    with open(file_path, "rb") as file_obj:
+        for chunk in iter(lambda: file_obj.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@pytest.fixture(scope="module")
+def sst_bf_repo_path(host, ansible_vars):
+    """ Copy supporting script from the controller cache to the target and
+        return its directory as string """
+
+    cache_dir = path.expanduser(ansible_vars.get("sst_bf_cache_dir",
+                                                 "~/.cache/sst_bf"))
+    commit = ansible_vars.get("cpm_commit", CPM_COMMIT)
+    checkout = cached_cpm_checkout(cache_dir, commit)
+
+    file_location = host.check_output("mktemp -d")
+    host.ansible("copy", "src={src} dest={dest}/sst_bf.py mode=0755"
+                 .format(src=path.join(checkout, "sst_bf.py"),
+                         dest=file_location), check=False)
     if not host.file(file_location + "/sst_bf.py").exists:
         raise FileNotFoundError("Could not find sst_bf.py in dir '{file_loc}'"
                                 .format(file_loc=file_location))
 
     yield file_location
 
-    # clean up repository
+    # clean up copy of the supporting script
     host.run("rm -rf {file_loc}".format(file_loc=file_location))
 
 
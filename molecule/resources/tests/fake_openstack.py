@@ -0,0 +1,292 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Minimal in-memory stand-in for the Placement and Compute APIs, served
+    over HTTP on localhost for tests of the role's OpenStack client """
+
+import json
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeOpenStack(object):
+    """ State of the fake cloud and the requests it received """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.traits = set()
+        self.providers = {}
+        self.flavors = {}
+        self.requests = []
+
+    def add_provider(self, name, traits=None, inventories=None):
+        """ Add resource provider 'name' and return its UUID """
+
+        provider_uuid = str(uuid.uuid4())
+        self.providers[provider_uuid] = {"name": name, "generation": 0,
+                                         "traits": list(traits or []),
+                                         "inventories": inventories or {}}
+        return provider_uuid
+
+    def add_flavor(self, name, ram, vcpus, disk, description=None,
+                   extra_specs=None):
+        """ Add flavor 'name' and return its ID """
+
+        flavor_id = str(uuid.uuid4())
+        self.flavors[flavor_id] = {"id": flavor_id, "name": name, "ram": ram,
+                                   "vcpus": vcpus, "disk": disk,
+                                   "description": description,
+                                   "extra_specs": dict(extra_specs or {})}
+        return flavor_id
+
+    def writes(self):
+        """ Return list of (method, path) of requests which modify state """
+
+        return [(method, path) for method, path, _ in self.requests
+                if method != "GET"]
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """ Route requests to the Placement and Compute handlers below """
+
+    def log_message(self, *args):
+        """ Keep test output quiet """
+
+    def _reply(self, code, body=None):
+        """ Send response with status 'code' and JSON body 'body' """
+
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def body(self):
+        """ Return decoded JSON request body """
+
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length).decode()) if length else {}
+
+    def microversion(self):
+        """ Return requested microversion as a tuple of integers """
+
+        header = self.headers.get("OpenStack-API-Version") or ""
+        return tuple(int(part) for part in header.split()[-1].split("."))
+
+    def _handle(self, method):
+        """ Record request and dispatch it to the matching route """
+
+        url = urlparse(self.path)
+        cloud = self.server.cloud
+        with cloud.lock:
+            cloud.requests.append((method, url.path,
+                                   self.headers.get("OpenStack-API-Version")))
+            query = parse_qs(url.query)
+            for prefix, routes in (("/placement", PLACEMENT_ROUTES),
+                                   ("/compute", COMPUTE_ROUTES)):
+                if not url.path.startswith(prefix):
+                    continue
+                path = url.path[len(prefix):]
+                for route_method, pattern, func in routes:
+                    match = re.match(pattern + "$", path)
+                    if route_method == method and match:
+                        code, body = func(self, cloud, query, *match.groups())
+                        return self._reply(code, body)
+            return self._reply(404, {"error": "not found"})
+
+    def do_GET(self):
+        """ Handle GET request """
+
+        self._handle("GET")
+
+    def do_PUT(self):
+        """ Handle PUT request """
+
+        self._handle("PUT")
+
+    def do_POST(self):
+        """ Handle POST request """
+
+        self._handle("POST")
+
+    def do_DELETE(self):
+        """ Handle DELETE request """
+
+        self._handle("DELETE")
+
+
+def list_traits(_, cloud, query):
+    """ List traits, optionally filtered with 'name=in:...' """
+
+    traits = sorted(cloud.traits)
+    name = query.get("name", [""])[0]
+    if name.startswith("in:"):
+        traits = [trait for trait in traits if trait in name[3:].split(",")]
+    return 200, {"traits": traits}
+
+
+def create_trait(_, cloud, __, name):
+    """ Create custom trait """
+
+    code = 204 if name in cloud.traits else 201
+    cloud.traits.add(name)
+    return code, None
+
+
+def list_providers(_, cloud, __):
+    """ List resource providers """
+
+    return 200, {"resource_providers": [
+        {"uuid": rp_uuid, "name": rp["name"], "generation": rp["generation"]}
+        for rp_uuid, rp in cloud.providers.items()]}
+
+
+def get_provider_traits(_, cloud, __, rp_uuid):
+    """ Show traits of a resource provider """
+
+    provider = cloud.providers[rp_uuid]
+    return 200, {"traits": provider["traits"],
+                 "resource_provider_generation": provider["generation"]}
+
+
+def set_provider_traits(handler, cloud, __, rp_uuid):
+    """ Replace traits of a resource provider, checking the
+        provider generation """
+
+    provider = cloud.providers[rp_uuid]
+    body = handler.body()
+    if body["resource_provider_generation"] != provider["generation"]:
+        return 409, {"errors": [{"code": "placement.concurrent_update"}]}
+    unknown = [trait for trait in body["traits"] if trait not in cloud.traits
+               and trait.startswith("CUSTOM_")]
+    if unknown:
+        return 400, {"errors": [{"detail": "unknown traits"}]}
+    provider["traits"] = list(body["traits"])
+    provider["generation"] += 1
+    return 200, {"traits": provider["traits"],
+                 "resource_provider_generation": provider["generation"]}
+
+
+def get_inventories(_, cloud, __, rp_uuid):
+    """ Show inventories of a resource provider """
+
+    provider = cloud.providers[rp_uuid]
+    inventories = dict((rc, {"total": total})
+                       for rc, total in provider["inventories"].items())
+    return 200, {"inventories": inventories,
+                 "resource_provider_generation": provider["generation"]}
+
+
+def list_flavors(handler, cloud, _):
+    """ List flavors. Extra specs are included from 2.61 """
+
+    with_specs = handler.microversion() >= (2, 61)
+    flavors = []
+    for flavor in cloud.flavors.values():
+        flavor = dict(flavor)
+        if not with_specs:
+            del flavor["extra_specs"]
+        flavors.append(flavor)
+    return 200, {"flavors": flavors}
+
+
+def create_flavor(handler, cloud, _):
+    """ Create flavor """
+
+    flavor = handler.body()["flavor"]
+    if any(existing["name"] == flavor["name"]
+           for existing in cloud.flavors.values()):
+        return 409, {"conflictingRequest": {"message": "already exists"}}
+    flavor_id = cloud.add_flavor(flavor["name"], flavor["ram"],
+                                 flavor["vcpus"], flavor["disk"],
+                                 flavor.get("description"))
+    return 200, {"flavor": cloud.flavors[flavor_id]}
+
+
+def update_flavor(handler, cloud, _, flavor_id):
+    """ Update flavor description """
+
+    body = handler.body()
+    cloud.flavors[flavor_id]["description"] = body["flavor"]["description"]
+    return 200, {"flavor": cloud.flavors[flavor_id]}
+
+
+def delete_flavor(_, cloud, __, flavor_id):
+    """ Delete flavor """
+
+    if cloud.flavors.pop(flavor_id, None) is None:
+        return 404, None
+    return 202, None
+
+
+def set_extra_specs(handler, cloud, _, flavor_id):
+    """ Create or update flavor extra specs """
+
+    specs = handler.body()["extra_specs"]
+    cloud.flavors[flavor_id]["extra_specs"].update(specs)
+    return 200, {"extra_specs": cloud.flavors[flavor_id]["extra_specs"]}
+
+
+def delete_extra_spec(_, cloud, __, flavor_id, key):
+    """ Delete flavor extra spec """
+
+    cloud.flavors[flavor_id]["extra_specs"].pop(key, None)
+    return 200, None
+
+
+PLACEMENT_ROUTES = [
+    ("GET", r"/traits", list_traits),
+    ("PUT", r"/traits/([^/]+)", create_trait),
+    ("GET", r"/resource_providers", list_providers),
+    ("GET", r"/resource_providers/([^/]+)/traits", get_provider_traits),
+    ("PUT", r"/resource_providers/([^/]+)/traits", set_provider_traits),
+    ("GET", r"/resource_providers/([^/]+)/inventories", get_inventories),
+]
+
+COMPUTE_ROUTES = [
+    ("GET", r"/flavors/detail", list_flavors),
+    ("POST", r"/flavors", create_flavor),
+    ("PUT", r"/flavors/([^/]+)", update_flavor),
+    ("DELETE", r"/flavors/([^/]+)", delete_flavor),
+    ("POST", r"/flavors/([^/]+)/os-extra_specs", set_extra_specs),
+    ("DELETE", r"/flavors/([^/]+)/os-extra_specs/([^/]+)", delete_extra_spec),
+]
+
+
+class FakeServer(ThreadingMixIn, HTTPServer):
+    """ Threaded HTTP server holding a FakeOpenStack """
+
+    daemon_threads = True
+
+    def __init__(self, cloud):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), FakeHandler)
+        self.cloud = cloud
+
+
+def start_fake_openstack():
+    """ Start a fake cloud in a background thread. Return tuple
+        (server, cloud, placement endpoint, compute endpoint) """
+
+    cloud = FakeOpenStack()
+    server = FakeServer(cloud)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    base = "http://127.0.0.1:{port}".format(port=server.server_address[1])
+    return server, cloud, base + "/placement", base + "/compute"
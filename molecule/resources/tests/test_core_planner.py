@@ -0,0 +1,222 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test OVS-DPDK PMD and lcore core planning filter """
+import pytest
+from ansible.errors import AnsibleFilterError
+
+from common import role_filters
+
+PLAN_CORES = role_filters("core_planner")["sst_bf_plan_cores"]
+ISOLATION_CORES = role_filters("core_planner")["sst_bf_isolation_cores"]
+RESERVE_CORES = role_filters("core_planner")["sst_bf_reserve_host_cores"]
+
+# Two sockets, four cores per socket, two threads per core. Odd cores are in
+# the high priority tier. Keys are strings as they are once the topology has
+# been returned as an Ansible fact.
+HIGH_CPUS = [1, 3, 5, 7, 9, 11, 13, 15]
+NORMAL_CPUS = [0, 2, 4, 6, 8, 10, 12, 14]
+
+
+def fake_topology():
+    """ Return SST-BF topology fact of the fake host """
+
+    cpus = {}
+    for cpu in range(16):
+        core = cpu % 8
+        cpus[str(cpu)] = {"numa_node": core // 4,
+                          "siblings": [core, core + 8],
+                          "tier": "high" if cpu % 2 else "normal"}
+    return {"cpus": cpus,
+            "numa_nodes": {"0": [0, 1, 2, 3, 8, 9, 10, 11],
+                           "1": [4, 5, 6, 7, 12, 13, 14, 15]}}
+
+
+def test_pmd_and_lcore_plan():
+    """ Test PMD cores are whole physical cores on each requested NUMA node
+        and lcores are taken from the normal priority tier """
+
+    numa_nodes = {0: {"no_physical_cores_pinned": 1},
+                  1: {"no_physical_cores_pinned": 2}}
+    plan = PLAN_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS, numa_nodes,
+                      True, 3, 0, "FREQUENCY_HIGH_DEDICATED")
+
+    assert plan["pmd_cores"] == [1, 5, 7, 9, 13, 15]
+    assert plan["lcore_cores"] == [0, 2, 8]
+    assert plan["high_cores"] == [3, 11]
+    assert plan["normal_cores"] == [4, 6, 10, 12, 14]
+    assert plan["dedicated_cores"] == plan["high_cores"]
+    assert plan["shared_cores"] == plan["normal_cores"]
+
+
+def test_normal_priority_pmd():
+    """ Test PMD and lcore share the normal priority tier without overlap """
+
+    numa_nodes = {0: {"no_physical_cores_pinned": 1}}
+    plan = PLAN_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS, numa_nodes,
+                      False, 2, 0)
+
+    assert plan["pmd_cores"] == [0, 8]
+    assert plan["lcore_cores"] == [2, 10]
+    assert plan["high_cores"] == HIGH_CPUS
+    assert "dedicated_cores" not in plan
+
+
+@pytest.mark.parametrize("numa_nodes,lcores", [
+    ({0: {"no_physical_cores_pinned": 3}}, 1),
+    ({0: {"no_physical_cores_pinned": 0}}, 1),
+    ({2: {"no_physical_cores_pinned": 1}}, 1),
+    ({1: {"no_physical_cores_pinned": 1}}, 9),
+])
+def test_capacity_errors(numa_nodes, lcores):
+    """ Test requests which can not be satisfied raise a filter error """
+
+    with pytest.raises(AnsibleFilterError):
+        PLAN_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS, numa_nodes,
+                   True, lcores, 0)
+
+
+def test_lcore_placement():
+    """ Test lcore cores are taken from the NUMA node with most interfaces
+        or are the given normal priority CPUs """
+
+    numa_nodes = {0: {"no_physical_cores_pinned": 1},
+                  1: {"no_physical_cores_pinned": 1,
+                      "interfaces": {"eno1": "0000:af:00.0"}}}
+    plan = PLAN_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS, numa_nodes,
+                      True, 2, "auto")
+    assert plan["lcore_cores"] == [4, 12]
+
+    plan = PLAN_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS, numa_nodes,
+                      True, 2, "auto", lcore_cpus=[6, 2])
+    assert plan["lcore_cores"] == [2, 6]
+    assert 6 not in plan["normal_cores"]
+
+    with pytest.raises(AnsibleFilterError):
+        PLAN_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS, numa_nodes,
+                   True, 1, "auto", lcore_cpus=[1])
+
+
+@pytest.mark.parametrize("isolation,isolated", [
+    ("none", []),
+    ("pmd", [1, 9]),
+    ("dedicated", [3, 5, 7, 11, 13, 15]),
+    ("both", [1, 3, 5, 7, 9, 11, 13, 15]),
+])
+def test_isolation_cores(isolation, isolated):
+    """ Test CPUs isolated for each isolation and that housekeeping CPUs are
+        the host cores and the boot CPU whatever is isolated """
+
+    numa_nodes = {0: {"no_physical_cores_pinned": 1}}
+    plan = PLAN_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS, numa_nodes,
+                      True, 1, 0, "FREQUENCY_FIXED_HIGH_DEDICATED")
+    cores = ISOLATION_CORES(plan, isolation)
+
+    assert cores["isolated"] == isolated
+    assert cores["housekeeping"] == [0, 2, 4, 6, 8, 10, 12, 14]
+
+
+def test_reserve_boot_cpu():
+    """ Test CPU 0 is reserved for the host if its tier is offered to
+        dedicated guests, so it is neither dedicated nor isolated """
+
+    reserved = RESERVE_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS,
+                             "FREQUENCY_VAR_HIGH_SHARED")
+    assert reserved == {"host_cores": [0], "high_cores": HIGH_CPUS,
+                        "normal_cores": NORMAL_CPUS[1:]}
+    numa_nodes = {0: {"no_physical_cores_pinned": 0},
+                  1: {"no_physical_cores_pinned": 1}}
+    plan = PLAN_CORES(fake_topology(), reserved["high_cores"],
+                      reserved["normal_cores"], numa_nodes, True, 1, 1,
+                      "FREQUENCY_VAR_HIGH_SHARED",
+                      host_cores=reserved["host_cores"])
+    assert plan["host_cores"] == [0]
+    assert 0 not in plan["dedicated_cores"]
+    cores = ISOLATION_CORES(plan, "both")
+    assert 0 not in cores["isolated"]
+    assert 0 in cores["housekeeping"]
+
+    reserved = RESERVE_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS,
+                             "FREQUENCY_FIXED_HIGH_DEDICATED")
+    assert reserved["host_cores"] == []
+    assert reserved["normal_cores"] == NORMAL_CPUS
+
+
+def test_isolation_rejects_boot_cpu():
+    """ Test CPU 0 can not be an isolated PMD core or be offered to dedicated
+        guests """
+
+    plan = {"pmd_cores": [0, 8], "dedicated_cores": [2],
+            "normal_cores": [2, 4], "lcore_cores": [6]}
+    assert ISOLATION_CORES(plan, "none")["housekeeping"] == [4]
+    with pytest.raises(AnsibleFilterError):
+        ISOLATION_CORES(plan, "pmd")
+
+    plan = {"pmd_cores": [1], "dedicated_cores": [0, 2],
+            "normal_cores": [0, 2, 4], "lcore_cores": [6]}
+    with pytest.raises(AnsibleFilterError):
+        ISOLATION_CORES(plan, "none")
+
+
+def test_isolation_without_housekeeping():
+    """ Test isolating every CPU leaves the host cores for housekeeping and
+        an invalid isolation raises a filter error """
+
+    plan = {"pmd_cores": [1, 2], "dedicated_cores": [3],
+            "normal_cores": [3], "lcore_cores": [4], "host_cores": [0]}
+    assert ISOLATION_CORES(plan, "both") == \
+        {"isolated": [1, 2, 3], "housekeeping": [0]}
+    with pytest.raises(AnsibleFilterError):
+        ISOLATION_CORES(plan, "all")
+
+
+def test_host_cores():
+    """ Test host services are kept off dedicated cores and get the cores
+        reserved for the host """
+
+    host_cores = role_filters("core_planner")["sst_bf_host_cores"]
+    numa_nodes = {0: {"no_physical_cores_pinned": 1}}
+    plan = PLAN_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS, numa_nodes,
+                      True, 1, 0, "FREQUENCY_FIXED_HIGH_DEDICATED")
+    assert host_cores(plan) == [2, 4, 6, 8, 10, 12, 14]
+
+    plan = PLAN_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS, numa_nodes,
+                      True, 1, 0, "FREQUENCY_FIXED_HIGH_SHARED")
+    assert host_cores(plan) == []
+
+    reserved = RESERVE_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS,
+                             "FREQUENCY_FIXED_HIGH_SHARED", 2)
+    assert reserved["host_cores"] == [0, 8]
+    plan = PLAN_CORES(fake_topology(), reserved["high_cores"],
+                      reserved["normal_cores"], numa_nodes, True, 1, 0,
+                      "FREQUENCY_FIXED_HIGH_SHARED",
+                      host_cores=reserved["host_cores"])
+    assert plan["lcore_cores"] == [2]
+    assert host_cores(plan) == [0, 8]
+
+
+def test_reserve_host_core_count():
+    """ Test CPU 0 is reserved even without a host core count and a count
+        larger than the free normal priority cores raises a filter error """
+
+    reserved = RESERVE_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS,
+                             "FREQUENCY_VAR_HIGH_SHARED", 0)
+    assert reserved["host_cores"] == [0]
+    reserved = RESERVE_CORES(fake_topology(), HIGH_CPUS, [2, 4, 6],
+                             "FREQUENCY_VAR_HIGH_SHARED", 2)
+    assert reserved == {"host_cores": [2, 4], "high_cores": HIGH_CPUS,
+                        "normal_cores": [6]}
+    with pytest.raises(AnsibleFilterError):
+        RESERVE_CORES(fake_topology(), HIGH_CPUS, NORMAL_CPUS,
+                      "FREQUENCY_VAR_HIGH_SHARED", 9)
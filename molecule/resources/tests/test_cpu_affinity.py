@@ -0,0 +1,74 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test if host services are kept on normal priority cores """
+import os
+
+import pytest
+import testinfra.utils.ansible_runner
+
+from common import ansible_vars
+from common import role_filters
+
+TESTINFRA_HOSTS = testinfra.utils.ansible_runner.AnsibleRunner(
+    os.environ["MOLECULE_INVENTORY_FILE"]
+).get_hosts("all")
+
+CPU_LIST = role_filters("cpu_mask")["cpu_list"]
+
+
+def allowed_cpus(host, pid):
+    """ Get the CPUs process 'pid' of target may run on as list of CPU IDs
+    """
+
+    with host.sudo():
+        status = host.file("/proc/{pid}/status".format(pid=pid)) \
+            .content_string
+    for line in status.splitlines():
+        if line.startswith("Cpus_allowed_list:"):
+            return CPU_LIST(line.split(":", 1)[1])
+    raise Exception("Failed to get allowed CPUs of process {pid}"
+                    .format(pid=pid))
+
+
+@pytest.fixture(scope="module")
+def check_cpu_affinity(ansible_vars):
+    """ Skip test if the Ansible role did not set the affinity of services
+    """
+
+    if not ansible_vars.get("sst_bf_cpu_affinity"):
+        pytest.skip("CPU affinity of host services is not set")
+
+
+@pytest.mark.usefixtures("check_cpu_affinity")
+def test_manager_affinity(host, ansible_vars):
+    """ Test if the systemd manager runs on the host cores """
+
+    assert allowed_cpus(host, 1) == sorted(ansible_vars["host_cores"]), \
+        "systemd manager may run outside of the host cores"
+
+
+@pytest.mark.usefixtures("check_cpu_affinity")
+def test_service_affinity(host, ansible_vars):
+    """ Test if services placed explicitly run on their CPUs """
+
+    for service, cpus in ansible_vars["sst_bf_service_cpu_affinity"].items():
+        with host.sudo():
+            pid = host.check_output("systemctl show -p MainPID --value "
+                                    "{service}".format(service=service))
+        if not pid.isdigit() or int(pid) == 0:
+            continue
+        assert allowed_cpus(host, pid) == CPU_LIST(cpus), "Service {service} "\
+            "may run outside of CPUs {cpus}".format(service=service,
+                                                    cpus=cpus)
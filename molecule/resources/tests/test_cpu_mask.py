@@ -0,0 +1,85 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test CPU list and CPU mask conversion filters """
+import pytest
+from ansible.errors import AnsibleFilterError
+
+from common import role_filters
+
+FILTERS = role_filters("cpu_mask")
+
+
+def test_cpu_list():
+    """ Test CPU lists, ranges and single IDs are normalised """
+
+    cpu_list = FILTERS["cpu_list"]
+    assert cpu_list("2-5,10-13") == [2, 3, 4, 5, 10, 11, 12, 13]
+    assert cpu_list([4, "7", "0-1", 4]) == [0, 1, 4, 7]
+    assert cpu_list(3) == [3]
+    assert cpu_list("") == []
+
+
+def test_cpu_range():
+    """ Test CPU IDs are compressed to Linux CPU list syntax """
+
+    assert FILTERS["cpu_range"]([13, 2, 3, 4, 5, 10, 11, 12]) == "2-5,10-13"
+    assert FILTERS["cpu_range"]([1, 3]) == "1,3"
+    assert FILTERS["cpu_range"]([]) == ""
+
+
+def test_cpu_mask():
+    """ Test CPU IDs convert to hex masks as convert_cpu_hex.py did """
+
+    assert FILTERS["cpu_mask"]("4,7,9,19,25") == "0x2080290"
+    assert FILTERS["cpu_mask"]([0]) == "0x1"
+    assert FILTERS["cpu_mask"]([]) == "0x0"
+    assert FILTERS["cpu_mask_list"]("0x2080290") == [4, 7, 9, 19, 25]
+    assert FILTERS["cpu_mask_list"]("2080290") == [4, 7, 9, 19, 25]
+
+
+def test_cpu_mask_groups():
+    """ Test comma grouped 32-bit masks in both directions """
+
+    assert FILTERS["cpu_mask_groups"]([0, 1, 32]) == "00000001,00000003"
+    assert FILTERS["cpu_mask_groups"]([1], 3) == \
+        "00000000,00000000,00000002"
+    assert FILTERS["cpu_mask_list"]("00000001,00000003") == [0, 1, 32]
+
+
+def test_wide_host():
+    """ Test masks on a 448 CPU host round trip without loss """
+
+    cpus = list(range(2, 56)) + list(range(226, 280)) + [447]
+    mask = FILTERS["cpu_mask"](cpus)
+    groups = FILTERS["cpu_mask_groups"](cpus)
+
+    assert len(groups.split(",")) == 14
+    assert FILTERS["cpu_mask_list"](mask) == cpus
+    assert FILTERS["cpu_mask_list"](groups) == cpus
+    assert FILTERS["cpu_range"](cpus) == "2-55,226-279,447"
+
+
+@pytest.mark.parametrize("name,value", [
+    ("cpu_list", "3-1"),
+    ("cpu_list", "a,b"),
+    ("cpu_list", [-1]),
+    ("cpu_mask_list", "0xzz"),
+    ("cpu_mask_list", "1ffffffff,00000001"),
+])
+def test_invalid_input(name, value):
+    """ Test invalid input raises a filter error """
+
+    with pytest.raises(AnsibleFilterError):
+        FILTERS[name](value)
@@ -27,8 +27,8 @@ TESTINFRA_HOSTS = testinfra.utils.ansible_runner.AnsibleRunner(
 
 @pytest.fixture(scope="module")
 def hugepage_allocation(host):
-    """ Get number of 2M and 1G hugepages allocated from target and return as
-        tuple """
+    """ Get number of 2M and 1G hugepages allocated on each NUMA node of
+        target and return as tuple of dicts which map node to pages """
 
     online_nodes_sysfs = "/sys/devices/system/node/online"
     hugepage_2m_sysfs = "/sys/devices/system/node/node{node_num}/hugepages/" \
@@ -44,8 +44,8 @@ def hugepage_allocation(host):
     # online_list represents a range of online NUMA nodes. It is a list of
     # comma delimited ranges. E.g 0-1,4-5 or more commonly just 0-1 in a two
     # socket system.
-    nr_1g_hugepages = 0
-    nr_2m_hugepages = 0
+    nr_1g_hugepages = {}
+    nr_2m_hugepages = {}
     for block_range in online_list.split(","):
         low, high = block_range.split("-")
         if not low.isdigit() or not high.isdigit():
@@ -54,8 +54,8 @@ def hugepage_allocation(host):
         for node_num in range(int(low), int(high) + 1):
             path_1g = hugepage_1g_sysfs.format(node_num=node_num)
             path_2m = hugepage_2m_sysfs.format(node_num=node_num)
-            nr_1g_hugepages += get_sysfs_int(host, path_1g)
-            nr_2m_hugepages += get_sysfs_int(host, path_2m)
+            nr_1g_hugepages[node_num] = get_sysfs_int(host, path_1g)
+            nr_2m_hugepages[node_num] = get_sysfs_int(host, path_2m)
     return (nr_2m_hugepages, nr_1g_hugepages)
 
 
@@ -85,8 +85,27 @@ def test_hugepage(ansible_vars, hugepage_allocation):
         allocated """
 
     assert int(ansible_vars['ovs_dpdk_nr_2m_pages']) ==\
-        hugepage_allocation[0], "2M hugepages defined in Ansible var "\
-        "is different than amount seen on remote host"
+        sum(hugepage_allocation[0].values()), "2M hugepages defined in "\
+        "Ansible var is different than amount seen on remote host"
     assert int(ansible_vars['ovs_dpdk_nr_1g_pages']) ==\
-        hugepage_allocation[1], "1G hugepages defined in Ansible var "\
-        "is different than amount seen on remote host"
+        sum(hugepage_allocation[1].values()), "1G hugepages defined in "\
+        "Ansible var is different than amount seen on remote host"
+
+
+@pytest.mark.usefixtures("check_skip_dpdk_tests")
+def test_hugepage_per_numa_node(ansible_vars, hugepage_allocation):
+    """ Test to ensure hugepages set per NUMA node are allocated on their
+        node """
+
+    numa_nodes = dict((int(node), conf) for node, conf in
+                      ansible_vars.get('numa_nodes', {}).items())
+    for index, key in enumerate(("hugepages_2m", "hugepages_1g")):
+        if not any(key in conf for conf in numa_nodes.values()):
+            continue
+        for node, conf in numa_nodes.items():
+            expected = conf.get(key, 0)
+            allocated = hugepage_allocation[index].get(node, 0)
+            assert expected == allocated, "{key} of NUMA node {node} is "\
+                "{expected} but {allocated} are allocated on remote host"\
+                .format(key=key, node=node, expected=expected,
+                        allocated=allocated)
@@ -0,0 +1,83 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test if interrupts are steered onto housekeeping cores """
+import os
+
+import pytest
+import testinfra.utils.ansible_runner
+
+from common import ansible_vars, check_skip_dpdk_tests
+from common import role_filters
+
+TESTINFRA_HOSTS = testinfra.utils.ansible_runner.AnsibleRunner(
+    os.environ["MOLECULE_INVENTORY_FILE"]
+).get_hosts("all")
+
+CPU_LIST = role_filters("cpu_mask")["cpu_list"]
+
+
+@pytest.fixture(scope="module")
+def irq_effective_affinity(host):
+    """ Get the CPUs each interrupt of target is delivered to and return dict
+        which maps IRQ number to list of CPU IDs """
+
+    affinity = {}
+    with host.sudo():
+        for irq in host.file("/proc/irq").listdir():
+            if not irq.isdigit():
+                continue
+            path = "/proc/irq/{irq}/effective_affinity_list".format(irq=irq)
+            if not host.file(path).exists:
+                path = "/proc/irq/{irq}/smp_affinity_list".format(irq=irq)
+            affinity[int(irq)] = CPU_LIST(
+                host.file(path).content_string.strip())
+    return affinity
+
+
+@pytest.fixture(scope="module")
+def irq_unmovable(host):
+    """ Get the interrupts of target whose affinity can not be changed, as
+        they were left on protected cores by the Ansible role """
+
+    unmovable = []
+    with host.sudo():
+        for irq in host.file("/proc/irq").listdir():
+            if not irq.isdigit():
+                continue
+            path = "/proc/irq/{irq}/smp_affinity_list".format(irq=irq)
+            current = host.file(path).content_string.strip()
+            if host.run("echo {cpus} > {path}".format(
+                    cpus=current, path=path)).failed:
+                unmovable.append(int(irq))
+    return unmovable
+
+
+# This test function uses the fixture "check_skip_dpdk_tests" to decide if the
+# test should be executed. If the Ansible variable "skip_ovs_dpdk_config" is
+# set to True, ovs-dpdk will not be configured on the target host, making
+# execution of this test redundant. Hence, it will be skipped.
+@pytest.mark.usefixtures("check_skip_dpdk_tests")
+def test_irq_affinity(ansible_vars, irq_effective_affinity, irq_unmovable):
+    """ Test if every movable interrupt is delivered to housekeeping cores
+    """
+
+    if ansible_vars.get("sst_bf_irq_steering") != "apply":
+        pytest.skip("Interrupt steering is not applied")
+    housekeeping = set(ansible_vars["irq_cores"])
+    for irq, cpus in irq_effective_affinity.items():
+        if irq in irq_unmovable:
+            continue
+        assert set(cpus) <= housekeeping, "IRQ {irq} is delivered to CPUs "\
+            "{cpus} outside of housekeeping cores".format(irq=irq, cpus=cpus)
@@ -20,11 +20,15 @@ import pytest
 import testinfra.utils.ansible_runner
 
 from common import ansible_vars, check_skip_dpdk_tests
+from common import role_filters
 
 TESTINFRA_HOSTS = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ["MOLECULE_INVENTORY_FILE"]
 ).get_hosts("all")
 
+CPU_LIST = role_filters("cpu_mask")["cpu_list"]
+CPU_MASK_LIST = role_filters("cpu_mask")["cpu_mask_list"]
+
 
 @pytest.fixture(scope="module")
 def isolated_cores_sysfs(host):
@@ -135,3 +139,40 @@ def test_pmd_cores_match_mask(pmd_core_numbers_from_mask,
 
     assert pmd_core_numbers_from_mask == pmd_core_numbers_from_appctl, "PMD "
     "core mask from OVS does not match actual PMD pinned cores"
+
+
+@pytest.mark.usefixtures("check_skip_dpdk_tests")
+def test_nohz_full_cpus(host, ansible_vars):
+    """ Test if the CPUs chosen by sst_bf_cpu_isolation run without a
+        scheduler tick and RCU callbacks """
+
+    if ansible_vars.get("sst_bf_cpu_isolation", "none") == "none":
+        pytest.skip("CPU isolation with nohz_full is not configured")
+    isolated = ansible_vars["isolated_cores"]
+    assert CPU_LIST(get_file_output(
+        host, "/sys/devices/system/cpu/nohz_full")) == isolated, "nohz_full "\
+        "CPUs do not match the isolated cores"
+    cmdline = get_file_output(host, "/proc/cmdline").split()
+    assert any(param.startswith("rcu_nocbs=")
+               and CPU_LIST(param.split("=", 1)[1]) == isolated
+               for param in cmdline), "rcu_nocbs does not match the "\
+        "isolated cores"
+
+
+@pytest.mark.usefixtures("check_skip_dpdk_tests")
+def test_housekeeping_cpus(host, ansible_vars):
+    """ Test if interrupts, unbound workqueues and kernel threads default to
+        the housekeeping CPUs """
+
+    if ansible_vars.get("sst_bf_cpu_isolation", "none") == "none":
+        pytest.skip("CPU isolation with nohz_full is not configured")
+    housekeeping = ansible_vars["housekeeping_cores"]
+    assert CPU_MASK_LIST(get_file_output(
+        host, "/proc/irq/default_smp_affinity")) == housekeeping, "Default "\
+        "IRQ affinity does not match the housekeeping cores"
+    assert CPU_MASK_LIST(get_file_output(
+        host, "/sys/devices/virtual/workqueue/cpumask")) == housekeeping, \
+        "Unbound workqueues are not confined to the housekeeping cores"
+    kthreadd = host.check_output("taskset -cp 2").split(":")[-1].strip()
+    assert CPU_LIST(kthreadd) == housekeeping, "Kernel threads are "\
+        "not confined to the housekeeping cores"
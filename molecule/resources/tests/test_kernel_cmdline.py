@@ -0,0 +1,87 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test kernel command line planning """
+import pytest
+
+from common import use_role_module_utils
+
+use_role_module_utils()
+
+from ansible.module_utils.sst_bf_cmdline import (CmdlineError,  # noqa: E402
+                                                 hugepage_counts, plan_boot,
+                                                 set_grub_cmdline)
+
+MANAGED = ["default_hugepagesz", "hugepagesz", "hugepages", "isolcpus",
+           "iommu", "intel_iommu"]
+PARAMS = ["default_hugepagesz=1G", "hugepagesz=1G", "hugepages=16",
+          "hugepagesz=2M", "hugepages=2048", "isolcpus=2-5", "iommu=pt",
+          "intel_iommu=on"]
+RUNNING = ["BOOT_IMAGE=/vmlinuz", "root=/dev/sda1", "ro"] + PARAMS
+RUNTIME_SIZES = [2048]
+
+
+def test_hugepage_counts():
+    """ Test hugepage counts are paired with the preceding size """
+
+    assert hugepage_counts(PARAMS) == {1048576: 16, 2048: 2048}
+    assert hugepage_counts(["hugepages=64"]) == {2048: 64}
+    assert hugepage_counts(["default_hugepagesz=1GB", "hugepages=4"]) == \
+        {1048576: 4}
+    with pytest.raises(CmdlineError):
+        hugepage_counts(["hugepagesz=3X"])
+
+
+def test_set_grub_cmdline():
+    """ Test managed parameters are replaced and others kept in place """
+
+    lines = ['GRUB_DEFAULT=0',
+             'GRUB_CMDLINE_LINUX="quiet isolcpus=1 hugepages=8 splash"']
+    assert set_grub_cmdline(lines, PARAMS, MANAGED) == \
+        ['GRUB_DEFAULT=0',
+         'GRUB_CMDLINE_LINUX="quiet splash ' + " ".join(PARAMS) + '"']
+    assert set_grub_cmdline(['GRUB_DEFAULT=0'], ["iommu=pt"], MANAGED) == \
+        ['GRUB_DEFAULT=0', 'GRUB_CMDLINE_LINUX="iommu=pt"']
+
+
+def test_no_reboot_when_running_kernel_matches():
+    """ Test nothing requires a reboot if the running kernel matches """
+
+    assert plan_boot(RUNNING, PARAMS, MANAGED, RUNTIME_SIZES) == \
+        ([], {2048: 2048})
+
+
+def test_2m_hugepages_at_runtime():
+    """ Test a changed 2M hugepage count is allocated at runtime while other
+        boot-time parameters require a reboot """
+
+    params = [param.replace("hugepages=2048", "hugepages=512")
+              for param in PARAMS]
+    assert plan_boot(RUNNING, params, MANAGED, RUNTIME_SIZES) == \
+        ([], {2048: 512})
+
+    params = [param.replace("isolcpus=2-5", "isolcpus=2-7")
+              .replace("hugepages=16", "hugepages=8") for param in PARAMS]
+    assert plan_boot(RUNNING, params, MANAGED, RUNTIME_SIZES) == \
+        (["isolcpus", "hugepages-1048576kB"], {2048: 2048})
+
+
+def test_first_configuration():
+    """ Test a host without managed parameters requires a reboot for the
+        boot-time parameters only """
+
+    reasons, runtime = plan_boot(RUNNING[:3], PARAMS, MANAGED, RUNTIME_SIZES)
+    assert reasons == ["default_hugepagesz", "intel_iommu", "iommu",
+                       "isolcpus", "hugepages-1048576kB"]
+    assert runtime == {2048: 2048}
@@ -19,11 +19,14 @@ import pytest
 import testinfra.utils.ansible_runner
 
 from common import ansible_vars, check_skip_dpdk_tests
+from common import role_filters
 
 TESTINFRA_HOSTS = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ["MOLECULE_INVENTORY_FILE"]
 ).get_hosts("all")
 
+CPU_LIST = role_filters("cpu_mask")["cpu_list"]
+
 
 @pytest.fixture(scope="module")
 def lcore_mask_host(host):
@@ -90,6 +93,30 @@ def lcore_threads_exec(host, lcore_core_ids):
     return lcore_thread_exec_map
 
 
+@pytest.fixture(scope="module")
+def non_pmd_thread_affinity(host):
+    """ Get the CPU affinity of the handler and revalidator threads of
+        ovs-vswitchd and return dict which maps thread name to CPU IDs """
+
+    affinity = {}
+    with host.sudo():
+        pid_cmd = host.run("pidof ovs-vswitchd")
+        if pid_cmd.failed:
+            raise Exception("Failed to get pid of process named "
+                            "'ovs-vswitchd'")
+        task_dir = "/proc/{pid}/task".format(pid=pid_cmd.stdout.strip())
+        for tid in host.file(task_dir).listdir():
+            status = host.file("{task_dir}/{tid}/status".format(
+                task_dir=task_dir, tid=tid)).content_string
+            fields = dict(line.split(":", 1) for line in status.splitlines()
+                          if ":" in line)
+            name = fields["Name"].strip()
+            if name.startswith(("handler", "revalidator")):
+                affinity[name] = CPU_LIST(
+                    fields["Cpus_allowed_list"].strip())
+    return affinity
+
+
 def strip_int(input_str):
     """ Remove integers from a string and return string """
 
@@ -123,3 +150,20 @@ def test_lcore_threads(lcore_core_ids, lcore_threads_exec):
         lcore_core_ids.remove(lowest_core_id)
         for core_id in lcore_core_ids:
             assert "lcore-slave-" in lcore_threads_exec[core_id]
+
+
+@pytest.mark.usefixtures("check_skip_dpdk_tests")
+def test_non_pmd_thread_affinity(ansible_vars, lcore_mask_host,
+                                 non_pmd_thread_affinity):
+    """ Test handler and revalidator threads only run on the lcore cores if
+        their affinity is set """
+
+    if not ansible_vars.get("ovs_dpdk_non_pmd_affinity"):
+        pytest.skip("Non-PMD thread affinity is not set")
+    mask = int(lcore_mask_host, 16)
+    lcore_cores = set(cpu for cpu in range(mask.bit_length())
+                      if mask >> cpu & 1)
+    assert non_pmd_thread_affinity, "No handler or revalidator threads found"
+    for name, cpus in non_pmd_thread_affinity.items():
+        assert set(cpus) <= lcore_cores, "Thread {name} may run on "\
+            "CPUs {cpus} outside of lcore cores".format(name=name, cpus=cpus)
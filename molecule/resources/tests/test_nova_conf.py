@@ -19,12 +19,14 @@ import pytest
 import testinfra.utils.ansible_runner
 
 from common import ansible_vars, get_cores, high_cores, normal_cores
-from common import sst_bf_repo_path
+from common import role_filters, sst_bf_repo_path
 
 TESTINFRA_HOSTS = testinfra.utils.ansible_runner.AnsibleRunner(
     environ["MOLECULE_INVENTORY_FILE"]
 ).get_hosts("all")
 
+CPU_LIST = role_filters("cpu_mask")["cpu_list"]
+
 
 @pytest.fixture(scope="module")
 def nova_conf(host, ansible_vars):
@@ -56,6 +58,18 @@ def check_key_value(partial_match, full_match, line, was_found):
     return (was_found, error)
 
 
+def expand_cpu_set(line):
+    """ Expand Linux CPU list syntax in a cpu_dedicated_set or cpu_shared_set
+        line to comma separated CPU IDs. Return line unchanged otherwise """
+
+    key, sep, value = line.partition("=")
+    if not sep or key.strip() not in ("cpu_dedicated_set", "cpu_shared_set"):
+        return line
+    cores = CPU_LIST(value.strip())
+    return "{key} = {cores}".format(
+        key=key.strip(), cores=",".join(str(core) for core in cores))
+
+
 def core_numbers_from_mask(core_mask):
     """ Generate a list of CPU IDs from CPU mask argument 'core_mask' and
         return a list of CPU IDs """
@@ -101,7 +115,7 @@ def check_nova_conf(nova_conf, shared_set, dedicated_set, allocation_ratio):
     in_default_blk, in_compute_blk = False, False
     for line in nova_conf:
         ret = False
-        line_lo = line.lower().strip()
+        line_lo = expand_cpu_set(line.lower().strip())
         if line_lo == "":
             in_default_blk, in_compute_blk = False, False
             continue
@@ -158,13 +172,17 @@ def remove_dpdk_cores(normal_cores, high_cores, lcore_core_numbers_from_mask,
 def test_nova_conf(normal_cores, high_cores, ansible_vars, nova_conf,
                    pmd_core_numbers_from_mask, lcore_core_numbers_from_mask):
     """ Ensure cpu_allocation_ratio, cpu_dedicated_set & cpu_shared_set
-        are set correctly and under the correct heading"""
+        are set correctly, without the cores reserved for the host, and
+        under the correct heading"""
 
     skip_dpdk = ansible_vars["skip_ovs_dpdk_config"]
     if not skip_dpdk:
         remove_dpdk_cores(normal_cores, high_cores,
                           lcore_core_numbers_from_mask,
                           pmd_core_numbers_from_mask, ansible_vars)
+    reserved = ansible_vars.get("reserved_host_cores", [])
+    high_cores = [core for core in high_cores if core not in reserved]
+    normal_cores = [core for core in normal_cores if core not in reserved]
 
     high_cores_comma = ",".join([str(core) for core in high_cores])
     normal_cores_comma = ",".join([str(core) for core in normal_cores])
@@ -73,12 +73,12 @@ def test_pmd_mask(pmd_mask_host, ansible_vars):
 
 
 @pytest.mark.usefixtures("check_skip_dpdk_tests")
-def test_pmd_num_threads(host, pinned_cores_from_vars):
-    """ Test to check if the number of PMD threads matches the defined number
-        of physical cores pinned (2 threads per physical core) """
+def test_pmd_num_threads(host, ansible_vars):
+    """ Test to check if the number of PMD threads matches the number of
+        logical cores in the PMD mask """
 
     num_threads = 0
-    threads_per_core = 2
+    pmd_mask = int(ansible_vars["pmd_mask"], 16)
     res = None
     with host.sudo():
         if not host.exists("ovs-appctl"):
@@ -94,4 +94,21 @@ def test_pmd_num_threads(host, pinned_cores_from_vars):
         if "pmd thread" in line:
             num_threads += 1
 
-    assert int(pinned_cores_from_vars) * threads_per_core == int(num_threads)
+    assert bin(pmd_mask).count("1") == int(num_threads)
+
+
+@pytest.mark.usefixtures("check_skip_dpdk_tests")
+def test_pmd_physical_cores(host, ansible_vars, pinned_cores_from_vars):
+    """ Test to check if the PMD mask covers the defined number of physical
+        cores pinned with all their SMT siblings """
+
+    pmd_mask = int(ansible_vars["pmd_mask"], 16)
+    pmd_cpus = set(cpu for cpu in range(pmd_mask.bit_length())
+                   if pmd_mask & (1 << cpu))
+    sibling_groups = set()
+    for cpu in pmd_cpus:
+        siblings = host.file("/sys/devices/system/cpu/cpu{cpu}/topology/"
+                             "thread_siblings_list".format(cpu=cpu))
+        sibling_groups.add(siblings.content_string.strip())
+
+    assert len(sibling_groups) == int(pinned_cores_from_vars)
@@ -0,0 +1,54 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test if the SST-BF profile is applied at boot """
+import os
+
+import testinfra.utils.ansible_runner
+
+from common import ansible_vars, high_cores, normal_cores, sst_bf_repo_path
+
+TESTINFRA_HOSTS = testinfra.utils.ansible_runner.AnsibleRunner(
+    os.environ["MOLECULE_INVENTORY_FILE"]
+).get_hosts("all")
+
+PROFILE_CONF = "/etc/sst_bf/profile.conf"
+
+
+def test_profile_unit(host):
+    """ Test if the unit applying the SST-BF profile is enabled and ran
+        without error """
+
+    unit = host.service("sst-bf-profile")
+    assert unit.is_enabled, "sst-bf-profile.service is not enabled"
+    with host.sudo():
+        result = host.run("systemctl show -p Result --value sst-bf-profile")
+    assert result.stdout.strip() == "success", \
+        "sst-bf-profile.service failed"
+
+
+def test_profile_conf(host, ansible_vars, high_cores, normal_cores):
+    """ Test if the configuration of the unit holds the applied profile and
+        the high and normal priority cores """
+
+    with host.sudo():
+        content = host.file(PROFILE_CONF).content_string
+    conf = dict(line.split("=", 1) for line in content.splitlines()
+                if "=" in line and not line.startswith("#"))
+    assert conf["PROFILE"] == ansible_vars["sst_bf_profile"], \
+        "Profile applied at boot differs from sst_bf_profile"
+    for key, cores in (("HIGH_CPUS", high_cores),
+                       ("NORMAL_CPUS", normal_cores)):
+        assert sorted(int(cpu) for cpu in conf[key].strip('"').split()) == \
+            sorted(cores), "{key} differ from the SST-BF tier".format(key=key)
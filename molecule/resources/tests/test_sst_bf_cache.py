@@ -0,0 +1,121 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+""" Test pinning and verification of wheelhouses in the controller cache """
+import hashlib
+import re
+import subprocess
+import sys
+
+import pytest
+
+from common import use_role_module_utils, write_files
+
+use_role_module_utils()
+
+from ansible.module_utils.sst_bf_cache import (  # noqa: E402
+    PYTHON_TAG_SCRIPT, CacheError, dist_version, pin_requirements,
+    requirements_key, specifier_key, verify_requirements)
+
+TAG = "py36-linux_x86_64"
+WHEEL = "keystoneauth1-3.18.0-py2.py3-none-any.whl"
+SDIST = "os_service_types-1.7.0.tar.gz"
+
+
+def sha256(content):
+    """ Return sha256 hex digest of a file written by write_files """
+
+    return hashlib.sha256((content + "\n").encode("utf-8")).hexdigest()
+
+
+@pytest.fixture
+def wheelhouse(tmpdir):
+    """ Wheelhouse with a wheel, an sdist and an unrelated file """
+
+    write_files(tmpdir, {WHEEL: "wheel", SDIST: "sdist", "README": "x"})
+    return str(tmpdir)
+
+
+@pytest.mark.parametrize("filename,expected", [
+    (WHEEL, ("keystoneauth1", "3.18.0")),
+    ("PyYAML-5.3-cp36-cp36m-linux_x86_64.whl", ("pyyaml", "5.3")),
+    (SDIST, ("os-service-types", "1.7.0")),
+    ("README", None)])
+def test_dist_version(filename, expected):
+    """ Test name and version are taken from distribution file names """
+
+    assert dist_version(filename) == expected
+
+
+def test_dist_version_invalid():
+    """ Test a wheel file name without tags is rejected """
+
+    with pytest.raises(CacheError):
+        dist_version("keystoneauth1-3.18.0.whl")
+
+
+def test_keys():
+    """ Test keys do not depend on the order of specifiers or
+        requirements but on the Python version and platform """
+
+    assert specifier_key(["b", "a"], TAG) == specifier_key(["a", "b"], TAG)
+    assert specifier_key(["a"], TAG) != \
+        specifier_key(["a"], "py27-linux_x86_64")
+    assert requirements_key(["b==1", "a==1"], TAG) == \
+        requirements_key(["a==1", "b==1"], TAG)
+    assert requirements_key(["a==1"], TAG) != requirements_key(["a==2"], TAG)
+    assert requirements_key(["a==1"], TAG).startswith(TAG + "-")
+
+
+def test_python_tag():
+    """ Test the tag of the running interpreter """
+
+    tag = subprocess.check_output([sys.executable, "-c", PYTHON_TAG_SCRIPT])
+    tag = tag.decode().strip()
+    assert tag.startswith("py{0}{1}-".format(*sys.version_info[:2]))
+    assert re.match(r"^py\d+-\w+$", tag)
+
+
+def test_pin_and_verify(wheelhouse):
+    """ Test every distribution file is pinned by version and sha256 and
+        verifies """
+
+    pinned = pin_requirements(wheelhouse)
+    assert pinned == [
+        "keystoneauth1==3.18.0 --hash=sha256:" + sha256("wheel"),
+        "os-service-types==1.7.0 --hash=sha256:" + sha256("sdist")]
+    assert verify_requirements(wheelhouse, pinned) == []
+
+
+def test_verify_tampered(wheelhouse, tmpdir):
+    """ Test a changed or missing distribution file fails verification """
+
+    pinned = pin_requirements(wheelhouse)
+    tmpdir.join(WHEEL).write("other wheel\n")
+    tmpdir.join(SDIST).remove()
+    assert verify_requirements(wheelhouse, pinned) == [
+        "keystoneauth1==3.18.0 does not match its sha256",
+        "os-service-types==1.7.0 is missing"]
+
+
+def test_verify_without_requirements(tmpdir):
+    """ Test an empty or missing wheelhouse never verifies """
+
+    assert verify_requirements(str(tmpdir), []) != []
+    assert verify_requirements(str(tmpdir.join("missing")),
+                               ["a==1 --hash=sha256:" + "0" * 64]) == \
+        ["a==1 is missing"]
+    assert verify_requirements(str(tmpdir), ["a>=1"]) == \
+        ["Invalid requirement 'a>=1'"]
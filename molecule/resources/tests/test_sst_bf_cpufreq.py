@@ -0,0 +1,156 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+""" Test applying SST-BF profiles against a fake cpufreq sysfs tree """
+import pytest
+
+from common import use_role_module_utils, write_files
+
+use_role_module_utils()
+
+from ansible.module_utils.sst_bf_cpufreq import (  # noqa: E402
+    apply_profile, profile_limits, read_cpufreq, verify_profile)
+from ansible.module_utils.sst_bf_sysfs import SysfsError  # noqa: E402
+
+# Xeon 6230N like frequencies in kHz
+MIN_FREQ = 800000
+MAX_FREQ = 3900000
+HIGH_FREQ = 2700000
+NORMAL_FREQ = 2100000
+TIERS = {"high": [1, 3], "normal": [0, 2]}
+
+
+def cpufreq_file(cpu, name):
+    """ Return sysfs path of cpufreq file 'name' of CPU 'cpu' """
+
+    return "devices/system/cpu/cpu{cpu}/cpufreq/{name}".format(cpu=cpu,
+                                                               name=name)
+
+
+@pytest.fixture
+def cpufreq(tmpdir):
+    """ Fake cpufreq tree of four CPUs, scaling over the full range """
+
+    files = {}
+    for tier, cpus in TIERS.items():
+        for cpu in cpus:
+            base = HIGH_FREQ if tier == "high" else NORMAL_FREQ
+            for name, value in (("base_frequency", base),
+                                ("cpuinfo_min_freq", MIN_FREQ),
+                                ("cpuinfo_max_freq", MAX_FREQ),
+                                ("scaling_min_freq", MIN_FREQ),
+                                ("scaling_max_freq", MAX_FREQ),
+                                ("scaling_governor", "powersave")):
+                files[cpufreq_file(cpu, name)] = value
+    write_files(tmpdir, files)
+    return str(tmpdir)
+
+
+def limits(root, cpu):
+    """ Return tuple (min, max) of the limits of 'cpu' in the fake tree """
+
+    freqs = read_cpufreq(root, cpu)
+    return freqs["scaling_min_freq"], freqs["scaling_max_freq"]
+
+
+@pytest.mark.parametrize("profile,tier,expected", [
+    ("FREQUENCY_FIXED_HIGH_DEDICATED", "high", (HIGH_FREQ, HIGH_FREQ)),
+    ("FREQUENCY_FIXED_HIGH_SHARED", "normal", (NORMAL_FREQ, NORMAL_FREQ)),
+    ("FREQUENCY_VAR_HIGH_DEDICATED", "high", (HIGH_FREQ, MAX_FREQ)),
+    ("FREQUENCY_VAR_HIGH_SHARED", "normal", (MIN_FREQ, NORMAL_FREQ))])
+def test_profile_limits(profile, tier, expected):
+    """ Test the limits of each profile match those test_sst_bf_profile
+        expects on the target """
+
+    base = HIGH_FREQ if tier == "high" else NORMAL_FREQ
+    freqs = {"base_frequency": base, "cpuinfo_min_freq": MIN_FREQ,
+             "cpuinfo_max_freq": MAX_FREQ}
+    assert profile_limits(profile, tier, freqs) == expected
+
+
+def test_profile_limits_unknown_profile():
+    """ Test an unknown profile is rejected """
+
+    with pytest.raises(SysfsError):
+        profile_limits("FREQUENCY_UNKNOWN", "high", {"base_frequency": 1})
+
+
+@pytest.mark.parametrize("profile", ["FREQUENCY_FIXED_HIGH_DEDICATED",
+                                     "FREQUENCY_VAR_HIGH_SHARED"])
+def test_apply_profile(cpufreq, profile):
+    """ Test the limits are written and read back, and a second pass changes
+        nothing """
+
+    changed, targets = apply_profile(cpufreq, profile, TIERS)
+    assert changed == [0, 1, 2, 3]
+    for cpu, target in targets.items():
+        assert limits(cpufreq, cpu) == target
+    assert verify_profile(cpufreq, targets) == []
+    assert apply_profile(cpufreq, profile, TIERS)[0] == []
+
+
+def test_apply_profile_dry_run(cpufreq):
+    """ Test a dry run reports changes without writing them """
+
+    changed, targets = apply_profile(cpufreq, "FREQUENCY_FIXED_HIGH_SHARED",
+                                     TIERS, dry_run=True)
+    assert changed == [0, 1, 2, 3]
+    assert limits(cpufreq, 1) == (MIN_FREQ, MAX_FREQ)
+    assert [item["cpu"] for item in verify_profile(cpufreq, targets)] == \
+        [0, 1, 2, 3]
+
+
+def test_apply_profile_raises_min(cpufreq, tmpdir):
+    """ Test max is written before min when the new min is above the
+        current max, so the kernel never sees min above max """
+
+    tmpdir.join(cpufreq_file(1, "scaling_max_freq")).write(
+        "{freq}\n".format(freq=MIN_FREQ))
+    apply_profile(cpufreq, "FREQUENCY_FIXED_HIGH_DEDICATED", TIERS)
+    assert limits(cpufreq, 1) == (HIGH_FREQ, HIGH_FREQ)
+
+
+def test_apply_governor(cpufreq):
+    """ Test the governor is set with the limits and verified """
+
+    _, targets = apply_profile(cpufreq, "FREQUENCY_FIXED_HIGH_DEDICATED",
+                               TIERS)
+    assert verify_profile(cpufreq, targets, "performance") != []
+    changed, _ = apply_profile(cpufreq, "FREQUENCY_FIXED_HIGH_DEDICATED",
+                               TIERS, "performance")
+    assert changed == [0, 1, 2, 3]
+    assert read_cpufreq(cpufreq, 0)["scaling_governor"] == "performance"
+    assert verify_profile(cpufreq, targets, "performance") == []
+
+
+def test_verify_profile_mismatch(cpufreq, tmpdir):
+    """ Test a CPU whose limits differ after applying is reported """
+
+    _, targets = apply_profile(cpufreq, "FREQUENCY_VAR_HIGH_DEDICATED",
+                               TIERS)
+    tmpdir.join(cpufreq_file(3, "scaling_max_freq")).write(
+        "{freq}\n".format(freq=HIGH_FREQ))
+    assert verify_profile(cpufreq, targets) == [
+        {"cpu": 3, "min": HIGH_FREQ, "max": HIGH_FREQ,
+         "expected_min": HIGH_FREQ, "expected_max": MAX_FREQ,
+         "governor": "powersave"}]
+
+
+def test_missing_cpufreq(cpufreq, tmpdir):
+    """ Test a CPU without cpufreq is an error """
+
+    tmpdir.join(cpufreq_file(2, "base_frequency")).remove()
+    with pytest.raises(SysfsError):
+        apply_profile(cpufreq, "FREQUENCY_FIXED_HIGH_DEDICATED", TIERS)
@@ -0,0 +1,80 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test steering of interrupts onto housekeeping CPUs """
+import pytest
+
+from common import use_role_module_utils, write_files
+
+use_role_module_utils()
+
+import ansible.module_utils.sst_bf_irq as sst_bf_irq  # noqa: E402
+from ansible.module_utils.sst_bf_sysfs import SysfsError  # noqa: E402
+
+HOUSEKEEPING = [0, 2]
+
+
+@pytest.fixture
+def proc_root(tmpdir):
+    """ Create a fake /proc/irq tree with a timer on CPU 1, a NIC queue
+        allowed on every CPU and a disk interrupt already on CPU 2 """
+
+    write_files(tmpdir, {
+        "irq/default_smp_affinity": "f",
+        "irq/0/smp_affinity_list": "1",
+        "irq/0/effective_affinity_list": "1",
+        "irq/0/timer/.keep": "",
+        "irq/24/smp_affinity_list": "0-3",
+        "irq/24/effective_affinity_list": "3",
+        "irq/24/eno1-TxRx-0/.keep": "",
+        "irq/25/smp_affinity_list": "2",
+        "irq/25/nvme0q0/.keep": ""})
+    return str(tmpdir)
+
+
+def test_protected_irqs(proc_root):
+    """ Test interrupts delivered outside housekeeping CPUs are reported
+        with their devices """
+
+    assert sst_bf_irq.protected_irqs(proc_root, HOUSEKEEPING) == [
+        {"irq": 0, "cpus": "1", "actions": ["timer"]},
+        {"irq": 24, "cpus": "3", "actions": ["eno1-TxRx-0"]}]
+
+
+def test_steer_irqs(proc_root, monkeypatch):
+    """ Test movable interrupts are moved in one pass and interrupts the
+        kernel refuses to move are reported """
+
+    assert sst_bf_irq.steer_irqs(proc_root, HOUSEKEEPING, dry_run=True) == \
+        ([0, 24], [])
+
+    write_sysfs = sst_bf_irq.write_sysfs
+
+    def refuse_timer(root, value, *parts):
+        """ Fail like the kernel does for a per-CPU interrupt """
+
+        if parts[1] == "0":
+            raise SysfsError("Input/output error")
+        write_sysfs(root, value, *parts)
+
+    monkeypatch.setattr(sst_bf_irq, "write_sysfs", refuse_timer)
+    assert sst_bf_irq.steer_irqs(proc_root, HOUSEKEEPING) == ([24], [0])
+    assert sst_bf_irq.irq_info(proc_root, 24)["affinity"] == HOUSEKEEPING
+
+
+def test_missing_proc(tmpdir):
+    """ Test a missing irq directory raises an error """
+
+    with pytest.raises(SysfsError):
+        sst_bf_irq.list_irqs(str(tmpdir))
@@ -0,0 +1,78 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test single pass Nova configuration writer """
+import pytest
+
+from common import use_role_module_utils
+
+use_role_module_utils()
+
+from ansible.module_utils.sst_bf_nova import (profile_cpu_sets,  # noqa: E402
+                                              set_options)
+
+OPTIONS = [("compute", "cpu_dedicated_set", "1,3"),
+           ("compute", "cpu_shared_set", "0,2"),
+           ("DEFAULT", "cpu_allocation_ratio", 1.0)]
+
+
+def test_update_in_place():
+    """ Test keys are updated in place and comments are preserved """
+
+    conf = ["[DEFAULT]", "# Keep me", "cpu_allocation_ratio = 2.0", "",
+            "[compute]", "cpu_shared_set=0,2", "cpu_dedicated_set = 5"]
+    lines, changed = set_options(conf, OPTIONS)
+
+    assert lines == ["[DEFAULT]", "# Keep me", "cpu_allocation_ratio = 1.0",
+                     "", "[compute]", "cpu_shared_set=0,2",
+                     "cpu_dedicated_set = 1,3"]
+    assert changed == ["cpu_dedicated_set", "cpu_allocation_ratio"]
+
+
+def test_no_change():
+    """ Test an already configured file reports no changed keys """
+
+    conf = ["[DEFAULT]", "cpu_allocation_ratio = 1.0", "[compute]",
+            "cpu_dedicated_set = 1,3", "cpu_shared_set = 0,2"]
+    lines, changed = set_options(conf, OPTIONS)
+
+    assert lines == conf
+    assert changed == []
+
+
+def test_missing_and_misplaced_keys():
+    """ Test missing sections are created, missing keys are inserted after
+        the section header and definitions elsewhere are removed """
+
+    conf = ["[DEFAULT]", "debug = true", "", "[libvirt]",
+            "cpu_shared_set = 7", "cpu_mode = host-passthrough"]
+    lines, changed = set_options(conf, OPTIONS)
+
+    assert lines == ["[DEFAULT]", "cpu_allocation_ratio = 1.0",
+                     "debug = true", "", "[libvirt]",
+                     "cpu_mode = host-passthrough", "", "[compute]",
+                     "cpu_shared_set = 0,2", "cpu_dedicated_set = 1,3"]
+    assert changed == ["cpu_dedicated_set", "cpu_shared_set",
+                       "cpu_allocation_ratio"]
+
+
+def test_profile_cpu_sets():
+    """ Test dedicated and shared sets follow the SST-BF profile """
+
+    assert profile_cpu_sets("FREQUENCY_VAR_HIGH_DEDICATED", "1", "0") == \
+        ("1", "0")
+    assert profile_cpu_sets("FREQUENCY_FIXED_HIGH_SHARED", "1", "0") == \
+        ("0", "1")
+    with pytest.raises(ValueError):
+        profile_cpu_sets("FREQUENCY_UNKNOWN", "1", "0")
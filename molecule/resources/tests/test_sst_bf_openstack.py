@@ -0,0 +1,228 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test SST-BF OpenStack client against a local fake Placement and Compute
+    API """
+import time
+
+import pytest
+
+from common import use_role_module_utils
+from fake_openstack import start_fake_openstack
+
+use_role_module_utils()
+pytest.importorskip("keystoneauth1")
+
+from keystoneauth1 import session  # noqa: E402
+
+from ansible.module_utils.sst_bf_openstack import (  # noqa: E402
+    PROFILE_TRAITS, SST_BF_TRAIT, OpenStackError, RateLimiter, SstBfOpenStack)
+
+PROFILE = "FREQUENCY_FIXED_HIGH_DEDICATED"
+
+
+@pytest.fixture
+def fake_cloud():
+    """ Start a fake cloud and return tuple (cloud, client) """
+
+    server, cloud, placement, compute = start_fake_openstack()
+    client = SstBfOpenStack(session.Session(), placement_endpoint=placement,
+                            compute_endpoint=compute)
+    yield cloud, client
+    server.shutdown()
+    server.server_close()
+
+
+def test_traits_and_provider(fake_cloud):
+    """ Test traits are created once and added to the host's provider """
+
+    cloud, client = fake_cloud
+    rp_uuid = cloud.add_provider("compute-0.example.com",
+                                 traits=["HW_CPU_X86_AVX2"],
+                                 inventories={"PCPU": 4, "VCPU": 8})
+    cloud.add_provider("compute-01")
+
+    assert client.ensure_traits([SST_BF_TRAIT] + PROFILE_TRAITS) == \
+        [SST_BF_TRAIT] + PROFILE_TRAITS
+    assert client.ensure_traits([SST_BF_TRAIT] + PROFILE_TRAITS) == []
+
+    hosts = {"compute-0": {"profile": PROFILE,
+                           "inventory": {"PCPU": 4, "VCPU": 8}}}
+    assert client.sync_fleet_traits(hosts) == \
+        {"compute-0": {"uuid": rp_uuid, "changed": True}}
+    assert sorted(cloud.providers[rp_uuid]["traits"]) == \
+        sorted(["HW_CPU_X86_AVX2", SST_BF_TRAIT, "CUSTOM_CPU_" + PROFILE])
+
+    # Every placement request carries the requested microversion
+    assert all(version == "placement 1.6"
+               for _, path, version in cloud.requests
+               if path.startswith("/placement"))
+
+
+def test_inventory_timeout(fake_cloud):
+    """ Test waiting for inventory fails once the timeout has passed """
+
+    cloud, client = fake_cloud
+    rp_uuid = cloud.add_provider("compute-0", inventories={"VCPU": 8})
+
+    with pytest.raises(OpenStackError):
+        client.wait_inventory(rp_uuid, {"PCPU": 4}, 0, delay=0)
+
+
+def test_sync_fleet_traits(fake_cloud):
+    """ Test providers are listed once, stale profile traits are replaced
+        and providers which already match are not written """
+
+    cloud, client = fake_cloud
+    client.ensure_traits([SST_BF_TRAIT] + PROFILE_TRAITS)
+    other = "CUSTOM_CPU_FREQUENCY_VAR_HIGH_SHARED"
+    stale = cloud.add_provider("compute-0", traits=[SST_BF_TRAIT, other])
+    done = cloud.add_provider("compute-1", traits=[
+        "HW_CPU_X86_AVX2", SST_BF_TRAIT, "CUSTOM_CPU_" + PROFILE])
+    del cloud.requests[:]
+
+    result = client.sync_fleet_traits({"compute-0": {"profile": PROFILE},
+                                       "compute-1": {"profile": PROFILE}},
+                                      workers=2)
+
+    assert result == {"compute-0": {"uuid": stale, "changed": True},
+                      "compute-1": {"uuid": done, "changed": False}}
+    assert sorted(cloud.providers[stale]["traits"]) == \
+        sorted([SST_BF_TRAIT, "CUSTOM_CPU_" + PROFILE])
+    assert cloud.writes() == [
+        ("PUT", "/placement/resource_providers/{0}/traits".format(stale))]
+    assert [path for _, path, _ in cloud.requests].count(
+        "/placement/resource_providers") == 1
+
+
+def test_sync_traits_generation_conflict(fake_cloud):
+    """ Test a concurrent provider update is retried with the new
+        generation and that persistent conflicts fail """
+
+    cloud, client = fake_cloud
+    client.ensure_traits([SST_BF_TRAIT] + PROFILE_TRAITS)
+    rp_uuid = cloud.add_provider("compute-0", traits=["HW_CPU_X86_AVX2"])
+    del cloud.requests[:]
+    provider_traits = client.provider_traits
+    conflicts = [1]
+
+    def racing_provider_traits(uuid):
+        """ Read traits, then let another writer bump the generation """
+
+        traits = provider_traits(uuid)
+        if conflicts[0]:
+            conflicts[0] -= 1
+            cloud.providers[uuid]["generation"] += 1
+        return traits
+
+    client.provider_traits = racing_provider_traits
+    assert client.sync_provider_traits(rp_uuid, PROFILE)
+    assert len(cloud.writes()) == 2
+    assert SST_BF_TRAIT in cloud.providers[rp_uuid]["traits"]
+
+    conflicts[0] = 3
+    with pytest.raises(OpenStackError):
+        client.sync_provider_traits(rp_uuid, "FREQUENCY_VAR_HIGH_SHARED",
+                                    retries=3)
+
+
+def test_sync_fleet_traits_missing_host(fake_cloud):
+    """ Test hosts without resource provider fail before any write """
+
+    cloud, client = fake_cloud
+    cloud.add_provider("compute-0")
+
+    with pytest.raises(OpenStackError) as err:
+        client.sync_fleet_traits({"compute-0": {"profile": PROFILE},
+                                  "compute-9": {"profile": PROFILE}})
+    assert "compute-9" in str(err.value)
+    assert cloud.writes() == []
+
+
+def test_rate_limiter():
+    """ Test requests are spaced to the configured rate """
+
+    limiter = RateLimiter(100)
+    start = time.time()
+    for _ in range(5):
+        limiter.wait()
+    assert time.time() - start >= 0.04
+    RateLimiter(0).wait()
+
+
+def test_reconcile_flavors(fake_cloud):
+    """ Test SST-BF flavors are created and other flavors are kept """
+
+    cloud, client = fake_cloud
+    cloud.add_flavor("m1.small", 2048, 1, 20)
+
+    summary = client.reconcile_flavors(PROFILE, workers=4)
+
+    names = sorted(flavor["name"] for flavor in cloud.flavors.values())
+    assert len(summary["create"]) == 12
+    assert names == sorted(summary["create"] + ["m1.small"])
+    flavor = [flavor for flavor in cloud.flavors.values()
+              if flavor["name"] == "SST_BF.tiny.freq-fixed.normal-tier-shared"]
+    assert flavor[0]["ram"] == 512
+    assert flavor[0]["extra_specs"] == {
+        "trait:" + SST_BF_TRAIT: "required",
+        "trait:CUSTOM_CPU_" + PROFILE: "required",
+        "hw:cpu_policy": "shared"}
+    assert flavor[0]["description"].startswith(
+        "*.freq-fixed.high-tier-dedicated: High fixed")
+
+
+def test_reconcile_flavors_no_change(fake_cloud):
+    """ Test a second reconcile makes a single read and no writes """
+
+    cloud, client = fake_cloud
+    client.reconcile_flavors(PROFILE)
+    del cloud.requests[:]
+
+    summary = client.reconcile_flavors(PROFILE)
+
+    assert not any(summary.values())
+    assert cloud.writes() == []
+    assert [path for _, path, _ in cloud.requests] == \
+        ["/compute/flavors/detail"]
+
+
+def test_reconcile_flavors_delta(fake_cloud):
+    """ Test only differences are written """
+
+    cloud, client = fake_cloud
+    client.reconcile_flavors(PROFILE)
+    by_name = dict((flavor["name"], flavor)
+                   for flavor in cloud.flavors.values())
+    small = by_name["SST_BF.small.freq-fixed.high-tier-dedicated"]
+    small["extra_specs"]["trait:CUSTOM_CPU_FREQUENCY_VAR_HIGH_SHARED"] = \
+        "required"
+    small["description"] = None
+    micro = by_name["SST_BF.micro.freq-fixed.normal-tier-shared"]
+    micro["ram"] = 256
+    cloud.add_flavor("SST_BF.large.freq-var.high-tier-shared", 8192, 4, 80)
+    del cloud.requests[:]
+
+    summary = client.reconcile_flavors(PROFILE)
+
+    assert summary == {"create": [],
+                       "replace": [micro["name"]],
+                       "update": [small["name"]],
+                       "delete": ["SST_BF.large.freq-var.high-tier-shared"]}
+    assert len(cloud.writes()) == 6
+    small = cloud.flavors[small["id"]]
+    assert "trait:CUSTOM_CPU_FREQUENCY_VAR_HIGH_SHARED" not in \
+        small["extra_specs"]
+    assert small["description"] is not None
+    assert len(cloud.flavors) == 12
@@ -0,0 +1,309 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test parsing of ovs-vsctl output and transactional argument building,
+    including reconciliation of bridges and DPDK ports """
+import pytest
+from ansible.errors import AnsibleFilterError
+
+from common import role_filters, use_role_module_utils
+
+use_role_module_utils()
+
+from ansible.module_utils.sst_bf_ovs import (OvsError, diff_map,  # noqa: E402
+                                             map_args, missing_column,
+                                             parse_list, parse_lists,
+                                             plan_bridges, transaction)
+
+LIST_OUTPUT = '{"data":[[["map",[["dpdk-init","true"],' \
+              '["pmd-cpu-mask","0x6"]]],["uuid","1f3c"],["set",[]]]],' \
+              '"headings":["other_config","_uuid","ports"]}'
+
+
+def test_parse_list():
+    """ Test maps, UUIDs and sets are converted to Python values """
+
+    assert parse_list(LIST_OUTPUT) == [
+        {"other_config": {"dpdk-init": "true", "pmd-cpu-mask": "0x6"},
+         "_uuid": "1f3c", "ports": []}]
+    with pytest.raises(OvsError):
+        parse_list("not json")
+
+
+def test_diff_map():
+    """ Test only differing keys are changed and None removes a key """
+
+    current = {"dpdk-init": "true", "pmd-cpu-mask": "0x6", "old": "1"}
+    desired = {"dpdk-init": "true", "pmd-cpu-mask": "0x3c",
+               "dpdk-socket-mem": "1024,1024", "old": None, "gone": None}
+
+    assert diff_map(current, desired) == {"pmd-cpu-mask": "0x3c",
+                                          "dpdk-socket-mem": "1024,1024",
+                                          "old": None}
+    assert diff_map(current, {"dpdk-init": True}) == {"dpdk-init": "True"}
+    assert diff_map(current, {"dpdk-init": "true"}) == {}
+
+
+def test_single_transaction():
+    """ Test updates and removals are joined into one ovs-vsctl call """
+
+    changes = {"pmd-cpu-mask": "0x3c", "dpdk-socket-mem": "1024,1024",
+               "old": None}
+    assert transaction(map_args("Open_vSwitch", ".", "other_config",
+                                changes)) == \
+        ["set", "Open_vSwitch", ".",
+         'other_config:dpdk-socket-mem="1024,1024"',
+         'other_config:pmd-cpu-mask="0x3c"',
+         "--", "remove", "Open_vSwitch", ".", "other_config", "old"]
+
+
+def ovs_tables(bridges):
+    """ Return rows of tables Bridge, Port and Interface for 'bridges', a
+        dict which maps bridge name to tuple (external_ids, ports) where
+        ports maps port name to tuple (type, options) """
+
+    bridge_rows, port_rows, iface_rows = [], [], []
+    for bridge, (external_ids, ports) in sorted(bridges.items()):
+        port_uuids = []
+        for port, (iface_type, options) in sorted(ports.items()):
+            port_rows.append({"_uuid": "p-" + port, "name": port,
+                              "interfaces": "i-" + port})
+            iface_rows.append({"_uuid": "i-" + port, "name": port,
+                               "type": iface_type, "options": options,
+                               "mtu_request": []})
+            port_uuids.append("p-" + port)
+        bridge_rows.append({"name": bridge, "ports": port_uuids,
+                            "datapath_type": "netdev", "fail_mode": "secure",
+                            "external_ids": external_ids})
+    return bridge_rows, port_rows, iface_rows
+
+
+def dpdk_port(name, pci_address, columns=None, **options):
+    """ Return desired DPDK port 'name' for 'pci_address' """
+
+    options["dpdk-devargs"] = pci_address
+    return {"name": name, "type": "dpdk", "options": options,
+            "columns": columns or {}}
+
+
+def plan(tables, desired):
+    """ Plan reconciliation of 'tables' with the 'desired' bridges """
+
+    return plan_bridges(tables[0], tables[1], tables[2], desired, "netdev",
+                        "secure", "dpdk", "sst-bf-managed")
+
+
+def test_parse_lists():
+    """ Test output of several list commands is split per table """
+
+    tables = parse_lists(LIST_OUTPUT + "\n" + LIST_OUTPUT + "\n")
+    assert len(tables) == 2
+    assert tables[1][0]["_uuid"] == "1f3c"
+
+
+def test_plan_bridges_create():
+    """ Test a missing bridge and its ports are created in one plan """
+
+    commands, changes = plan(([], [], []),
+                             {"br-phy": [dpdk_port("eno1", "0000:af:00.0")]})
+
+    assert commands == [
+        ["add-br", "br-phy"],
+        ["set", "Bridge", "br-phy", 'datapath_type="netdev"',
+         'external_ids:sst-bf-managed="true"', 'fail_mode="secure"'],
+        ["add-port", "br-phy", "eno1"],
+        ["set", "Interface", "eno1", 'type="dpdk"',
+         'options:dpdk-devargs="0000:af:00.0"']]
+    assert changes["bridges_added"] == ["br-phy"]
+    assert changes["ports_added"] == ["eno1"]
+
+
+def test_plan_bridges_converged():
+    """ Test nothing is changed if bridges and ports match """
+
+    tables = ovs_tables({
+        "br-phy": ({"sst-bf-managed": "true"},
+                   {"br-phy": ("internal", {}),
+                    "eno1": ("dpdk", {"dpdk-devargs": "0000:af:00.0"})})})
+
+    commands, changes = plan(tables,
+                             {"br-phy": [dpdk_port("eno1", "0000:af:00.0")]})
+    assert commands == []
+    assert not any(changes.values())
+
+
+def test_plan_bridges_update_and_remove():
+    """ Test changed options are updated, stale DPDK ports and tagged bridges
+        are removed and untagged bridges are left untouched """
+
+    tables = ovs_tables({
+        "br-phy": ({"sst-bf-managed": "true"},
+                   {"br-phy": ("internal", {}),
+                    "eno1": ("dpdk", {"dpdk-devargs": "0000:af:00.0"}),
+                    "eno2": ("dpdk", {"dpdk-devargs": "0000:af:00.1"})}),
+        "br-old": ({"sst-bf-managed": "true"},
+                   {"eno3": ("dpdk", {"dpdk-devargs": "0000:3b:00.0"})}),
+        "br-int": ({}, {"patch-tun": ("patch", {})})})
+
+    commands, changes = plan(tables,
+                             {"br-phy": [dpdk_port("eno1", "0000:af:00.1"),
+                                         dpdk_port("eno3", "0000:3b:00.0")]})
+    assert commands == [
+        ["del-br", "br-old"],
+        ["set", "Interface", "eno1", 'type="dpdk"',
+         'options:dpdk-devargs="0000:af:00.1"'],
+        ["add-port", "br-phy", "eno3"],
+        ["set", "Interface", "eno3", 'type="dpdk"',
+         'options:dpdk-devargs="0000:3b:00.0"'],
+        ["del-port", "br-phy", "eno2"]]
+    assert changes == {"bridges_added": [], "bridges_updated": [],
+                       "bridges_removed": ["br-old"],
+                       "ports_added": ["eno3"], "ports_updated": ["eno1"],
+                       "ports_removed": ["eno2"]}
+
+
+def test_bridge_ports_filter():
+    """ Test PCI addresses are looked up over all NUMA nodes """
+
+    bridge_ports = role_filters("ovs_ports")["sst_bf_bridge_ports"]
+    host_description = {
+        "numa_nodes": {
+            0: {"interfaces": {"eno1": {"pci_address": "0000:af:00.0"}}},
+            1: {"dpdk_socket_mem": 1024}},
+        "bridge_mappings": {"br-phy": ["eno1"]}}
+
+    assert bridge_ports(host_description) == {
+        "br-phy": [dpdk_port("eno1", "0000:af:00.0")]}
+    host_description["bridge_mappings"]["br-phy"].append("eno9")
+    with pytest.raises(AnsibleFilterError):
+        bridge_ports(host_description)
+
+
+def test_plan_bridges_mtu():
+    """ Test a changed MTU request updates the interface """
+
+    tables = ovs_tables({
+        "br-phy": ({"sst-bf-managed": "true"},
+                   {"eno1": ("dpdk", {"dpdk-devargs": "0000:af:00.0"})})})
+
+    commands, changes = plan(tables, {"br-phy": [
+        dpdk_port("eno1", "0000:af:00.0", {"mtu_request": 9000})]})
+    assert commands == [["set", "Interface", "eno1", 'type="dpdk"',
+                         'options:dpdk-devargs="0000:af:00.0"',
+                         "mtu_request=9000"]]
+    assert changes["ports_updated"] == ["eno1"]
+
+    tables[2][0]["mtu_request"] = 9000
+    assert plan(tables, {"br-phy": [
+        dpdk_port("eno1", "0000:af:00.0", {"mtu_request": 9000})]})[0] == []
+
+
+def test_plan_bridges_removed_settings():
+    """ Test queue options and an MTU request which are no longer set are
+        removed from the interface, other options are kept """
+
+    tables = ovs_tables({
+        "br-phy": ({"sst-bf-managed": "true"},
+                   {"eno1": ("dpdk", {"dpdk-devargs": "0000:af:00.0",
+                                      "n_rxq": "2", "n_txq_desc": "2048",
+                                      "dpdk-lsc-interrupt": "true"})})})
+    tables[2][0]["mtu_request"] = 9000
+
+    commands, changes = plan(tables, {"br-phy": [
+        dpdk_port("eno1", "0000:af:00.0", n_rxq="2")]})
+    assert commands == [
+        ["remove", "Interface", "eno1", "options", "n_txq_desc"],
+        ["clear", "Interface", "eno1", "mtu_request"]]
+    assert changes["ports_updated"] == ["eno1"]
+
+    tables[2][0]["mtu_request"] = []
+    commands, _ = plan(tables, {"br-phy": [
+        dpdk_port("eno1", "0000:af:00.0")]})
+    assert commands == [
+        ["remove", "Interface", "eno1", "options", "n_rxq", "n_txq_desc"]]
+
+
+def test_bridge_ports_queues():
+    """ Test queue settings, MTU and options of the host description and
+        n_rxq set to the PMD threads on the NUMA node of the interface """
+
+    bridge_ports = role_filters("ovs_ports")["sst_bf_bridge_ports"]
+    topology = {"cpus": dict((str(cpu), {"numa_node": cpu // 8})
+                             for cpu in range(16))}
+    host_description = {
+        "numa_nodes": {
+            0: {"interfaces": {"eno1": {
+                "pci_address": "0000:3b:00.0", "n_rxq_desc": 2048,
+                "mtu": 9000, "options": {"dpdk-lsc-interrupt": "true"}}}},
+            1: {"interfaces": {"eno2": {
+                "pci_address": "0000:af:00.0", "n_rxq": "auto"}}}},
+        "bridge_mappings": {"br-phy": ["eno1", "eno2"]}}
+
+    ports = bridge_ports(host_description, "dpdk", topology, [2, 3, 9, 10, 11])
+    assert ports == {"br-phy": [
+        dpdk_port("eno1", "0000:3b:00.0", {"mtu_request": 9000},
+                  n_rxq_desc="2048", **{"dpdk-lsc-interrupt": "true"}),
+        dpdk_port("eno2", "0000:af:00.0", n_rxq="3")]}
+
+    ports = bridge_ports(host_description, "dpdk", topology, [2, 3, 9],
+                         rxq_auto=True)
+    assert ports["br-phy"][0]["options"]["n_rxq"] == "2"
+    with pytest.raises(AnsibleFilterError):
+        bridge_ports(host_description)
+
+
+def test_place_interfaces():
+    """ Test interfaces are placed on the NUMA node of their PCI device with
+        PMD cores and socket memory, unless numa_nodes overrides them """
+
+    filters = role_filters("ovs_ports")
+    host_description = {
+        "interfaces": {"eno1": {"pci_address": "0000:af:00.0"},
+                       "eno2": {"pci_address": "0000:d8:00.0"}},
+        "numa_nodes": {0: {"interfaces": {"eno3": {
+            "pci_address": "0000:3b:00.0"}}, "dpdk_socket_mem": 2048}}}
+    located = {"eno1": {"numa_node": 1}, "eno2": {"numa_node": None},
+               "eno3": {"numa_node": 1}}
+    topology = {"numa_nodes": {"0": [0, 1], "1": [2, 3]}}
+
+    assert filters["sst_bf_declared_interfaces"](host_description) == {
+        "eno1": {"pci_address": "0000:af:00.0"},
+        "eno2": {"pci_address": "0000:d8:00.0"},
+        "eno3": {"pci_address": "0000:3b:00.0", "numa_node": 0}}
+    assert filters["sst_bf_place_interfaces"](
+        host_description, located, topology, 2, 1024) == {
+            0: {"dpdk_socket_mem": 2048, "no_physical_cores_pinned": 2,
+                "interfaces": {"eno2": {"pci_address": "0000:d8:00.0"}}},
+            1: {"dpdk_socket_mem": 1024, "no_physical_cores_pinned": 2,
+                "interfaces": {"eno1": {"pci_address": "0000:af:00.0"},
+                               "eno3": {"pci_address": "0000:3b:00.0"}}}}
+
+    located["eno2"]["numa_node"] = 1
+    placed = filters["sst_bf_place_interfaces"](host_description, located,
+                                                topology, 2, 1024)
+    assert placed[0] == {"dpdk_socket_mem": 2048,
+                         "no_physical_cores_pinned": 0}
+
+
+def test_missing_column():
+    """ Test ovs-vsctl of Open vSwitch before 2.10, which has no
+        dpdk_initialized column, is told apart from other errors """
+
+    err = 'ovs-vsctl: Open_vSwitch does not contain a column whose name ' \
+          'matches "dpdk_initialized"\n'
+    assert missing_column(err, "dpdk_initialized")
+    assert not missing_column(err, "dpdk_version")
+    assert not missing_column("ovs-vsctl: unix:/var/run/openvswitch/"
+                              "db.sock: database connection failed "
+                              "(Connection refused)\n", "dpdk_initialized")
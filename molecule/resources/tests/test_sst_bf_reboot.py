@@ -0,0 +1,59 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test reboot slot accounting of the rolling reboot action """
+from common import role_plugin
+
+REBOOT = role_plugin("action_plugins", "sst_bf_reboot")
+
+
+def test_resolve_limit():
+    """ Test counts and percentages of a pool resolve to at least one host """
+
+    assert REBOOT.resolve_limit(3, 100) == 3
+    assert REBOOT.resolve_limit("5%", 200) == 10
+    assert REBOOT.resolve_limit("5%", 10) == 1
+    assert REBOOT.resolve_limit("100%", 7) == 7
+
+
+def test_slots_limited_per_pool():
+    """ Test a host waits while the play or one of its groups is full and
+        gets a slot once another host released one """
+
+    state = {}
+    rack1 = [dict(name="play", limit=2), dict(name="rack1", limit=1)]
+    rack2 = [dict(name="play", limit=2), dict(name="rack2", limit=1)]
+
+    assert REBOOT.try_acquire(state, "host1", rack1)
+    assert not REBOOT.try_acquire(state, "host2", rack1)
+    assert REBOOT.try_acquire(state, "host3", rack2)
+    assert not REBOOT.try_acquire(state, "host4", rack2)
+    assert REBOOT.try_acquire(state, "host1", rack1)
+
+    REBOOT.release(state, "host1")
+    assert REBOOT.try_acquire(state, "host2", rack1)
+    assert state["slots"] == {"host2": ["play", "rack1"],
+                              "host3": ["play", "rack2"]}
+
+
+def test_slot_file(tmpdir):
+    """ Test slot state persists between locked sessions and the directory
+        of the slot file is created if missing """
+
+    path = str(tmpdir.join("cache", "slots.json"))
+    with REBOOT.SlotFile(path) as state:
+        assert state == {}
+        REBOOT.try_acquire(state, "host1", [dict(name="play", limit=1)])
+    with REBOOT.SlotFile(path) as state:
+        assert state["slots"] == {"host1": ["play"]}
@@ -0,0 +1,101 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test sizing of OVS-DPDK socket memory, hugepages and PMD cores """
+from common import use_role_module_utils, write_files
+
+use_role_module_utils()
+
+from ansible.module_utils.sst_bf_sizing import (mbuf_size,  # noqa: E402
+                                                node_memory_mb, size_dpdk)
+
+MEMORY_MB = {0: 65536, 1: 65536}
+
+
+def test_node_memory(tmpdir):
+    """ Test total memory of each NUMA node is read from meminfo """
+
+    write_files(tmpdir, {
+        "devices/system/node/node0/meminfo":
+            "Node 0 MemTotal:        4194304 kB\nNode 0 MemFree: 1024 kB",
+        "devices/system/node/node1/meminfo":
+            "Node 1 MemTotal:        8388608 kB"})
+    assert node_memory_mb(str(tmpdir)) == {0: 4096, 1: 8192}
+
+
+def test_mbuf_size():
+    """ Test mbufs hold a frame of the MTU rounded up to 1 KB """
+
+    assert mbuf_size(1500) == 2048 + 320
+    assert mbuf_size(9000) == 9216 + 320
+
+
+def test_shared_mempool():
+    """ Test a node with one port gets a shared mempool per MTU and a node
+        without ports gets neither memory nor PMD cores """
+
+    numa_nodes = {0: {"interfaces": {"eno1": {"pci_address": "a",
+                                              "n_rxq": 2}}},
+                  1: {"dpdk_socket_mem": 1024}}
+
+    plan, warnings = size_dpdk(numa_nodes, MEMORY_MB, 2)
+    assert plan == {0: {"dpdk_socket_mem": 1024,
+                        "no_physical_cores_pinned": 1, "hugepages_1g": 1},
+                    1: {"dpdk_socket_mem": 0,
+                        "no_physical_cores_pinned": 0, "hugepages_1g": 0}}
+    assert warnings == []
+
+    numa_nodes[0]["interfaces"]["eno1"]["mtu"] = 9000
+    plan, _ = size_dpdk(numa_nodes, MEMORY_MB, 2)
+    assert plan[0]["dpdk_socket_mem"] == 3072
+
+
+def test_queues_and_vhost_ports():
+    """ Test PMD cores follow the rx queues of interfaces and vhost-user
+        ports and large per-port mempools exceed the shared mempool """
+
+    numa_nodes = {0: {"interfaces": {"eno1": {"pci_address": "a",
+                                              "n_rxq": 64,
+                                              "n_rxq_desc": 4096}}},
+                  1: {"interfaces": {"eno2": {"pci_address": "b"}},
+                      "vhost_ports": 5}}
+
+    plan, _ = size_dpdk(numa_nodes, MEMORY_MB, 2, rxqs_per_pmd=4,
+                        guest_hugepages_gb=2)
+    # 64 rx queues need 16 threads, 6 rx queues need 2 threads
+    assert plan[0]["no_physical_cores_pinned"] == 8
+    assert plan[1]["no_physical_cores_pinned"] == 1
+    # 64 * 4096 + 19 * 2048 + 64 * 32 + 16384 mbufs of 2368 bytes
+    assert plan[0]["dpdk_socket_mem"] == 1024
+    assert plan[0]["hugepages_1g"] == 3
+
+    numa_nodes[0]["interfaces"]["eno1"]["n_rxq"] = 128
+    plan, _ = size_dpdk(numa_nodes, MEMORY_MB, 2, rxqs_per_pmd=4)
+    assert plan[0]["dpdk_socket_mem"] == 2048
+
+
+def test_auto_rxq_and_overcommit():
+    """ Test automatic rx queues are sized from the PMD threads of the node
+        and nodes without enough memory are reported """
+
+    numa_nodes = {0: {"interfaces": {"eno1": {"pci_address": "a",
+                                              "n_rxq": "auto"}},
+                      "vhost_ports": 3}}
+
+    plan, warnings = size_dpdk(numa_nodes, {0: 4096}, 1,
+                               guest_hugepages_gb=3)
+    assert plan[0]["no_physical_cores_pinned"] == 2
+    assert plan[0]["hugepages_1g"] == 4
+    assert len(warnings) == 1
+    assert "NUMA node 0" in warnings[0]
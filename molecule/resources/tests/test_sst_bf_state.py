@@ -0,0 +1,79 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test applied-state record fingerprints and comparison """
+from common import use_role_module_utils
+
+use_role_module_utils()
+
+from ansible.module_utils.sst_bf_state import (compare,  # noqa: E402
+                                               dump_record, fingerprint,
+                                               load_record, update_record)
+
+TOPOLOGY = {"high_cores": [1, 3], "normal_cores": [0, 2],
+            "numa_nodes": {"0": [0, 1], "1": [2, 3]}}
+ROLE_VARS = {"sst_bf_profile": "FREQUENCY_FIXED_HIGH_DEDICATED",
+             "host_description": {"numa_nodes": {"0": {"dpdk_socket_mem":
+                                                       1024}}}}
+
+
+def test_fingerprint_is_canonical():
+    """ Test fingerprint does not depend on dict ordering but on content """
+
+    reordered = dict(reversed(list(ROLE_VARS.items())))
+    digest = fingerprint({}, "host", TOPOLOGY, ROLE_VARS)
+
+    assert fingerprint({}, "host", TOPOLOGY, reordered) == digest
+    assert fingerprint({}, "host", TOPOLOGY,
+                       dict(ROLE_VARS, sst_bf_profile="X")) != digest
+    assert fingerprint({}, "host", dict(TOPOLOGY, high_cores=[1]),
+                       ROLE_VARS) != digest
+
+
+def test_fingerprint_chains_earlier_phases():
+    """ Test the openstack phase fingerprint changes with the recorded host
+        phase fingerprint while the host phase ignores later phases """
+
+    record = update_record({}, "host", "a", "boot", {})
+    digest = fingerprint(record, "openstack", TOPOLOGY, ROLE_VARS)
+
+    assert fingerprint(update_record(record, "host", "b", "boot", {}),
+                       "openstack", TOPOLOGY, ROLE_VARS) != digest
+    assert fingerprint(update_record(record, "openstack", "c", "boot", {}),
+                       "host", TOPOLOGY, ROLE_VARS) == \
+        fingerprint(record, "host", TOPOLOGY, ROLE_VARS)
+
+
+def test_compare():
+    """ Test match and reboot detection against a recorded entry """
+
+    record = update_record({}, "host", "a", "boot1", {"high_cores_l": [1]})
+
+    assert compare(record, "host", "a", "boot1") == (True, False)
+    assert compare(record, "host", "a", "boot2") == (True, True)
+    assert compare(record, "host", "b", "boot2") == (False, False)
+    assert compare(record, "openstack", "a", "boot1") == (False, False)
+
+
+def test_record_round_trip():
+    """ Test a record survives serialisation and malformed records are
+        treated as empty """
+
+    record = update_record({}, "host", "a", "boot1", {"high_cores_l": [1]})
+
+    assert load_record(dump_record(record)) == record
+    assert load_record(None) == {}
+    assert load_record("{truncated") == {}
+    assert load_record("[1, 2]") == {}
+    assert load_record('{"unknown": {}, "host": "a"}') == {}
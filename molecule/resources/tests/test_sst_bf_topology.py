@@ -0,0 +1,214 @@
+# Copyright (c) 2019 Intel Corporation. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Test SST-BF topology discovery against a fake sysfs tree """
+import os
+
+import pytest
+
+from common import role_filters, use_role_module_utils, write_files
+
+use_role_module_utils()
+
+from ansible.module_utils.sst_bf_sysfs import (SysfsError,  # noqa: E402
+                                               format_cpu_list,
+                                               format_cpu_mask,
+                                               numa_cpu_map,
+                                               parse_cpu_list,
+                                               parse_cpu_mask, pci_locality,
+                                               read_node_hugepages,
+                                               set_node_hugepages,
+                                               write_atomic)
+from ansible.module_utils.sst_bf_topology import \
+    discover_topology  # noqa: E402
+
+# Two sockets, two cores per socket, two threads per core. The second core
+# of each socket is in the high priority tier.
+HIGH_FREQ = 2700000
+NORMAL_FREQ = 2100000
+SIBLINGS = {0: "0,4", 1: "1,5", 2: "2,6", 3: "3,7",
+            4: "0,4", 5: "1,5", 6: "2,6", 7: "3,7"}
+HIGH_CPUS = [1, 3, 5, 7]
+
+
+def fake_topology_files(base_freqs=None):
+    """ Return dict of sysfs files for the fake host """
+
+    files = {"devices/system/cpu/online": "0-7",
+             "devices/system/node/node0/cpulist": "0-1,4-5",
+             "devices/system/node/node1/cpulist": "2-3,6-7"}
+    for cpu, siblings in SIBLINGS.items():
+        cpu_dir = "devices/system/cpu/cpu{cpu}/".format(cpu=cpu)
+        freq = HIGH_FREQ if cpu in HIGH_CPUS else NORMAL_FREQ
+        if base_freqs is not None:
+            freq = base_freqs
+        files[cpu_dir + "cpufreq/base_frequency"] = freq
+        files[cpu_dir + "topology/thread_siblings_list"] = siblings
+    return files
+
+
+@pytest.fixture
+def topology(tmpdir):
+    """ Discover topology of the fake host """
+
+    write_files(tmpdir, fake_topology_files())
+    return discover_topology(str(tmpdir))
+
+
+def test_tiers(topology):
+    """ Test CPUs are split into high and normal priority tiers """
+
+    assert topology["high_cores"] == HIGH_CPUS
+    assert topology["normal_cores"] == [0, 2, 4, 6]
+    assert topology["base_frequency"] == {"high": HIGH_FREQ,
+                                          "normal": NORMAL_FREQ}
+
+
+def test_numa_and_siblings(topology):
+    """ Test NUMA membership and SMT sibling groups """
+
+    assert topology["numa_nodes"] == {0: [0, 1, 4, 5], 1: [2, 3, 6, 7]}
+    assert topology["cpus"][5]["numa_node"] == 0
+    assert topology["cpus"][5]["siblings"] == [1, 5]
+    assert topology["cpus"][5]["tier"] == "high"
+    assert topology["sibling_groups"] == [[0, 4], [1, 5], [2, 6], [3, 7]]
+    assert topology["threads_per_core"] == 2
+
+
+def test_sst_bf_unavailable(tmpdir):
+    """ Test discovery fails when all CPUs share one base frequency """
+
+    write_files(tmpdir, fake_topology_files(base_freqs=NORMAL_FREQ))
+    with pytest.raises(SysfsError):
+        discover_topology(str(tmpdir))
+
+
+def test_cpu_list_round_trip():
+    """ Test Linux CPU list syntax parsing and compression """
+
+    assert parse_cpu_list("0-3,8,10-11") == [0, 1, 2, 3, 8, 10, 11]
+    assert parse_cpu_list(" 0-1,\n") == [0, 1]
+    assert format_cpu_list([11, 10, 8, 3, 2, 1, 0]) == "0-3,8,10-11"
+    with pytest.raises(SysfsError):
+        parse_cpu_list("3-1")
+
+
+def test_cpu_mask_round_trip():
+    """ Test CPU masks are grouped in 32-bit words as the kernel does """
+
+    assert format_cpu_mask([]) == "00000000"
+    assert format_cpu_mask([0, 2]) == "00000005"
+    assert format_cpu_mask([1, 32]) == "00000001,00000002"
+    assert parse_cpu_mask("00000001,00000002") == [1, 32]
+    with pytest.raises(SysfsError):
+        parse_cpu_mask("0xzz")
+
+
+def test_pci_locality(tmpdir):
+    """ Test the NUMA node of PCI devices, taken from local_cpulist if the
+        device reports no NUMA node """
+
+    pci_dir = "bus/pci/devices/"
+    files = fake_topology_files()
+    files.update({pci_dir + "0000:3b:00.0/numa_node": 1,
+                  pci_dir + "0000:3b:00.0/local_cpulist": "2-3,6-7",
+                  pci_dir + "0000:af:00.0/numa_node": -1,
+                  pci_dir + "0000:af:00.0/local_cpulist": "0-1,4-5",
+                  pci_dir + "0000:d8:00.0/numa_node": -1,
+                  pci_dir + "0000:d8:00.0/local_cpulist": "0-7"})
+    write_files(tmpdir, files)
+    nodes = numa_cpu_map(str(tmpdir), range(8))
+
+    assert pci_locality(str(tmpdir), "0000:3b:00.0", nodes) == \
+        (1, [2, 3, 6, 7])
+    assert pci_locality(str(tmpdir), "0000:af:00.0", nodes) == \
+        (0, [0, 1, 4, 5])
+    assert pci_locality(str(tmpdir), "0000:d8:00.0", nodes)[0] is None
+    with pytest.raises(SysfsError):
+        pci_locality(str(tmpdir), "0000:00:00.0", nodes)
+
+
+def fake_hugepage_files(pools):
+    """ Return fake sysfs files of hugepage 'pools', a dict which maps
+        tuple (node, size in kB) to number of pages """
+
+    return dict(("devices/system/node/node{node}/hugepages/"
+                 "hugepages-{size}kB/nr_hugepages".format(node=node,
+                                                          size=size), count)
+                for (node, size), count in pools.items())
+
+
+def test_set_node_hugepages(tmpdir):
+    """ Test hugepages are moved between NUMA nodes and unchanged pools are
+        not written """
+
+    write_files(tmpdir, fake_hugepage_files({(0, 1048576): 4,
+                                             (1, 1048576): 4,
+                                             (0, 2048): 512}))
+    targets = {1048576: {0: 8, 1: 0}, 2048: {0: 512}}
+
+    assert set_node_hugepages(str(tmpdir), targets, dry_run=True) == \
+        (True, targets)
+    pool = tmpdir.join("devices/system/node/node0/hugepages/"
+                       "hugepages-1048576kB/nr_hugepages")
+    assert pool.read().strip() == "4"
+    assert read_node_hugepages(str(tmpdir), targets) == \
+        {(1048576, 0): 4, (1048576, 1): 4, (2048, 0): 512}
+
+    assert set_node_hugepages(str(tmpdir), targets) == (True, targets)
+    assert set_node_hugepages(str(tmpdir), targets) == (False, targets)
+    with pytest.raises(SysfsError):
+        set_node_hugepages(str(tmpdir), {2048: {1: 512}})
+
+
+def test_numa_hugepages_filter():
+    """ Test hugepage targets are only collected for sizes set on a NUMA
+        node """
+
+    numa_hugepages = role_filters("hugepages")["sst_bf_numa_hugepages"]
+
+    assert numa_hugepages({0: {"dpdk_socket_mem": 1024},
+                           1: {"dpdk_socket_mem": 1024}}) == {}
+    assert numa_hugepages({0: {"hugepages_1g": 8},
+                           1: {"dpdk_socket_mem": 1024}}) == \
+        {"1G": {0: 8, 1: 0}}
+    assert numa_hugepages({"0": {"hugepages_2m": 512},
+                           "1": {"hugepages_2m": 256}}) == \
+        {"2M": {0: 512, 1: 256}}
+
+
+class FakeModule(object):
+    """ AnsibleModule stand-in providing atomic_move and fail_json """
+
+    @staticmethod
+    def atomic_move(src, dest):
+        """ Move 'src' over 'dest' """
+
+        os.rename(src, dest)
+
+    @staticmethod
+    def fail_json(msg):
+        """ Raise instead of exiting """
+
+        raise AssertionError(msg)
+
+
+def test_write_atomic(tmpdir):
+    """ Test a file is replaced without leaving temporary files behind """
+
+    path = tmpdir.join("state.json")
+    path.write("old")
+    write_atomic(FakeModule(), str(path), "new\n")
+    assert path.read() == "new\n"
+    assert tmpdir.listdir() == [path]